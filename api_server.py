@@ -1,17 +1,25 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context, g
 from flask_cors import CORS
 from fashion_ai import FashionRecommendationAI
 from closet_repository import ClosetRepository
+from precomputed_store import PrecomputedStore
+from llm_transport import describe as describe_llm_transport
 import os
 from dotenv import load_dotenv
-from models import init_db         
+from models import init_db, begin_request_session, end_request_session, pool_stats
+import json
+import threading
+import time
+from datetime import datetime
+from uuid import UUID
 
 app = Flask(__name__)
 CORS(app)
 
 load_dotenv()
 API_KEY = os.environ.get('ANTHROPIC_API_KEY')
-ai = FashionRecommendationAI(api_key=API_KEY)
+# 야간 배치(precompute.py)로 미리 만든 결과를 Claude 호출 전에 먼저 확인
+ai = FashionRecommendationAI(api_key=API_KEY, precomputed=PrecomputedStore())
 
 # DB 테이블 생성 (이미 clothes_table 있으면 다른 테이블만 생성)
 init_db()
@@ -20,6 +28,19 @@ init_db()
 closet = ClosetRepository()
 
 
+@app.before_request
+def _open_request_session():
+    """요청 하나 안의 ClosetRepository 호출들이 DB 세션(커넥션)을 공유하도록"""
+    g.db_session_token = begin_request_session()
+
+
+@app.teardown_request
+def _close_request_session(error=None):
+    token = g.pop('db_session_token', None)
+    if token is not None:
+        end_request_session(token, error)
+
+
 @app.route('/')
 def home():
     return """
@@ -27,24 +48,75 @@ def home():
     <p>옷장 데이터: PostgreSQL DB (clothes_table)</p>
     <h3>📡 API 목록</h3>
     <ul>
-        <li><strong>GET /api/clothes</strong> - 전체 옷장 조회</li>
+        <li><strong>GET /api/clothes?user_id=&amp;limit=&amp;cursor=</strong> - 옷장 조회 (페이지네이션, format=ndjson 스트리밍)</li>
         <li><strong>POST /api/clothes/add</strong> - 옷 추가</li>
         <li><strong>DELETE /api/clothes/delete?cloth_id=xxx</strong> - 옷 삭제</li>
         <li><strong>PUT /api/clothes/update</strong> - 옷 수정</li>
-        <li><strong>POST /api/recommend</strong> - 패션 추천 (핵심!)</li>
+        <li><strong>POST | PUT | DELETE /api/clothes/bulk</strong> - 옷 일괄 추가 / 수정 / 삭제</li>
+        <li><strong>POST /api/recommend</strong> - 패션 추천 (핵심!, mode: llm/local/auto)</li>
+        <li><strong>POST /api/recommend/stream</strong> - 패션 추천 스트리밍 (SSE)</li>
+        <li><strong>POST /api/recommend/plan</strong> - 여러 날 코디 계획 (한 번 호출로 최대 14일)</li>
         <li><strong>GET /api/health</strong> - 서버 상태 확인</li>
+        <li><strong>GET /api/health/live</strong> - liveness (I/O 없음)</li>
+        <li><strong>GET /api/health/ready</strong> - readiness (DB / LLM 설정 확인)</li>
     </ul>
     <p>서버 정상 작동 중! ✅</p>
     """
 
 
+CLOTHES_PAGE_DEFAULT = 100
+CLOTHES_PAGE_MAX = 1000
+
+
 @app.route('/api/clothes', methods=['GET'])
 def get_clothes():
-    """전체 옷장 조회"""
+    """
+    옷장 조회 (keyset 페이지네이션)
+    - user_id: 특정 사용자 옷만 (선택)
+    - limit: 페이지 크기 (기본 100, 최대 1000)
+    - cursor: 이전 응답의 next_cursor
+    - format=ndjson: 한 줄에 옷 하나씩 스트리밍 (limit 없으면 끝까지)
+    """
     try:
-        result = closet.get_all_clothes()
+        user_id = request.args.get('user_id') or None
+        cursor = request.args.get('cursor') or None
+        stream = request.args.get('format') == 'ndjson'
+
+        limit = request.args.get('limit')
+        try:
+            limit = int(limit) if limit is not None else None
+        except ValueError:
+            limit = 0
+        if limit is not None and not 0 < limit <= CLOTHES_PAGE_MAX:
+            return jsonify({
+                "success": False,
+                "error": f"limit은 1~{CLOTHES_PAGE_MAX} 사이 숫자여야 합니다"
+            }), 400
+
+        if stream:
+            try:
+                rows = closet.iter_clothes(user_id=user_id, cursor=cursor, limit=limit)
+            except ValueError as e:
+                return jsonify({"success": False, "error": str(e)}), 400
+
+            def generate():
+                for cloth in rows:
+                    yield json.dumps(cloth, ensure_ascii=False) + "\n"
+
+            return Response(
+                stream_with_context(generate()),
+                mimetype='application/x-ndjson'
+            )
+
+        result = closet.get_clothes_page(
+            user_id=user_id,
+            limit=limit or CLOTHES_PAGE_DEFAULT,
+            cursor=cursor,
+        )
 
         if not result.get("success"):
+            if result.get("error") == "INVALID_ARGUMENT":
+                return jsonify({"success": False, "error": result.get("message")}), 400
             return jsonify(result), 500
 
         clothes = result.get("data", [])
@@ -52,7 +124,8 @@ def get_clothes():
         return jsonify({
             "success": True,
             "count": len(clothes),
-            "clothes": clothes
+            "clothes": clothes,
+            "next_cursor": result.get("next_cursor")
         })
     except Exception as e:
         return jsonify({
@@ -198,53 +271,279 @@ def update_cloth():
         }), 500
 
 
+CLOTHES_BULK_MAX = int(os.environ.get('CLOTHES_BULK_MAX', 1000))
+
+BULK_UUID_FIELDS = ("user_id", "style_id", "season_id", "item_type_id")
+BULK_INT_FIELDS = ("category_id", "color_id", "material_id")
+BULK_TEXT_FIELDS = ("name", "image_url")
+
+
+def _parse_bulk_fields(item, require_name):
+    """일괄 요청 옷 1벌 검증/형변환 → (필드 dict, 에러 메시지)"""
+    if not isinstance(item, dict):
+        return None, "각 항목은 객체여야 합니다"
+    fields = {}
+    for key in BULK_TEXT_FIELDS:
+        if key in item:
+            value = item[key]
+            if value is not None and not isinstance(value, str):
+                return None, f"{key}는 문자열이어야 합니다"
+            fields[key] = value
+    for key in BULK_UUID_FIELDS:
+        if item.get(key) is not None:
+            try:
+                fields[key] = UUID(str(item[key]))
+            except ValueError:
+                return None, f"{key}가 올바른 UUID가 아닙니다"
+    for key in BULK_INT_FIELDS:
+        if item.get(key) is not None:
+            value = item[key]
+            try:
+                if isinstance(value, bool):
+                    raise ValueError
+                fields[key] = int(value)
+            except (ValueError, TypeError):
+                return None, f"{key}는 정수여야 합니다"
+    if require_name and not fields.get("name"):
+        return None, "필수 항목이 없습니다: name"
+    if "name" in fields and fields["name"] is not None and not fields["name"].strip():
+        return None, "name이 비어있습니다"
+    return fields, None
+
+
+def _parse_bulk_cloth_id(value, seen):
+    if not value:
+        return None, "cloth_id가 필요합니다"
+    try:
+        cloth_id = UUID(str(value))
+    except ValueError:
+        return None, "cloth_id가 올바른 UUID가 아닙니다"
+    if cloth_id in seen:
+        return None, "같은 cloth_id가 중복되었습니다"
+    seen.add(cloth_id)
+    return cloth_id, None
+
+
+def _bulk_items(data, key):
+    """요청 바디의 리스트 꺼내기 → (리스트, 에러 응답)"""
+    items = data.get(key)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({
+            "success": False,
+            "error": f"{key} 리스트가 필요합니다"
+        }), 400)
+    if len(items) > CLOTHES_BULK_MAX:
+        return None, (jsonify({
+            "success": False,
+            "error": f"한 번에 최대 {CLOTHES_BULK_MAX}개까지 처리할 수 있습니다"
+        }), 400)
+    return items, None
+
+
+def _bulk_validation_error(errors):
+    return jsonify({
+        "success": False,
+        "error": "요청 검증 실패 (아무것도 처리되지 않았습니다)",
+        "errors": errors
+    }), 400
+
+
+@app.route('/api/clothes/bulk', methods=['POST'])
+def add_clothes_bulk():
+    """옷 일괄 추가 {"clothes": [...]} (전부 검증 후 한 트랜잭션, 전부 성공 또는 전부 실패)"""
+    try:
+        items, error = _bulk_items(request.json or {}, "clothes")
+        if error:
+            return error
+
+        parsed, errors = [], []
+        for i, item in enumerate(items):
+            fields, message = _parse_bulk_fields(item, require_name=True)
+            if message:
+                errors.append({"index": i, "error": message})
+            parsed.append(fields)
+        if errors:
+            return _bulk_validation_error(errors)
+
+        result = closet.add_clothes_bulk(parsed)
+        if not result.get("success"):
+            return jsonify(result), 500
+
+        return jsonify({
+            "success": True,
+            "message": f"옷 {len(result['data'])}개가 추가되었습니다",
+            "results": [
+                {"index": i, "success": True, "cloth": cloth}
+                for i, cloth in enumerate(result["data"])
+            ]
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/clothes/bulk', methods=['PUT'])
+def update_clothes_bulk():
+    """옷 일괄 수정 {"clothes": [{"cloth_id": ..., 필드...}]} (없는 cloth_id 는 해당 항목만 NOT_FOUND)"""
+    try:
+        items, error = _bulk_items(request.json or {}, "clothes")
+        if error:
+            return error
+
+        updates, errors, seen = [], [], set()
+        for i, item in enumerate(items):
+            fields, message = _parse_bulk_fields(item, require_name=False)
+            if not message:
+                cloth_id, message = _parse_bulk_cloth_id(item.get("cloth_id"), seen)
+            if message:
+                errors.append({"index": i, "error": message})
+                continue
+            updates.append((cloth_id, fields))
+        if errors:
+            return _bulk_validation_error(errors)
+
+        result = closet.update_clothes_bulk(updates)
+        if not result.get("success"):
+            return jsonify(result), 500
+
+        results = []
+        for i, ((cloth_id, _), cloth) in enumerate(zip(updates, result["data"])):
+            if cloth is None:
+                results.append({"index": i, "success": False, "cloth_id": str(cloth_id), "error": "NOT_FOUND"})
+            else:
+                results.append({"index": i, "success": True, "cloth": cloth})
+        updated = sum(1 for r in results if r["success"])
+
+        return jsonify({
+            "success": True,
+            "message": f"옷 {updated}개가 수정되었습니다",
+            "results": results
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+@app.route('/api/clothes/bulk', methods=['DELETE'])
+def delete_clothes_bulk():
+    """옷 일괄 삭제 {"cloth_ids": [...]} (없는 cloth_id 는 해당 항목만 NOT_FOUND)"""
+    try:
+        items, error = _bulk_items(request.json or {}, "cloth_ids")
+        if error:
+            return error
+
+        cloth_ids, errors, seen = [], [], set()
+        for i, value in enumerate(items):
+            cloth_id, message = _parse_bulk_cloth_id(value, seen)
+            if message:
+                errors.append({"index": i, "error": message})
+                continue
+            cloth_ids.append(cloth_id)
+        if errors:
+            return _bulk_validation_error(errors)
+
+        result = closet.delete_clothes_bulk(cloth_ids)
+        if not result.get("success"):
+            return jsonify(result), 500
+
+        results = [
+            {"index": i, "success": True, "cloth_id": str(cloth_id)}
+            if deleted else
+            {"index": i, "success": False, "cloth_id": str(cloth_id), "error": "NOT_FOUND"}
+            for i, (cloth_id, deleted) in enumerate(zip(cloth_ids, result["data"]))
+        ]
+        deleted_count = sum(result["data"])
+
+        return jsonify({
+            "success": True,
+            "message": f"옷 {deleted_count}개가 삭제되었습니다",
+            "results": results
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": str(e)
+        }), 500
+
+
+def recommend_request_error(data):
+    """추천 요청 공통 검증 → 문제가 있으면 에러 메시지, 없으면 None (asgi_server 와 공용)"""
+    # 🔹 사용자 구분: user_id 필수
+    if not data.get('user_id'):
+        return "user_id가 없습니다"
+
+    if not data.get('weather'):
+        return "날씨 정보가 없습니다"
+
+    if not data.get('schedule'):
+        return "일정 정보가 없습니다"
+
+    # 🔹 추천 엔진 선택: "llm" | "local" | "auto" (없으면 서버 기본값)
+    mode = data.get('mode')
+    if mode is not None and mode not in ai.MODES:
+        return f"mode는 {', '.join(ai.MODES)} 중 하나여야 합니다"
+    return None
+
+
+def _validate_recommend_request(data):
+    """추천 요청 공통 검증 → 문제가 있으면 (에러 응답, 상태코드), 없으면 None"""
+    error = recommend_request_error(data)
+    if error:
+        return jsonify({
+            "success": False,
+            "error": error
+        }), 400
+    return None
+
+
+EMPTY_CLOSET_ERROR = "옷장이 비어있습니다. /api/clothes/add로 옷을 추가해주세요."
+
+
 @app.route('/api/recommend', methods=['POST'])
 def recommend():
     """패션 추천 (핵심 API)"""
     try:
         data = request.json or {}
 
-        # 🔹 사용자 구분: user_id 필수
-        user_id = data.get('user_id')
-        if not user_id:
-            return jsonify({
-                "success": False,
-                "error": "user_id가 없습니다"
-            }), 400
-
-        if not data.get('weather'):
-            return jsonify({
-                "success": False,
-                "error": "날씨 정보가 없습니다"
-            }), 400
-
-        if not data.get('schedule'):
-            return jsonify({
-                "success": False,
-                "error": "일정 정보가 없습니다"
-            }), 400
+        invalid = _validate_recommend_request(data)
+        if invalid:
+            return invalid
 
+        user_id = data['user_id']
         weather = data['weather']
         schedule = data['schedule']
+        mode = data.get('mode')
 
         # 🔹 기존: 전체 옷장 코드값 그대로 사용
         # repo_result = closet.get_all_clothes()
         # clothes = repo_result.get("data", [])
 
-        # 🔹 변경: 특정 사용자 + AI-ready 포맷(한글 라벨)으로 가져오기
-        clothes = closet.get_ai_ready_clothes(user_id)
+        # 🔹 변경: 특정 사용자 + AI-ready 포맷(컬럼 배열)으로 가져오기
+        #    dict 는 프롬프트 작성 / 응답 시점에만 만들어짐
+        clothes = closet.get_ai_ready_closet(user_id)
 
         if not clothes:
             return jsonify({
                 "success": False,
-                "error": "옷장이 비어있습니다. /api/clothes/add로 옷을 추가해주세요."
+                "error": EMPTY_CLOSET_ERROR
             }), 400
 
         # FashionRecommendationAI가 기대하는 포맷에 맞게 전달
+        stats = {}
         result = ai.recommend(
             clothes=clothes,
             weather=weather,
-            schedule=schedule
+            schedule=schedule,
+            mode=mode,
+            stats=stats,
+            user_id=user_id
         )
 
         if isinstance(result, dict) and 'error' in result:
@@ -257,31 +556,292 @@ def recommend():
         return jsonify({
             "success": True,
             "recommendation": result,
-            "total_clothes": len(clothes)
+            "total_clothes": len(clothes),
+            "stats": stats
+        })
+
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"추천 실패: {str(e)}"
+        }), 500
+
+
+def _is_iso_date(value):
+    """YYYY-MM-DD 형식의 실제 날짜인지"""
+    if not isinstance(value, str) or len(value) != 10:
+        return False
+    try:
+        datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return False
+    return True
+
+
+def plan_request_error(data):
+    """계획 요청 검증 → 문제가 있으면 에러 메시지, 없으면 None"""
+    if not data.get('user_id'):
+        return "user_id가 없습니다"
+
+    days = data.get('days')
+    if not isinstance(days, list) or not days:
+        return "days는 비어있지 않은 리스트여야 합니다"
+    if len(days) > ai.PLAN_MAX_DAYS:
+        return f"days는 최대 {ai.PLAN_MAX_DAYS}일까지 가능합니다"
+
+    dates = set()
+    for i, day in enumerate(days):
+        if not isinstance(day, dict) or not day.get('date'):
+            return f"days[{i}]: date가 없습니다"
+        if not _is_iso_date(day['date']):
+            return f"days[{i}]: date는 YYYY-MM-DD 형식이어야 합니다"
+        weather = day.get('weather')
+        if not isinstance(weather, dict) or not weather:
+            return f"days[{i}]: 날씨 정보가 없습니다"
+        temp = weather.get('temp')
+        if temp is not None and (isinstance(temp, bool) or not isinstance(temp, (int, float))):
+            return f"days[{i}]: weather.temp는 숫자여야 합니다"
+        condition = weather.get('condition')
+        if condition is not None and not isinstance(condition, str):
+            return f"days[{i}]: weather.condition은 문자열이어야 합니다"
+        if not day.get('schedule'):
+            return f"days[{i}]: 일정 정보가 없습니다"
+        if not isinstance(day['schedule'], str):
+            return f"days[{i}]: schedule은 문자열이어야 합니다"
+        if str(day['date']) in dates:
+            return f"days[{i}]: 날짜가 중복되었습니다 ({day['date']})"
+        dates.add(str(day['date']))
+
+    mode = data.get('mode')
+    if mode is not None and mode not in ai.MODES:
+        return f"mode는 {', '.join(ai.MODES)} 중 하나여야 합니다"
+    return None
+
+
+@app.route('/api/recommend/plan', methods=['POST'])
+def recommend_plan():
+    """
+    여러 날 코디 계획 (Claude 호출 1번, 상의는 날짜끼리 겹치지 않게)
+    요청: {"user_id": ..., "days": [{"date": "2025-03-03", "weather": {...}, "schedule": "출근"}, ...], "mode": ...}
+    응답: {"plan": [{"date", "weather", "schedule", "recommendation"}, ...], "total_clothes": n, "stats": {...}}
+    """
+    try:
+        data = request.json or {}
+
+        invalid = plan_request_error(data)
+        if invalid:
+            return jsonify({
+                "success": False,
+                "error": invalid
+            }), 400
+
+        clothes = closet.get_ai_ready_closet(data['user_id'])
+        if not clothes:
+            return jsonify({
+                "success": False,
+                "error": EMPTY_CLOSET_ERROR
+            }), 400
+
+        stats = {}
+        result = ai.recommend_plan(
+            clothes=clothes,
+            days=[
+                {"date": day['date'], "weather": day['weather'], "schedule": day['schedule']}
+                for day in data['days']
+            ],
+            mode=data.get('mode'),
+            stats=stats,
+            user_id=data['user_id']
+        )
+
+        if 'error' in result:
+            return jsonify({
+                "success": False,
+                "error": result['error'],
+                "suggestion": result.get('suggestion', '')
+            }), 400
+
+        return jsonify({
+            "success": True,
+            "plan": result['days'],
+            "total_clothes": len(clothes),
+            "stats": stats
         })
 
+    except Exception as e:
+        return jsonify({
+            "success": False,
+            "error": f"계획 실패: {str(e)}"
+        }), 500
+
+
+def _sse(event, data):
+    """Server-Sent Events 한 건"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+@app.route('/api/recommend/stream', methods=['POST'])
+def recommend_stream():
+    """
+    패션 추천 스트리밍 (SSE)
+    - event: slot  → {"slot": "top", "value": {...}} (슬롯이 완성될 때마다)
+    - event: done  → {"recommendation": {...}, "total_clothes": n, "stats": {...}}
+    - event: error → {"error": "...", ...}
+    """
+    try:
+        data = request.json or {}
+
+        invalid = _validate_recommend_request(data)
+        if invalid:
+            return invalid
+
+        clothes = closet.get_ai_ready_closet(data['user_id'])
+        if not clothes:
+            return jsonify({
+                "success": False,
+                "error": EMPTY_CLOSET_ERROR
+            }), 400
     except Exception as e:
         return jsonify({
             "success": False,
             "error": f"추천 실패: {str(e)}"
         }), 500
 
+    def generate():
+        stats = {}
+        try:
+            events = ai.recommend_stream(
+                clothes=clothes,
+                weather=data['weather'],
+                schedule=data['schedule'],
+                mode=data.get('mode'),
+                stats=stats
+            )
+            for event, payload in events:
+                if event == "done":
+                    payload = {
+                        "recommendation": payload,
+                        "total_clothes": len(clothes),
+                        "stats": stats
+                    }
+                yield _sse(event, payload)
+        except Exception as e:
+            yield _sse("error", {"error": f"추천 실패: {str(e)}"})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+# 헬스 체크용 옷 개수 캐시 (로드밸런서가 몇 초마다 호출해도 COUNT(*)는 TTL 마다 한 번만)
+HEALTH_COUNT_TTL = float(os.environ.get('HEALTH_COUNT_TTL', 60))
+HEALTH_DB_TIMEOUT_MS = int(os.environ.get('HEALTH_DB_TIMEOUT_MS', 1000))
+_count_cache = {"value": None, "expires_at": 0.0}
+_count_lock = threading.Lock()
+_started_at = time.time()
+
+
+def _cached_clothes_count():
+    """(옷 개수, 캐시 사용 여부) - 조회 실패 시 (None, False)"""
+    with _count_lock:
+        if _count_cache["value"] is not None and _count_cache["expires_at"] > time.monotonic():
+            return _count_cache["value"], True
+
+    result = closet.count_clothes()
+    if not result.get("success"):
+        return None, False
+
+    with _count_lock:
+        _count_cache["value"] = result["data"]
+        _count_cache["expires_at"] = time.monotonic() + HEALTH_COUNT_TTL
+    return result["data"], False
+
+
+def _timed(fn):
+    """(fn() 결과, 걸린 시간 ms)"""
+    started = time.perf_counter()
+    value = fn()
+    return value, round((time.perf_counter() - started) * 1000, 2)
+
+
+def _llm_ready():
+    """(LLM 클라이언트 준비 여부, 전송 계층) - API 키는 실제 API 를 부르는 live / record 에서만 필요"""
+    client = getattr(ai, "client", None)
+    if client is None:
+        return False, None
+    transport = describe_llm_transport(client)["transport"]
+    return transport not in ("live", "record") or bool(API_KEY), transport
+
+
+@app.route('/api/health/live', methods=['GET'])
+def health_live():
+    """liveness: 프로세스가 요청을 받을 수 있는지만 확인 (I/O 없음)"""
+    started = time.perf_counter()
+    return jsonify({
+        "status": "ok",
+        "uptime_seconds": round(time.time() - _started_at, 1),
+        "checks": {
+            "process": {
+                "ok": True,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+            }
+        }
+    })
+
+
+@app.route('/api/health/ready', methods=['GET'])
+def health_ready():
+    """readiness: DB(SELECT 1), LLM 클라이언트 설정, 옷 개수(캐시) 확인"""
+    checks = {}
+
+    db, latency = _timed(lambda: closet.ping(timeout_ms=HEALTH_DB_TIMEOUT_MS))
+    checks["database"] = {"ok": db.get("success", False), "latency_ms": latency}
+    if not db.get("success"):
+        checks["database"]["error"] = db.get("error")
+
+    (llm_ok, transport), latency = _timed(_llm_ready)
+    checks["llm"] = {"ok": llm_ok, "transport": transport, "latency_ms": latency}
+
+    (count, cached), latency = _timed(_cached_clothes_count)
+    checks["clothes_count"] = {
+        "ok": count is not None,
+        "value": count,
+        "cached": cached,
+        "latency_ms": latency
+    }
+
+    ready = checks["database"]["ok"] and checks["llm"]["ok"]
+    return jsonify({
+        "status": "ok" if ready else "unavailable",
+        "checks": checks,
+        "db_pool": pool_stats()
+    }), 200 if ready else 503
+
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    """서버 상태 체크"""
+    """서버 상태 체크 (옷 개수는 캐시된 COUNT(*) 사용)"""
     try:
-        result = closet.get_all_clothes()
-        clothes = result.get("data", []) if result.get("success") else []
-        clothes_count = len(clothes)
+        clothes_count, _ = _cached_clothes_count()
     except Exception:
-        clothes_count = 0
+        clothes_count = None
 
     return jsonify({
         "status": "ok",
         "message": "서버 정상 작동 중",
         "data_source": "PostgreSQL: clothes_table",
-        "total_clothes": clothes_count
+        "total_clothes": clothes_count or 0,
+        "recommend_cache": ai.cache.stats(),
+        "recommend_coalescing": ai.inflight.stats(),
+        "lookups": closet.lookups.stats(),
+        "closet_cache": closet.snapshots.stats(),
+        "precomputed": ai.precomputed.stats(),
+        "llm_transport": describe_llm_transport(ai.client)
     })
 
 
@@ -296,9 +856,9 @@ if __name__ == '__main__':
     print("=" * 50)
 
     try:
-        result = closet.get_all_clothes()
-        clothes = result.get("data", []) if result.get("success") else []
-        print(f"👕 현재 옷장: {len(clothes)}개")
+        result = closet.count_clothes()
+        count = result.get("data", 0) if result.get("success") else 0
+        print(f"👕 현재 옷장: {count}개")
     except Exception as e:
         print(f"⚠️ 옷장 로드 오류: {e}")
 
@@ -0,0 +1,169 @@
+"""
+비동기 서빙 모드 (ASGI)
+- /api/recommend, /api/recommend/stream, /api/health/live 는 이벤트 루프에서 직접 처리
+  (AsyncSession 으로 옷장 조회 → AsyncAnthropic 응답을 await)
+  → Claude 응답을 기다리는 요청 수백 개를 워커 하나가 동시에 들고 있을 수 있음
+- 나머지 경로(옷 CRUD / 일괄 처리 / 헬스 체크 등)는 기존 Flask 앱을 스레드풀에서 그대로 실행
+  (경로 / 요청 / 응답 형식은 api_server 와 동일)
+
+실행:
+    uvicorn asgi_server:app --host 0.0.0.0 --port $PORT --workers 2
+"""
+import os
+import time
+from contextlib import asynccontextmanager
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Mount, Route
+
+from api_server import app as flask_app, ai, closet, recommend_request_error, EMPTY_CLOSET_ERROR, _sse
+from closet_repository import AsyncClosetRepository
+from models import dispose_async_engine
+
+# Flask 경로를 실행할 스레드 수 (추천 경로는 스레드를 쓰지 않음)
+ASGI_WSGI_THREADS = int(os.environ.get('ASGI_WSGI_THREADS', 10))
+
+# 라벨 사전 / 옷장 스냅샷 캐시는 Flask 쪽 저장소와 공유 (Flask 경로의 수정이 바로 무효화되도록)
+async_closet = AsyncClosetRepository(lookups=closet.lookups, snapshots=closet.snapshots)
+_started_at = time.time()
+
+
+async def _json_body(request):
+    """요청 JSON (없거나 깨졌으면 빈 dict → 검증 단계에서 400)"""
+    try:
+        data = await request.json()
+    except Exception:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _error(message, status_code, **extra):
+    return JSONResponse({"success": False, "error": message, **extra}, status_code=status_code)
+
+
+async def recommend(request):
+    """패션 추천 (api_server.recommend 와 같은 요청/응답)"""
+    try:
+        data = await _json_body(request)
+
+        invalid = recommend_request_error(data)
+        if invalid:
+            return _error(invalid, 400)
+
+        clothes = await async_closet.get_ai_ready_closet(data['user_id'])
+        if not clothes:
+            return _error(EMPTY_CLOSET_ERROR, 400)
+
+        stats = {}
+        result = await ai.recommend_async(
+            clothes=clothes,
+            weather=data['weather'],
+            schedule=data['schedule'],
+            mode=data.get('mode'),
+            stats=stats,
+            user_id=data['user_id']
+        )
+
+        if isinstance(result, dict) and 'error' in result:
+            return _error(result['error'], 400, suggestion=result.get('suggestion', ''))
+
+        return JSONResponse({
+            "success": True,
+            "recommendation": result,
+            "total_clothes": len(clothes),
+            "stats": stats
+        })
+
+    except Exception as e:
+        return _error(f"추천 실패: {str(e)}", 500)
+
+
+async def recommend_stream(request):
+    """패션 추천 스트리밍 (SSE, api_server.recommend_stream 과 같은 이벤트)"""
+    try:
+        data = await _json_body(request)
+
+        invalid = recommend_request_error(data)
+        if invalid:
+            return _error(invalid, 400)
+
+        clothes = await async_closet.get_ai_ready_closet(data['user_id'])
+        if not clothes:
+            return _error(EMPTY_CLOSET_ERROR, 400)
+    except Exception as e:
+        return _error(f"추천 실패: {str(e)}", 500)
+
+    async def generate():
+        stats = {}
+        try:
+            events = ai.recommend_stream_async(
+                clothes=clothes,
+                weather=data['weather'],
+                schedule=data['schedule'],
+                mode=data.get('mode'),
+                stats=stats
+            )
+            async for event, payload in events:
+                if event == "done":
+                    payload = {
+                        "recommendation": payload,
+                        "total_clothes": len(clothes),
+                        "stats": stats
+                    }
+                yield _sse(event, payload)
+        except Exception as e:
+            yield _sse("error", {"error": f"추천 실패: {str(e)}"})
+
+    return StreamingResponse(
+        generate(),
+        media_type='text/event-stream',
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+        }
+    )
+
+
+async def health_live(request):
+    """liveness: 이벤트 루프가 요청을 받을 수 있는지만 확인 (I/O 없음)"""
+    started = time.perf_counter()
+    return JSONResponse({
+        "status": "ok",
+        "uptime_seconds": round(time.time() - _started_at, 1),
+        "checks": {
+            "event_loop": {
+                "ok": True,
+                "latency_ms": round((time.perf_counter() - started) * 1000, 2)
+            }
+        }
+    })
+
+
+@asynccontextmanager
+async def lifespan(app):
+    yield
+    await dispose_async_engine()
+
+
+app = Starlette(
+    routes=[
+        Route('/api/recommend', recommend, methods=['POST']),
+        Route('/api/recommend/stream', recommend_stream, methods=['POST']),
+        Route('/api/health/live', health_live, methods=['GET']),
+        Mount('/', app=WSGIMiddleware(flask_app, workers=ASGI_WSGI_THREADS)),
+    ],
+    lifespan=lifespan,
+)
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    uvicorn.run(
+        "asgi_server:app",
+        host="0.0.0.0",
+        port=int(os.environ.get('PORT', 5000)),
+        workers=int(os.environ.get('WEB_CONCURRENCY', 1)),
+    )
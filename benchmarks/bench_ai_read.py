@@ -0,0 +1,111 @@
+"""
+AI 추천용 옷장 조회 벤치마크: ORM 엔티티 조회 vs Core 컬럼 조회
+
+- orm : session.query(Cloth) 로 Cloth 객체(identity map 포함)를 만든 뒤 ColumnarCloset 변환 (이전 방식)
+- core: ClosetRepository.get_ai_ready_closet (필요한 컬럼만 Core select → 튜플 → ColumnarCloset)
+- 옷장 크기 100 / 1,000 / 10,000 개 사용자를 별도 스키마에 만들어서 측정
+
+사용법:
+    DATABASE_URL=postgresql+psycopg2://... python benchmarks/bench_ai_read.py
+"""
+import argparse
+import random
+import statistics
+import time
+import uuid
+
+from scratch_db import scratch_engine  # 프로젝트 루트를 sys.path 에 추가함
+import migrations
+from closet_cache import ClosetSnapshotCache
+from closet_columns import ColumnarCloset
+from closet_repository import ClosetRepository
+from label_maps import CATEGORY_MAP, ITEM_TYPE_MAP, COLOR_MAP, STYLE_MAP, MATERIAL_MAP, SEASON_MAP
+from models import Base, Cloth, SessionLocal, DATABASE_URL
+
+
+def seed(engine, sizes, rng):
+    """크기별 사용자 1명씩 만들고 {크기: user_id}"""
+    users = {}
+    rows = []
+    for size in sizes:
+        user_id = uuid.uuid4()
+        users[size] = user_id
+        for i in range(size):
+            rows.append({
+                "user_id": user_id,
+                "name": f"item {i}",
+                "image_url": f"https://example.com/{size}/{i}.jpg",
+                "category_id": rng.choice(list(CATEGORY_MAP)),
+                "item_type_id": uuid.UUID(rng.choice(list(ITEM_TYPE_MAP))),
+                "color_id": rng.choice(list(COLOR_MAP)),
+                "style_id": uuid.UUID(rng.choice(list(STYLE_MAP))),
+                "material_id": rng.choice(list(MATERIAL_MAP)),
+                "season_id": uuid.UUID(rng.choice(list(SEASON_MAP))),
+            })
+    with engine.begin() as conn:
+        conn.execute(Cloth.__table__.insert(), rows)
+    return users
+
+
+def orm_read(repo, user_id):
+    """이전 방식: ORM 엔티티 조회 후 변환"""
+    vocabulary = repo.lookups.get()
+    session = SessionLocal()
+    try:
+        clothes = (
+            session.query(Cloth)
+            .filter(Cloth.user_id == user_id)
+            .order_by(Cloth.cloth_id)
+            .all()
+        )
+        return ColumnarCloset.from_rows(clothes, vocabulary)
+    finally:
+        session.close()
+
+
+def measure(fn, repeat):
+    fn()  # 워밍업 (커넥션/라벨 사전 로딩)
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI 추천용 옷장 조회 ORM vs Core 비교")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--schema", default="bench_ai_read")
+    parser.add_argument("--sizes", default="100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--keep", action="store_true", help="끝난 뒤 벤치마크 스키마를 지우지 않음")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+
+    with scratch_engine(args.database_url, args.schema, keep=args.keep) as engine:
+        Base.metadata.create_all(bind=engine)
+        migrations.upgrade(engine, verbose=False)
+        users = seed(engine, sizes, random.Random(42))
+
+        # 저장소 코드가 벤치마크 스키마를 쓰도록 세션 바인딩 교체
+        SessionLocal.configure(bind=engine)
+        repo = ClosetRepository()
+        # 스냅샷 캐시를 끄고 매번 SELECT + ColumnarCloset 변환을 측정
+        repo.snapshots = ClosetSnapshotCache(max_items=0)
+
+        print(f"{'옷장 크기':>10}{'ORM (ms)':>12}{'Core (ms)':>12}{'배수':>8}")
+        for size in sizes:
+            user_id = users[size]
+            assert (
+                orm_read(repo, user_id).fingerprint()
+                == repo.get_ai_ready_closet(user_id).fingerprint()
+            )
+            orm_ms = measure(lambda: orm_read(repo, user_id), args.repeat)
+            core_ms = measure(lambda: repo.get_ai_ready_closet(user_id), args.repeat)
+            print(f"{size:>10,}{orm_ms:>12.2f}{core_ms:>12.2f}{orm_ms / core_ms:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
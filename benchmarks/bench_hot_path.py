@@ -0,0 +1,237 @@
+"""
+추천 경로 마이크로 벤치마크 (네트워크 / API 키 없이 실행)
+
+- 합성 옷장(실제 라벨 사전 사용) 10 ~ 100,000 벌로 다음 단계를 측정
+  _filter_by_weather, _build_prompt/_create_prompt, _parse_response, OutfitValidator, cloth_to_dict,
+  recommend (llm_transport 합성 클라이언트 / 로컬 엔진), get_ai_ready_clothes (로컬 DB)
+- DB 단계는 DATABASE_URL 로 접속해서 별도 스키마에서 측정 (접속이 안 되면 건너뜀)
+- 결과는 JSON 으로 저장하고, 기준(baseline) 결과가 있으면 단계별 변화율 비교
+
+사용법:
+    python benchmarks/bench_hot_path.py --output results.json
+    python benchmarks/bench_hot_path.py --save-baseline benchmarks/baseline.json
+    python benchmarks/bench_hot_path.py --baseline benchmarks/baseline.json --fail-on-regression
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime, timezone
+
+# models 는 import 시점에 엔진을 만들기 때문에 URL 이 없으면 가짜 URL 로 (접속은 DB 단계에서만)
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/fashion_bench")
+
+from scratch_db import scratch_engine  # 프로젝트 루트를 sys.path 에 추가함
+import numpy as np
+import migrations
+from closet_cache import ClosetSnapshotCache
+from closet_columns import ColumnarCloset
+from closet_repository import ClosetRepository
+from fashion_ai import FashionRecommendationAI
+from llm_transport import make_client, synthetic_response
+from models import Base, Cloth, SessionLocal, cloth_list_to_dicts, DATABASE_URL
+from outfit_validator import OutfitValidator
+from synthetic import make_clothes, make_db_rows
+
+DEFAULT_SIZES = "10,100,1000,10000,100000"
+WEATHER = {"temp": 17, "condition": "맑음"}
+SCHEDULE = "친구랑 카페"
+
+
+def measure(fn, min_seconds=0.3, max_repeat=200, min_repeat=3):
+    """min_seconds 동안(최소 min_repeat 번) 반복 실행 → ms 통계"""
+    fn()  # 워밍업
+    timings = []
+    started = time.perf_counter()
+    while len(timings) < min_repeat or (
+        time.perf_counter() - started < min_seconds and len(timings) < max_repeat
+    ):
+        t0 = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - t0) * 1000)
+    timings.sort()
+    return {
+        "median_ms": round(statistics.median(timings), 4),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        "min_ms": round(timings[0], 4),
+        "repeat": len(timings),
+    }
+
+
+def quiet(fn):
+    """단계 안의 print 로그가 측정 결과 출력에 섞이지 않도록"""
+    def run():
+        with contextlib.redirect_stdout(io.StringIO()):
+            return fn()
+    return run
+
+
+def bench_in_memory(size, results, args):
+    clothes = make_clothes(size, seed=size)
+    closet = ColumnarCloset.from_dicts(clothes)
+
+    client = make_client(transport="synthetic", latency="none")
+    ai = FashionRecommendationAI(client=client, cache_size=0)
+    compact = FashionRecommendationAI(client=client, cache_size=0, prompt_format="compact")
+
+    suitable = ai._filter_by_weather(closet, WEATHER)
+    candidates = ai._prune_candidates(suitable, WEATHER, SCHEDULE)
+    aliases = compact._make_id_aliases(candidates)
+    verbose_prompt = ai._create_prompt(candidates, WEATHER, SCHEDULE)
+    compact_prompt = compact._create_prompt(candidates, WEATHER, SCHEDULE, aliases=aliases)
+    verbose_response = synthetic_response(ai.prompt_text(verbose_prompt))
+    compact_response = synthetic_response(compact.prompt_text(compact_prompt))
+    parsed = ai._parse_response(verbose_response)
+
+    orm_clothes = [
+        Cloth(cloth_id=uuid.UUID(row_id["id"]), created_at=datetime.now(timezone.utc), **row)
+        for row_id, row in zip(clothes, make_db_rows(size, uuid.uuid4(), seed=size))
+    ]
+
+    cases = {
+        "filter_by_weather[columnar]": lambda: ai._filter_by_weather(closet, WEATHER),
+        "filter_by_weather[dicts]": lambda: ai._filter_by_weather(clothes, WEATHER),
+        "build_prompt[verbose]": quiet(lambda: ai._build_prompt(suitable, WEATHER, SCHEDULE, {})),
+        "build_prompt[compact]": quiet(lambda: compact._build_prompt(suitable, WEATHER, SCHEDULE, {})),
+        "create_prompt[verbose]": lambda: ai._create_prompt(candidates, WEATHER, SCHEDULE),
+        "create_prompt[compact]": lambda: compact._create_prompt(candidates, WEATHER, SCHEDULE, aliases=aliases),
+        "parse_response[verbose]": lambda: ai._parse_response(verbose_response),
+        "parse_response[compact]": lambda: compact._parse_response(compact_response, aliases=aliases),
+        "validate_outfit": lambda: OutfitValidator(suitable, ai.local_engine).check(parsed, WEATHER, SCHEDULE),
+        "cloth_to_dict": lambda: cloth_list_to_dicts(orm_clothes),
+        "recommend[llm-synthetic]": quiet(lambda: ai.recommend(closet, WEATHER, SCHEDULE, mode="llm")),
+        "recommend[local]": quiet(lambda: ai.recommend(closet, WEATHER, SCHEDULE, mode="local")),
+    }
+    for name, fn in cases.items():
+        record(results, name, size, measure(fn, args.min_seconds))
+
+
+def bench_database(sizes, results, args):
+    try:
+        with scratch_engine(args.database_url, args.schema) as engine:
+            Base.metadata.create_all(bind=engine)
+            migrations.upgrade(engine, verbose=False)
+
+            users = {}
+            with engine.begin() as conn:
+                for size in sizes:
+                    users[size] = uuid.uuid4()
+                    rows = make_db_rows(size, users[size], seed=size)
+                    for start in range(0, size, 10_000):
+                        conn.execute(Cloth.__table__.insert(), rows[start:start + 10_000])
+
+            SessionLocal.configure(bind=engine)
+            repo = ClosetRepository()
+            # 스냅샷 캐시를 끄고 매번 SELECT + ColumnarCloset 변환을 측정 (캐시 히트는 아래 별도 항목)
+            repo.snapshots = ClosetSnapshotCache(max_items=0)
+            warm = ClosetRepository()
+            with contextlib.redirect_stdout(io.StringIO()):
+                repo.get_vocabulary()
+                warm.get_vocabulary()
+
+            for size in sizes:
+                user_id = users[size]
+                record(results, "get_ai_ready_closet", size,
+                       measure(lambda: repo.get_ai_ready_closet(user_id), args.min_seconds))
+                record(results, "get_ai_ready_closet[warm-snapshot]", size,
+                       measure(lambda: warm.get_ai_ready_closet(user_id), args.min_seconds))
+                record(results, "get_ai_ready_clothes", size,
+                       measure(lambda: repo.get_ai_ready_clothes(user_id), args.min_seconds))
+    except Exception as e:
+        print(f"⚠️ DB 벤치마크 건너뜀: {type(e).__name__}: {str(e).splitlines()[0]}")
+        return False
+    return True
+
+
+def record(results, name, size, stats):
+    results[f"{name}@{size}"] = {"name": name, "size": size, **stats}
+    print(f"  {name:<30}{size:>8,}  median {stats['median_ms']:>10.3f} ms  "
+          f"p95 {stats['p95_ms']:>10.3f} ms  (x{stats['repeat']})")
+
+
+def metadata():
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def compare(results, baseline, threshold):
+    """기준 대비 median 변화율 출력 → 임계값보다 느려진 항목 목록"""
+    regressions = []
+    print(f"\n📊 기준 비교 ({baseline['meta'].get('commit')} → 현재, 임계값 +{threshold:.0%})")
+    for key, current in results.items():
+        base = baseline["results"].get(key)
+        if not base or not base["median_ms"]:
+            continue
+        change = current["median_ms"] / base["median_ms"] - 1
+        mark = "🔴" if change > threshold else ("🟢" if change < -threshold else "⚪")
+        print(f"  {mark} {key:<40}{base['median_ms']:>10.3f} → {current['median_ms']:>10.3f} ms  ({change:+.1%})")
+        if change > threshold:
+            regressions.append(key)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="추천 경로 마이크로 벤치마크 (오프라인)")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES)
+    parser.add_argument("--min-seconds", type=float, default=0.3, help="단계별 최소 측정 시간")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--schema", default="bench_hot_path")
+    parser.add_argument("--no-db", action="store_true", help="DB 단계 건너뛰기")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 기준 결과 JSON")
+    parser.add_argument("--save-baseline", help="이번 결과를 기준으로 저장할 경로")
+    parser.add_argument("--threshold", type=float, default=0.25, help="회귀로 볼 median 증가율")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(",")]
+    results = {}
+
+    print("🧪 메모리 단계")
+    for size in sizes:
+        bench_in_memory(size, results, args)
+
+    if not args.no_db:
+        print("🧪 DB 단계")
+        bench_database(sizes, results, args)
+
+    report = {"meta": metadata(), "results": results}
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump(report, f, ensure_ascii=False, indent=2)
+            print(f"💾 결과 저장: {path}")
+
+    if args.baseline:
+        if not os.path.exists(args.baseline):
+            print(f"⚠️ 기준 결과 파일이 없습니다: {args.baseline}")
+            return
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions and args.fail_on_regression:
+            print(f"❌ 회귀 {len(regressions)}건")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
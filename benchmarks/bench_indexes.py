@@ -0,0 +1,126 @@
+"""
+clothes_table 인덱스 전/후 쿼리 플랜 비교 벤치마크
+
+- 운영 테이블은 건드리지 않고 별도 스키마(기본 bench_indexes)에 테이블을 만들어서 측정
+- 합성 데이터 --rows 행 (사용자 --users 명에 고르게 분배)을 generate_series 로 한 번에 넣음
+- 마이그레이션 적용 전(인덱스 없음) / 적용 후 각각 EXPLAIN (ANALYZE, BUFFERS) 로
+  플랜 종류와 실행 시간을 출력
+
+사용법:
+    DATABASE_URL=postgresql+psycopg2://... python benchmarks/bench_indexes.py --rows 1000000
+"""
+import argparse
+import json
+import statistics
+
+from sqlalchemy import text
+
+from scratch_db import scratch_engine  # 프로젝트 루트를 sys.path 에 추가함
+import migrations
+from models import Base, DATABASE_URL
+
+# 앱에서 자주 쓰는 쿼리 (closet_repository 와 같은 형태)
+HOT_QUERIES = {
+    "ai_ready_closet": (
+        "SELECT * FROM clothes_table WHERE user_id = :user_id ORDER BY cloth_id"
+    ),
+    "user_category": (
+        "SELECT * FROM clothes_table WHERE user_id = :user_id AND category_id = 4"
+    ),
+    "user_page": (
+        "SELECT * FROM clothes_table WHERE user_id = :user_id "
+        "ORDER BY created_at, cloth_id LIMIT 101"
+    ),
+    "all_page": (
+        "SELECT * FROM clothes_table ORDER BY created_at, cloth_id LIMIT 101"
+    ),
+}
+
+
+def _user_id(n):
+    return f"00000000-0000-0000-0000-{n:012x}"
+
+
+def seed(engine, rows, users):
+    print(f"🧪 합성 데이터 {rows:,}행 / 사용자 {users:,}명 생성 중...")
+    with engine.begin() as conn:
+        conn.execute(text("TRUNCATE clothes_table"))
+        conn.execute(
+            text(
+                """
+                INSERT INTO clothes_table
+                    (user_id, name, category_id, color_id, material_id, created_at)
+                SELECT
+                    ('00000000-0000-0000-0000-' || lpad(to_hex(g % :users), 12, '0'))::uuid,
+                    'item ' || g,
+                    4 + g % 4,
+                    1 + g % 12,
+                    1 + g % 5,
+                    now() - (g || ' seconds')::interval
+                FROM generate_series(1, :rows) AS g
+                """
+            ),
+            {"rows": rows, "users": users},
+        )
+        conn.execute(text("ANALYZE clothes_table"))
+
+
+def explain(engine, sql, params, repeat):
+    """(플랜 노드 종류, 실행 시간 ms 중앙값)"""
+    timings = []
+    plan = None
+    with engine.connect() as conn:
+        for _ in range(repeat):
+            result = conn.execute(
+                text(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {sql}"), params
+            ).scalar_one()
+            plan = (result if isinstance(result, list) else json.loads(result))[0]
+            timings.append(plan["Execution Time"])
+    node_types = []
+    node = plan["Plan"]
+    while node:
+        node_types.append(node["Node Type"])
+        node = (node.get("Plans") or [None])[0]
+    return " > ".join(node_types), statistics.median(timings)
+
+
+def run_queries(engine, users, repeat):
+    params = {"user_id": _user_id(users // 2)}
+    return {name: explain(engine, sql, params, repeat) for name, sql in HOT_QUERIES.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="clothes_table 인덱스 전/후 비교")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--schema", default="bench_indexes")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=2_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="끝난 뒤 벤치마크 스키마를 지우지 않음")
+    args = parser.parse_args()
+
+    with scratch_engine(args.database_url, args.schema, keep=args.keep) as engine:
+        Base.metadata.create_all(bind=engine)
+        migrations.downgrade(engine, target=0, verbose=False)
+        seed(engine, args.rows, args.users)
+
+        print("📉 인덱스 없이 측정 중...")
+        before = run_queries(engine, args.users, args.repeat)
+
+        migrations.upgrade(engine)
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE clothes_table"))
+
+        print("📈 인덱스 적용 후 측정 중...")
+        after = run_queries(engine, args.users, args.repeat)
+
+    print(f"\n{'쿼리':<18}{'전 (ms)':>12}{'후 (ms)':>12}{'배수':>10}  플랜 (전 → 후)")
+    for name in HOT_QUERIES:
+        plan_before, ms_before = before[name]
+        plan_after, ms_after = after[name]
+        speedup = ms_before / ms_after if ms_after else float("inf")
+        print(f"{name:<18}{ms_before:>12.3f}{ms_after:>12.3f}{speedup:>9.1f}x  "
+              f"{plan_before} → {plan_after}")
+
+if __name__ == "__main__":
+    main()
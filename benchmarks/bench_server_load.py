@@ -0,0 +1,119 @@
+"""
+/api/recommend 부하 테스트 (처리량 / 꼬리 지연)
+
+서버는 네트워크 없이 응답하도록 replay 또는 synthetic 전송 계층으로 띄워서 사용
+    LLM_TRANSPORT=synthetic LLM_LATENCY=lognormal:1.5,0.4 RECOMMEND_CACHE_SIZE=0 \\
+        gunicorn -c gunicorn.conf.py api_server:app
+    python benchmarks/bench_server_load.py --url http://127.0.0.1:8000 --user-id <uuid> \\
+        --concurrency 32 --requests 2000 --output load.json
+
+- 요청마다 기온을 바꿔서 추천 캐시를 피할 수 있음 (--vary-weather)
+- 결과: 처리량(req/s), 지연 p50/p95/p99/max, 상태 코드별 건수, 엔진별 건수
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+SCHEDULES = ("출근", "친구랑 카페", "데이트", "야외 활동")
+CONDITIONS = ("맑음", "흐림", "비")
+
+
+def build_payload(i, user_id, mode, vary_weather):
+    temp = -5 + (i % 36) if vary_weather else 17
+    return {
+        "user_id": user_id,
+        "weather": {"temp": temp, "condition": CONDITIONS[i % len(CONDITIONS)] if vary_weather else "맑음"},
+        "schedule": SCHEDULES[i % len(SCHEDULES)] if vary_weather else "친구랑 카페",
+        "mode": mode,
+    }
+
+
+def send(url, payload, timeout):
+    body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+    req = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"})
+    started = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as resp:
+            status, data = resp.status, resp.read()
+    except urllib.error.HTTPError as e:
+        status, data = e.code, e.read()
+    except Exception as e:
+        return (time.perf_counter() - started) * 1000, f"error:{type(e).__name__}", None
+    elapsed = (time.perf_counter() - started) * 1000
+    try:
+        engine = json.loads(data).get("stats", {}).get("engine")
+    except ValueError:
+        engine = None
+    return elapsed, status, engine
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * q))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="/api/recommend 부하 테스트")
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--user-id", required=True)
+    parser.add_argument("--mode", default="llm", choices=("llm", "local", "auto"))
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--timeout", type=float, default=60)
+    parser.add_argument("--vary-weather", action="store_true", help="요청마다 날씨/일정을 바꿈")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/") + "/api/recommend"
+    statuses = Counter()
+    engines = Counter()
+    latencies = []
+    lock = threading.Lock()
+
+    def one(i):
+        elapsed, status, engine = send(
+            url, build_payload(i, args.user_id, args.mode, args.vary_weather), args.timeout
+        )
+        with lock:
+            latencies.append(elapsed)
+            statuses[str(status)] += 1
+            engines[engine or "-"] += 1
+
+    print(f"🚀 {url} 에 {args.requests}건 (동시 {args.concurrency})")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one, range(args.requests)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    report = {
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(args.requests / wall, 2),
+        "latency_ms": {
+            "p50": round(statistics.median(latencies), 2),
+            "p95": round(percentile(latencies, 0.95), 2),
+            "p99": round(percentile(latencies, 0.99), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "status": dict(statuses),
+        "engine": dict(engines),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
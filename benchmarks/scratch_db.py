@@ -0,0 +1,35 @@
+"""
+벤치마크 공용: 운영 테이블을 건드리지 않도록 별도 스키마에 DB 엔진을 만들어주는 헬퍼
+"""
+import os
+import sys
+from contextlib import contextmanager
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+
+@contextmanager
+def scratch_engine(database_url, schema, keep=False):
+    """
+    schema 를 만들고 search_path 를 그 스키마로만 잡은 엔진을 돌려줌
+    (public 을 넣으면 create_all 이 기존 public.clothes_table 을 보고 건너뛰므로 제외)
+    끝나면 (keep=False 인 경우) 스키마째로 삭제
+    """
+    admin = create_engine(database_url)
+    with admin.begin() as conn:
+        conn.execute(text(f'CREATE SCHEMA IF NOT EXISTS "{schema}"'))
+
+    engine = create_engine(
+        database_url,
+        connect_args={"options": f"-csearch_path={schema}"},
+    )
+    try:
+        yield engine
+    finally:
+        engine.dispose()
+        if not keep:
+            with admin.begin() as conn:
+                conn.execute(text(f'DROP SCHEMA IF EXISTS "{schema}" CASCADE'))
+        admin.dispose()
@@ -0,0 +1,58 @@
+"""
+벤치마크용 합성 옷장 (실제 라벨 사전의 라벨/코드값 사용, seed 고정이면 항상 같은 데이터)
+"""
+import random
+import uuid
+
+from closet_columns import VOCAB, STATIC_MAPS, UUID_FIELDS, LABEL_FIELDS, ID_COLUMNS
+from label_maps import TYPE_CATEGORY
+
+# 종류 → 카테고리가 맞도록 종류를 먼저 고르고 나머지 라벨은 무작위
+TYPES = [label for label in VOCAB["type"] if label in TYPE_CATEGORY]
+LABEL_TO_ID = {
+    field: {label: db_id for db_id, label in STATIC_MAPS[field].items()}
+    for field in LABEL_FIELDS
+}
+
+
+def _labels(rng):
+    item_type = rng.choice(TYPES)
+    return {
+        "category": TYPE_CATEGORY[item_type],
+        "type": item_type,
+        "color": rng.choice(VOCAB["color"]),
+        "style": rng.choice(VOCAB["style"]),
+        "material": rng.choice(VOCAB["material"]),
+        "season": rng.choice(VOCAB["season"]),
+    }
+
+
+def make_clothes(n, seed=0):
+    """get_ai_ready_clothes 형식의 dict 리스트"""
+    rng = random.Random(seed)
+    clothes = []
+    for i in range(n):
+        labels = _labels(rng)
+        clothes.append({
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "name": f"{labels['color']} {labels['type']} {i}",
+            "image_url": f"https://example.com/clothes/{i}.jpg",
+            **labels,
+        })
+    return clothes
+
+
+def make_db_rows(n, user_id, seed=0):
+    """clothes_table 컬럼 dict 리스트 (라벨 → 실제 DB 코드값)"""
+    rows = []
+    for item in make_clothes(n, seed):
+        row = {
+            "user_id": user_id,
+            "name": item["name"],
+            "image_url": item["image_url"],
+        }
+        for field in LABEL_FIELDS:
+            db_id = LABEL_TO_ID[field][item[field]]
+            row[ID_COLUMNS[field]] = uuid.UUID(db_id) if field in UUID_FIELDS else db_id
+        rows.append(row)
+    return rows
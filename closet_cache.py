@@ -0,0 +1,150 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# 캐시에 들고 있을 최대 옷 개수 (사용자 수가 아니라 옷 개수 합으로 메모리 제한, 0 이면 캐시 끔)
+CLOSET_CACHE_MAX_ITEMS = int(os.environ.get("CLOSET_CACHE_MAX_ITEMS", 200_000))
+CLOSET_CACHE_TTL = float(os.environ.get("CLOSET_CACHE_TTL", 300))
+# 다른 워커에서 바뀌었는지 DB 버전(closet_versions)을 다시 확인하는 최소 간격 (초)
+CLOSET_CACHE_CHECK_INTERVAL = float(os.environ.get("CLOSET_CACHE_CHECK_INTERVAL", 5))
+
+
+class ClosetSnapshot:
+    __slots__ = ("closet", "version", "vocabulary_version", "expires_at", "checked_at")
+
+    def __init__(self, closet, version, vocabulary_version, expires_at, checked_at):
+        self.closet = closet
+        self.version = version
+        self.vocabulary_version = vocabulary_version
+        self.expires_at = expires_at
+        self.checked_at = checked_at
+
+
+class ClosetSnapshotCache:
+    """
+    사용자별 AI 추천용 옷장(ColumnarCloset) 스냅샷 캐시 (LRU + TTL, 옷 개수 합으로 크기 제한)
+    - 같은 워커의 추가/수정/삭제는 invalidate() 로 바로 반영
+    - 다른 워커(또는 closet_import 등 다른 프로세스)의 변경은 closet_versions 버전으로 감지:
+      check_interval 안에는 DB 를 전혀 안 보고, 그 뒤에는 버전 한 줄만 확인해서 같으면 계속 사용
+    - 라벨 사전 버전이 바뀌면 (라벨 문자열이 달라질 수 있으므로) 다시 조회
+    """
+
+    def __init__(self, max_items=None, ttl_seconds=None, check_interval=None):
+        self.max_items = CLOSET_CACHE_MAX_ITEMS if max_items is None else max_items
+        self.ttl_seconds = CLOSET_CACHE_TTL if ttl_seconds is None else ttl_seconds
+        self.check_interval = CLOSET_CACHE_CHECK_INTERVAL if check_interval is None else check_interval
+        self._items = OrderedDict()   # user_id -> ClosetSnapshot
+        self._size = 0                # 캐시된 옷 개수 합
+        self._epoch = 0               # invalidate() 때마다 증가 (조회 도중 무효화된 결과는 저장 안 함)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self):
+        return self.max_items > 0
+
+    def get(self, user_id, vocabulary_version):
+        """
+        → (스냅샷, fresh)
+        fresh=True: DB 확인 없이 그대로 사용 / 스냅샷만 있으면 버전 확인 후 confirm() / None 이면 새로 조회
+        """
+        if not self.enabled:
+            return None, False
+
+        now = time.monotonic()
+        with self._lock:
+            snapshot = self._items.get(user_id)
+            if snapshot is None:
+                return None, False
+            if snapshot.expires_at < now or snapshot.vocabulary_version != vocabulary_version:
+                self._remove(user_id)
+                self.evictions += 1
+                return None, False
+
+            self._items.move_to_end(user_id)
+            if now - snapshot.checked_at < self.check_interval:
+                self.hits += 1
+                return snapshot, True
+            return snapshot, False
+
+    def confirm(self, user_id, snapshot):
+        """DB 버전이 같았음 → 다음 check_interval 동안 다시 확인하지 않음"""
+        with self._lock:
+            snapshot.checked_at = time.monotonic()
+            self.revalidations += 1
+
+    def epoch(self):
+        """DB 조회 전에 받아두고 put() 에 넘김"""
+        return self._epoch
+
+    def put(self, user_id, closet, version, vocabulary_version, epoch):
+        """DB 에서 새로 조회한 옷장 저장 (옷 개수 합이 max_items 를 넘으면 LRU 제거)"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.misses += 1
+        if version is None or len(closet) > self.max_items:
+            return
+
+        now = time.monotonic()
+        snapshot = ClosetSnapshot(closet, version, vocabulary_version, now + self.ttl_seconds, now)
+        with self._lock:
+            # 조회하는 동안 이 워커에서 옷장이 바뀌었으면 이미 옛날 결과일 수 있음
+            if epoch != self._epoch:
+                return
+            current = self._items.get(user_id)
+            # 더 최신 버전이 이미 들어와 있으면 (동시에 조회한 다른 요청) 덮어쓰지 않음
+            if current is not None and current.version > version:
+                return
+            self._remove(user_id)
+            self._items[user_id] = snapshot
+            self._size += len(closet)
+            while self._size > self.max_items:
+                oldest = next(iter(self._items))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, *user_ids):
+        """이 워커에서 옷장을 바꾼 사용자 스냅샷 제거"""
+        with self._lock:
+            self._epoch += 1
+            for user_id in user_ids:
+                if user_id is not None and self._remove(str(user_id)):
+                    self.invalidations += 1
+
+    def clear(self):
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += len(self._items)
+            self._items.clear()
+            self._size = 0
+
+    def _remove(self, user_id):
+        snapshot = self._items.pop(user_id, None)
+        if snapshot is None:
+            return False
+        self._size -= len(snapshot.closet)
+        return True
+
+    def stats(self):
+        """히트/재확인/미스 카운터 (health 체크 등에서 사용)"""
+        with self._lock:
+            total = self.hits + self.revalidations + self.misses
+            return {
+                "users": len(self._items),
+                "items": self._size,
+                "max_items": self.max_items,
+                "ttl_seconds": self.ttl_seconds,
+                "check_interval": self.check_interval,
+                "hits": self.hits,
+                "revalidations": self.revalidations,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.revalidations) / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,431 @@
+import hashlib
+import uuid
+
+import numpy as np
+
+from label_maps import (
+    CATEGORY_MAP,
+    ITEM_TYPE_MAP,
+    COLOR_MAP,
+    STYLE_MAP,
+    MATERIAL_MAP,
+    SEASON_MAP,
+)
+from weather_rules import TEMP_BANDS, SEASON_FIT, MATERIAL_FIT
+
+# ==========================
+# 라벨 사전 (코드 = 리스트 인덱스, len(사전) = 알 수 없음/None)
+# ==========================
+
+LABEL_FIELDS = ("category", "type", "color", "style", "material", "season")
+
+# 기본(하드코딩) 매핑 — DB 라벨 사전을 못 읽을 때도 이 라벨들은 항상 같은 코드
+STATIC_MAPS = {
+    "category": CATEGORY_MAP,
+    "type": ITEM_TYPE_MAP,
+    "color": COLOR_MAP,
+    "style": STYLE_MAP,
+    "material": MATERIAL_MAP,
+    "season": SEASON_MAP,
+}
+# DB 코드값이 UUID 인 필드 (나머지는 정수)
+UUID_FIELDS = ("type", "style", "season")
+
+VOCAB = {field: list(mapping.values()) for field, mapping in STATIC_MAPS.items()}
+UNKNOWN = {field: len(labels) for field, labels in VOCAB.items()}
+LABEL_INDEX = {
+    field: {label: i for i, label in enumerate(labels)}
+    for field, labels in VOCAB.items()
+}
+
+
+def normalize_label(label):
+    """라벨 비교용 정규화 (앞뒤/중복 공백 제거 + 소문자)"""
+    return " ".join(str(label).split()).lower()
+
+
+def _id_keys(field, db_id):
+    """DB 코드값 하나를 조회할 수 있는 키들 (UUID 는 문자열/uuid.UUID, 정수는 int/문자열)"""
+    if field in UUID_FIELDS:
+        value = db_id if isinstance(db_id, uuid.UUID) else uuid.UUID(str(db_id).strip())
+        return value, str(value)
+    value = int(db_id)
+    return value, str(value)
+
+
+class LabelVocabulary:
+    """
+    라벨 사전 스냅샷 (버전 단위로 통째로 교체, 만든 뒤에는 수정하지 않음)
+    - labels[field]: 코드 → 라벨 리스트
+      (label_maps 라벨이 항상 같은 코드, 그 다음 칸 = 알 수 없음, 이후 DB 에만 있는 라벨)
+    - id_to_code[field]: DB 코드값(uuid.UUID/문자열/int) → 라벨 코드
+    - label_to_id[field]: 정규화된 라벨 → DB 코드값 (역방향, 입력 변환용)
+    """
+
+    __slots__ = ("version", "labels", "id_to_code", "label_to_id")
+
+    def __init__(self, version, labels, id_to_code, label_to_id):
+        self.version = version
+        self.labels = labels
+        self.id_to_code = id_to_code
+        self.label_to_id = label_to_id
+
+    @classmethod
+    def from_entries(cls, entries, version=0):
+        """
+        (field, DB 코드값, 라벨) 목록으로 생성 (모르는 field 나 잘못된 코드값은 무시)
+        같은 코드값/라벨이 여러 번 나오면 먼저 나온 항목이 우선
+        """
+        labels = {field: list(VOCAB[field]) + [None] for field in LABEL_FIELDS}
+        index = {
+            field: {normalize_label(label): i for i, label in enumerate(VOCAB[field])}
+            for field in LABEL_FIELDS
+        }
+        id_to_code = {field: {} for field in LABEL_FIELDS}
+        label_to_id = {field: {} for field in LABEL_FIELDS}
+
+        for field, db_id, label in entries:
+            if field not in labels or label is None:
+                continue
+            try:
+                keys = _id_keys(field, db_id)
+            except (TypeError, ValueError):
+                print(f"⚠️ 잘못된 라벨 코드값 무시: {field}={db_id!r}")
+                continue
+            label = " ".join(str(label).split())
+            key = normalize_label(label)
+            code = index[field].get(key)
+            if code is None:
+                # label_maps 에 없는 새 라벨 → 뒤에 추가 (점수 계산에서는 '알 수 없음' 취급)
+                code = index[field][key] = len(labels[field])
+                labels[field].append(label)
+            for k in keys:
+                id_to_code[field].setdefault(k, code)
+            label_to_id[field].setdefault(key, keys[1] if field in UUID_FIELDS else keys[0])
+
+        return cls(version, labels, id_to_code, label_to_id)
+
+    @classmethod
+    def static(cls):
+        """label_maps 하드코딩 매핑으로 만든 기본 사전 (DB 사전을 못 읽을 때 사용)"""
+        return cls.from_entries(
+            (field, db_id, label)
+            for field, mapping in STATIC_MAPS.items()
+            for db_id, label in mapping.items()
+        )
+
+    def code_of(self, field, db_id):
+        return self.id_to_code[field].get(db_id, UNKNOWN[field])
+
+    def label_of(self, field, db_id):
+        code = self.id_to_code[field].get(db_id)
+        return None if code is None else self.labels[field][code]
+
+    def id_of(self, field, label):
+        """라벨 → DB 코드값 (없으면 None)"""
+        if label is None:
+            return None
+        return self.label_to_id[field].get(normalize_label(label))
+
+
+STATIC_VOCABULARY = LabelVocabulary.static()
+
+# DB 코드값 → 라벨 코드 (UUID 컬럼은 ORM 이 돌려주는 uuid.UUID 로도 조회 가능)
+ID_TO_CODE = STATIC_VOCABULARY.id_to_code
+ID_COLUMNS = {
+    "category": "category_id",
+    "type": "item_type_id",
+    "color": "color_id",
+    "style": "style_id",
+    "material": "material_id",
+    "season": "season_id",
+}
+# from_tuples 가 받는 컬럼 순서 (AI 추천 경로에서 필요한 컬럼만)
+ROW_COLUMNS = ("cloth_id", "name", "image_url") + tuple(ID_COLUMNS[f] for f in LABEL_FIELDS)
+
+# 온도 구간별 허용 마스크 (_filter_by_weather 규칙과 동일, 마지막 칸 = 알 수 없음)
+SEASON_OK = np.array(
+    [[label in SEASON_FIT[band] for label in VOCAB["season"]] + [False] for band in TEMP_BANDS],
+    dtype=bool,
+)
+MATERIAL_OK = np.array(
+    [[label in MATERIAL_FIT[band] for label in VOCAB["material"]] + [False] for band in TEMP_BANDS],
+    dtype=bool,
+)
+BAND_INDEX = {band: i for i, band in enumerate(TEMP_BANDS)}
+
+
+class StringColumn:
+    """
+    문자열 컬럼을 UTF-8 바이트 하나 + 오프셋 배열로 압축 저장
+    (dict 마다 str 객체를 따로 들고 있는 것보다 메모리가 훨씬 적음)
+    """
+
+    __slots__ = ("_blob", "_offsets", "_none", "_index")
+
+    def __init__(self, values):
+        encoded = [None if v is None else str(v).encode("utf-8") for v in values]
+        n = len(encoded)
+        self._none = np.fromiter((e is None for e in encoded), dtype=bool, count=n)
+        lengths = np.fromiter((len(e) if e else 0 for e in encoded), dtype=np.uint32, count=n)
+        self._offsets = np.zeros(n + 1, dtype=np.uint32)
+        np.cumsum(lengths, out=self._offsets[1:])
+        self._blob = b"".join(e for e in encoded if e)
+        self._index = None
+
+    def raw(self, i):
+        return self._blob[self._offsets[i]:self._offsets[i + 1]]
+
+    def find(self, value):
+        """값 → 첫 번째 인덱스 (없으면 None), 처음 찾을 때 바이트 → 인덱스 해시를 한 번만 만듦"""
+        if self._index is None:
+            index = {}
+            for i in range(len(self) - 1, -1, -1):
+                if not self._none[i]:
+                    index[self.raw(i)] = i
+            self._index = index
+        return self._index.get(str(value).encode("utf-8"))
+
+    def __getitem__(self, i):
+        if self._none[i]:
+            return None
+        return self.raw(i).decode("utf-8")
+
+    def __len__(self):
+        return len(self._none)
+
+    @property
+    def nbytes(self):
+        return len(self._blob) + self._offsets.nbytes + self._none.nbytes
+
+
+def _uuid_bytes(value):
+    if isinstance(value, uuid.UUID):
+        return value.bytes
+    # DB 에서 text 로 받은 정규 형식은 uuid.UUID 를 거치지 않고 바로 변환
+    value = str(value)
+    if len(value) == 36:
+        return bytes.fromhex(value.replace("-", ""))
+    return uuid.UUID(value).bytes
+
+
+class UUIDColumn:
+    """UUID 컬럼을 16바이트씩 고정 길이로 저장 (StringColumn 과 같은 인터페이스)"""
+
+    __slots__ = ("_data", "_index")
+
+    def __init__(self, values):
+        self._data = b"".join(map(_uuid_bytes, values))
+        self._index = None
+
+    def raw(self, i):
+        return self._data[16 * i:16 * i + 16]
+
+    def find(self, value):
+        """UUID 문자열 → 첫 번째 인덱스 (없거나 UUID 형식이 아니면 None)"""
+        if self._index is None:
+            data = self._data
+            self._index = {data[o:o + 16]: o // 16 for o in range(len(data) - 16, -1, -16)}
+        try:
+            return self._index.get(_uuid_bytes(value))
+        except ValueError:
+            return None
+
+    def __getitem__(self, i):
+        return str(uuid.UUID(bytes=self.raw(i)))
+
+    def __len__(self):
+        return len(self._data) // 16
+
+    @property
+    def nbytes(self):
+        return len(self._data)
+
+
+class ColumnarCloset:
+    """
+    사용자 옷장 1개를 컬럼 배열로 들고 있는 구조
+    - 라벨(category/type/color/style/material/season)은 int16 코드 배열
+    - id 는 UUIDColumn(DB) 또는 StringColumn(dict), name/image_url 은 StringColumn
+    - 날씨 필터/점수 계산은 코드 배열에 대한 numpy 마스크 연산으로 처리
+    - dict 형태는 프롬프트 작성 / API 응답 시점에만 만들어짐 (row, __iter__)
+    """
+
+    def __init__(self, strings, codes, rows, labels=None):
+        self._strings = strings          # {"id"|"name"|"image_url": 문자열 컬럼} (원본 전체)
+        self.codes = codes               # {field: int16 배열} (이 closet 의 행만)
+        self._rows = rows                # 각 행의 문자열 컬럼 인덱스
+        self._labels = labels or VOCAB   # {field: 라벨 리스트} (사전에 없는 라벨 포함 가능)
+        self._band_masks = {}
+
+    # ---------- 생성 ----------
+
+    @classmethod
+    def from_tuples(cls, rows, vocabulary=None):
+        """
+        ROW_COLUMNS 순서의 튜플(Core select 결과 Row 등)에서 바로 생성
+        컬럼 단위로 전치한 뒤 DB 코드값 → 라벨 코드로 변환 (dict 는 만들지 않음)
+        vocabulary 가 없으면 label_maps 기본 사전 사용
+        """
+        vocabulary = vocabulary or STATIC_VOCABULARY
+        rows = list(rows)
+        n = len(rows)
+        columns = list(zip(*rows)) if rows else [()] * len(ROW_COLUMNS)
+        cloth_ids, names, image_urls = columns[:3]
+
+        codes = {}
+        for field, values in zip(LABEL_FIELDS, columns[3:]):
+            lookup = vocabulary.id_to_code[field]
+            unknown = UNKNOWN[field]
+            codes[field] = np.fromiter(
+                (lookup.get(v, unknown) for v in values), dtype=np.int16, count=n
+            )
+        strings = {
+            "id": UUIDColumn(cloth_ids),
+            "name": StringColumn(names),
+            "image_url": StringColumn(image_urls),
+        }
+        return cls(strings, codes, np.arange(n, dtype=np.int32), vocabulary.labels)
+
+    @classmethod
+    def from_rows(cls, rows, vocabulary=None):
+        """clothes_table 행(Cloth ORM 객체 또는 같은 이름의 속성을 가진 객체)에서 생성"""
+        return cls.from_tuples(
+            (tuple(getattr(r, column) for column in ROW_COLUMNS) for r in rows), vocabulary
+        )
+
+    @classmethod
+    def from_dicts(cls, clothes):
+        """get_ai_ready_clothes 형식의 dict 리스트에서 생성"""
+        clothes = list(clothes)
+        n = len(clothes)
+        labels = {field: list(VOCAB[field]) for field in LABEL_FIELDS}
+        codes = {}
+        for field in LABEL_FIELDS:
+            index = dict(LABEL_INDEX[field])
+            field_labels = labels[field]
+            unknown = UNKNOWN[field]
+            field_codes = np.empty(n, dtype=np.int16)
+            for i, item in enumerate(clothes):
+                value = item.get(field)
+                code = index.get(value)
+                if code is None:
+                    if value is None:
+                        code = unknown
+                    else:
+                        # 사전에 없는 라벨은 이 closet 전용으로 뒤에 추가 (점수 계산 시 '알 수 없음' 취급)
+                        if len(field_labels) == unknown:
+                            field_labels.append(None)
+                        code = index[value] = len(field_labels)
+                        field_labels.append(value)
+                field_codes[i] = code
+            codes[field] = field_codes
+        strings = {
+            "id": StringColumn(item.get("id") for item in clothes),
+            "name": StringColumn(item.get("name") for item in clothes),
+            "image_url": StringColumn(item.get("image_url") for item in clothes),
+        }
+        return cls(strings, codes, np.arange(n, dtype=np.int32), labels)
+
+    # ---------- 조회 ----------
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __iter__(self):
+        for i in range(len(self._rows)):
+            yield self.row(i)
+
+    def __getitem__(self, i):
+        return self.row(i)
+
+    def row(self, i):
+        """i 번째 옷을 get_ai_ready_clothes 와 같은 dict 로"""
+        r = self._rows[i]
+        item = {
+            "id": self._strings["id"][r],
+            "name": self._strings["name"][r],
+            "image_url": self._strings["image_url"][r],
+        }
+        for field in LABEL_FIELDS:
+            code = self.codes[field][i]
+            labels = self._labels[field]
+            item[field] = labels[code] if code < len(labels) else None
+        return item
+
+    def to_dicts(self):
+        return list(self)
+
+    def ids(self):
+        """옷 id 리스트 (행 순서대로)"""
+        column = self._strings["id"]
+        return [column[r] for r in self._rows]
+
+    def position(self, item_id):
+        """id → 이 closet 안의 행 번호 (없으면 None, id 해시는 원본 컬럼에 한 번만 만들어서 부분 closet 과 공유)"""
+        r = self._strings["id"].find(item_id)
+        if r is None:
+            return None
+        hits = np.flatnonzero(self._rows == r)
+        return int(hits[0]) if len(hits) else None
+
+    def scoring_codes(self, field):
+        """점수 행렬 인덱스용 코드 (사전에 없는 라벨은 '알 수 없음'으로)"""
+        return np.minimum(self.codes[field], UNKNOWN[field])
+
+    def select(self, selector):
+        """bool 마스크 또는 인덱스 배열로 부분 closet 만들기 (문자열은 복사하지 않음)"""
+        selector = np.asarray(selector)
+        if selector.dtype == bool:
+            selector = np.flatnonzero(selector)
+        codes = {field: values[selector] for field, values in self.codes.items()}
+        return ColumnarCloset(self._strings, codes, self._rows[selector], self._labels)
+
+    # ---------- 날씨 필터 ----------
+
+    def weather_mask(self, band):
+        """온도 구간에 맞는 옷 마스크 (계절 또는 재질이 맞으면 True), 구간별로 한 번만 계산"""
+        mask = self._band_masks.get(band)
+        if mask is None:
+            b = BAND_INDEX[band]
+            mask = (
+                SEASON_OK[b, self.scoring_codes("season")]
+                | MATERIAL_OK[b, self.scoring_codes("material")]
+            )
+            self._band_masks[band] = mask
+        return mask
+
+    # ---------- 캐시 키 / 메모리 ----------
+
+    def fingerprint(self):
+        """옷장 내용 해시 (같은 옷 같은 순서면 같은 값)"""
+        digest = hashlib.sha256()
+        ids = self._strings["id"]
+        names = self._strings["name"]
+        for r in self._rows:
+            digest.update(ids.raw(r))
+            digest.update(b"\x00")
+            digest.update(names.raw(r))
+            digest.update(b"\x01")
+        for field in LABEL_FIELDS:
+            digest.update(self.codes[field].tobytes())
+            extra = self._labels[field][UNKNOWN[field] + 1:]
+            if extra:
+                digest.update("\x00".join(map(str, extra)).encode("utf-8"))
+        return digest.hexdigest()
+
+    @property
+    def nbytes(self):
+        """대략적인 메모리 사용량 (부분 closet 도 원본 문자열 컬럼 크기 포함)"""
+        return (
+            sum(column.nbytes for column in self._strings.values())
+            + sum(values.nbytes for values in self.codes.values())
+            + self._rows.nbytes
+        )
+
+
+def as_columnar(clothes):
+    """dict 리스트 / ColumnarCloset 어느 쪽이 와도 ColumnarCloset 으로"""
+    if isinstance(clothes, ColumnarCloset):
+        return clothes
+    return ColumnarCloset.from_dicts(clothes)
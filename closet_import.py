@@ -0,0 +1,450 @@
+"""
+옷장 데이터 대량 가져오기 (JSON / JSONL / CSV → clothes_table)
+
+- 파일을 한 번에 읽지 않고 스트리밍으로 한 벌씩 읽음
+- 한글 라벨(color: "화이트", type: "셔츠" ...)은 라벨 사전 역방향 매핑으로 id 변환
+  (category/name 이 없으면 종류/색상으로 채움)
+- chunk_size 행씩 Postgres COPY 로 적재 (psycopg2 가 아니면 executemany)
+- 전체가 한 트랜잭션 (중간에 실패하면 아무것도 들어가지 않음)
+
+사용법:
+    python closet_import.py closet.json --user-id <uuid>
+    python closet_import.py clothes.csv --format csv --chunk-size 50000
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import queue
+import re
+import threading
+import time
+from collections import Counter
+from uuid import UUID
+
+from sqlalchemy import insert
+
+from label_maps import TYPE_CATEGORY
+from models import Cloth, engine as default_engine
+
+# COPY / executemany 컬럼 순서
+IMPORT_COLUMNS = (
+    "user_id", "name", "image_url", "category_id", "item_type_id",
+    "color_id", "style_id", "material_id", "season_id",
+)
+# 라벨 필드 → id 컬럼 (파일에 id 컬럼이 있으면 그대로, 없으면 라벨로 변환)
+LABEL_ID_COLUMNS = {
+    "category": "category_id",
+    "type": "item_type_id",
+    "color": "color_id",
+    "style": "style_id",
+    "material": "material_id",
+    "season": "season_id",
+}
+UUID_ID_COLUMNS = {"user_id", "item_type_id", "style_id", "season_id"}
+
+COPY_SQL = (
+    f"COPY {Cloth.__tablename__} ({', '.join(IMPORT_COLUMNS)}) "
+    "FROM STDIN WITH (FORMAT csv)"
+)
+
+FORMATS = ("json", "jsonl", "csv")
+
+
+# ==========================
+# 파일 읽기 (스트리밍)
+# ==========================
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """
+    [ {...}, {...} ] 또는 {"clothes": [ ... ]} 형식을 원소 하나씩 yield
+    (파일 전체를 메모리에 올리지 않음)
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(chunk_size)
+    eof = not buf
+
+    # 배열 시작 위치 찾기
+    while True:
+        stripped = buf.lstrip()
+        if stripped.startswith("["):
+            pos = buf.index("[") + 1
+            break
+        match = re.search(r'"clothes"\s*:\s*\[', buf)
+        if match:
+            pos = match.end()
+            break
+        if eof:
+            raise ValueError('JSON 배열 또는 {"clothes": [...]} 형식이 아닙니다')
+        more = f.read(chunk_size)
+        eof = not more
+        buf += more
+
+    while True:
+        while pos < len(buf) and buf[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buf) and buf[pos] == "]":
+            return
+        if pos < len(buf):
+            try:
+                item, pos = decoder.raw_decode(buf, pos)
+                yield item
+                continue
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+        elif eof:
+            raise ValueError("JSON 배열이 끝나지 않았습니다")
+        # 원소가 잘려 있으면 더 읽어서 이어 붙임
+        more = f.read(chunk_size)
+        eof = not more
+        buf = buf[pos:] + more
+        pos = 0
+
+
+def iter_records(path, fmt=None):
+    """파일 형식에 맞게 옷 dict 를 하나씩 yield (fmt 가 없으면 확장자로 판단)"""
+    fmt = fmt or detect_format(path)
+    if fmt == "json":
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _iter_json_array(f)
+    elif fmt == "jsonl":
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+    elif fmt == "csv":
+        with open(path, "r", encoding="utf-8-sig", newline="") as f:
+            yield from csv.DictReader(f)
+    else:
+        raise ValueError(f"지원하지 않는 형식입니다: {fmt} ({', '.join(FORMATS)})")
+
+
+def detect_format(path):
+    lower = path.lower()
+    if lower.endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if lower.endswith(".csv"):
+        return "csv"
+    return "json"
+
+
+# ==========================
+# 라벨 → id 변환
+# ==========================
+
+class RowMapper:
+    """
+    옷 dict 1개 → IMPORT_COLUMNS 순서의 튜플 (넣을 수 없으면 None)
+    - id 컬럼(color_id 등)이 있으면 그대로, 없으면 라벨(color 등)을 라벨 사전으로 변환
+    - category 가 없으면 종류(type)로, name 이 없으면 "색상 종류" 로 채움
+    - 사전에 없는 라벨은 None 으로 넣고 unknown_labels 에 집계
+    - 라벨/id 는 종류가 많지 않으므로 원본 값별로 변환 결과를 캐시 (UUID 는 정규 문자열로)
+    """
+
+    def __init__(self, vocabulary, user_id=None):
+        self.vocabulary = vocabulary
+        self.user_id = _normalize_id("user_id", user_id) if user_id else None
+        self.unknown_labels = Counter()
+        self.errors = Counter()
+        self._cache = {column: {} for column in IMPORT_COLUMNS}
+        self._derived = {}
+
+    def __call__(self, item):
+        if not isinstance(item, dict):
+            self.errors["객체가 아닌 항목"] += 1
+            return None
+        try:
+            ids = [self._resolve(field, column, item) for field, column in LABEL_ID_COLUMNS.items()]
+            user_id = self._resolve(None, "user_id", item) or self.user_id
+        except ValueError as e:
+            self.errors[str(e)] += 1
+            return None
+
+        category_id, item_type_id, color_id, style_id, material_id, season_id = ids
+        default_category, default_name = self._defaults(item_type_id, color_id)
+
+        name = _clean(item.get("name")) or default_name or _clean(item.get("id"))
+        if not name:
+            self.errors["name 없음"] += 1
+            return None
+
+        return (
+            user_id, str(name), _clean(item.get("image_url")),
+            category_id if category_id is not None else default_category,
+            item_type_id, color_id, style_id, material_id, season_id,
+        )
+
+    def _resolve(self, field, column, item):
+        """id 컬럼 값 또는 라벨 → DB id (캐시)"""
+        raw_id = item.get(column)
+        if raw_id is not None and raw_id != "":
+            cache = self._cache[column]
+            try:
+                return cache[raw_id]
+            except (KeyError, TypeError):
+                pass
+            try:
+                value = _normalize_id(column, raw_id)
+            except (TypeError, ValueError):
+                raise ValueError(f"{column} 형식 오류")
+            if isinstance(raw_id, (str, int)):
+                cache[raw_id] = value
+            return value
+
+        if field is None:
+            return None
+        label = item.get(field)
+        if label is None or label == "":
+            return None
+        cache = self._cache[column]
+        key = ("label", label)
+        try:
+            value = cache[key]
+        except (KeyError, TypeError):
+            value = self.vocabulary.id_of(field, label)
+            if value is not None and column in UUID_ID_COLUMNS:
+                value = str(value)
+            if isinstance(label, (str, int)):
+                cache[key] = value
+        if value is None:
+            self.unknown_labels[f"{field}:{label}"] += 1
+        return value
+
+    def _defaults(self, item_type_id, color_id):
+        """(종류로 정한 category_id, "색상 종류" 이름) (캐시)"""
+        key = (item_type_id, color_id)
+        derived = self._derived.get(key)
+        if derived is None:
+            vocabulary = self.vocabulary
+            type_label = vocabulary.label_of("type", item_type_id) if item_type_id else None
+            color_label = vocabulary.label_of("color", color_id) if color_id is not None else None
+            category_id = (
+                vocabulary.id_of("category", TYPE_CATEGORY[type_label])
+                if type_label in TYPE_CATEGORY else None
+            )
+            name = " ".join(label for label in (color_label, type_label) if label) or None
+            derived = self._derived[key] = (category_id, name)
+        return derived
+
+
+def _normalize_id(column, value):
+    """UUID 컬럼은 정규 UUID 문자열, 나머지는 int (형식이 틀리면 ValueError)"""
+    if column in UUID_ID_COLUMNS:
+        return str(value if isinstance(value, UUID) else UUID(str(value).strip()))
+    if isinstance(value, bool):
+        raise ValueError(column)
+    return int(value)
+
+
+def _clean(value):
+    """CSV 빈 칸 / 공백 문자열은 None"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+# ==========================
+# 적재
+# ==========================
+
+class CopyWriter:
+    """chunk 를 CSV 로 만들어 COPY ... FROM STDIN 한 번으로 적재 (psycopg2 전용)"""
+
+    method = "copy"
+
+    def __init__(self, conn):
+        self._cursor = conn.connection.dbapi_connection.cursor()
+
+    def encode(self, rows):
+        buf = io.StringIO()
+        # None 은 따옴표 없는 빈 칸 → COPY csv 에서 NULL
+        csv.writer(buf).writerows(rows)
+        buf.seek(0)
+        return buf
+
+    def send(self, payload):
+        self._cursor.copy_expert(COPY_SQL, payload)
+
+    def close(self):
+        self._cursor.close()
+
+
+class ExecutemanyWriter:
+    """COPY 를 못 쓰는 드라이버용: chunk 를 INSERT executemany 로 적재"""
+
+    method = "executemany"
+
+    def __init__(self, conn):
+        self._conn = conn
+        self._stmt = insert(Cloth.__table__)
+
+    def encode(self, rows):
+        return [dict(zip(IMPORT_COLUMNS, row)) for row in rows]
+
+    def send(self, payload):
+        self._conn.execute(self._stmt, payload)
+
+    def close(self):
+        pass
+
+
+class PipelinedWriter:
+    """
+    다음 chunk 를 읽고 변환하는 동안 이전 chunk 를 별도 스레드에서 DB 로 보냄
+    (DB I/O 중에는 GIL 이 풀리므로 파싱/변환과 적재가 겹쳐서 진행됨)
+    DB 연결은 이 스레드만 사용
+    """
+
+    def __init__(self, writer, depth=2):
+        self.writer = writer
+        self._queue = queue.Queue(maxsize=depth)
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name="closet-import-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            payload = self._queue.get()
+            if payload is None:
+                return
+            if self._error is None:
+                try:
+                    self.writer.send(payload)
+                except BaseException as e:
+                    self._error = e
+
+    def put(self, rows):
+        if self._error is not None:
+            raise self._error
+        self._queue.put(self.writer.encode(rows))
+
+    def finish(self):
+        """남은 chunk 를 다 보낼 때까지 기다림 (적재 중 에러가 있었으면 다시 raise)"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+
+
+def _make_writer(conn, method):
+    if method == "auto":
+        method = "copy" if conn.dialect.driver == "psycopg2" else "executemany"
+    if method == "copy":
+        return CopyWriter(conn)
+    if method == "executemany":
+        return ExecutemanyWriter(conn)
+    raise ValueError(f"지원하지 않는 적재 방식입니다: {method} (auto, copy, executemany)")
+
+
+def import_file(
+    path,
+    user_id=None,
+    fmt=None,
+    chunk_size=10_000,
+    method="auto",
+    dry_run=False,
+    engine=None,
+    vocabulary=None,
+    progress_seconds=2.0,
+):
+    """
+    파일 하나를 clothes_table 로 가져오기 → 결과 통계 dict
+    dry_run=True 면 변환까지만 하고 DB 에 쓰지 않음
+    """
+    engine = engine or default_engine
+    if vocabulary is None:
+        from closet_repository import ClosetRepository
+        vocabulary = ClosetRepository().get_vocabulary()
+
+    mapper = RowMapper(vocabulary, user_id=user_id)
+    rows = (row for row in map(mapper, iter_records(path, fmt)) if row is not None)
+
+    started = time.perf_counter()
+    last_report = started
+    imported = 0
+
+    def report(final=False):
+        elapsed = time.perf_counter() - started
+        rate = imported / elapsed if elapsed else 0.0
+        mark = "✅" if final else "📦"
+        print(f"{mark} {imported:,}행 {'완료' if final else '처리 중'} ({rate:,.0f} rows/s, {elapsed:.1f}s)")
+        return elapsed, rate
+
+    if dry_run:
+        for _ in rows:
+            imported += 1
+        method_used = "dry-run"
+    else:
+        with engine.begin() as conn:
+            writer = _make_writer(conn, method)
+            method_used = writer.method
+            pipeline = PipelinedWriter(writer)
+            try:
+                while True:
+                    chunk = list(itertools.islice(rows, chunk_size))
+                    if not chunk:
+                        break
+                    pipeline.put(chunk)
+                    imported += len(chunk)
+                    now = time.perf_counter()
+                    if now - last_report >= progress_seconds:
+                        report()
+                        last_report = now
+            finally:
+                # 예외가 나도 스레드가 연결을 다 쓴 뒤에 롤백되도록 먼저 종료를 기다림
+                pipeline.finish()
+                writer.close()
+
+    elapsed, rate = report(final=True)
+    skipped = sum(mapper.errors.values())
+    if skipped:
+        print(f"⚠️ 건너뛴 항목 {skipped:,}개: {dict(mapper.errors)}")
+    if mapper.unknown_labels:
+        print(f"⚠️ 사전에 없는 라벨 (id 없이 저장): {dict(mapper.unknown_labels.most_common(10))}")
+
+    return {
+        "rows": imported,
+        "skipped": skipped,
+        "errors": dict(mapper.errors),
+        "unknown_labels": dict(mapper.unknown_labels),
+        "method": method_used,
+        "elapsed_seconds": round(elapsed, 3),
+        "rows_per_sec": round(rate, 1),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="옷장 파일(JSON/JSONL/CSV)을 clothes_table 로 가져오기")
+    parser.add_argument("path")
+    parser.add_argument("--user-id", help="파일에 user_id 가 없는 행에 넣을 사용자 UUID")
+    parser.add_argument("--format", choices=FORMATS, help="기본값: 확장자로 판단")
+    parser.add_argument("--chunk-size", type=int, default=10_000)
+    parser.add_argument("--method", choices=("auto", "copy", "executemany"), default="auto")
+    parser.add_argument("--dry-run", action="store_true", help="변환만 하고 DB 에 쓰지 않음")
+    args = parser.parse_args()
+
+    if args.user_id:
+        try:
+            UUID(args.user_id)
+        except ValueError:
+            print(f"❌ --user-id 가 올바른 UUID가 아닙니다: {args.user_id}")
+            raise SystemExit(1)
+
+    from models import init_db
+    if not args.dry_run:
+        init_db()
+
+    import_file(
+        args.path,
+        user_id=args.user_id,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        method=args.method,
+        dry_run=args.dry_run,
+    )
@@ -1,16 +1,130 @@
 import json
+import mmap
+import os
+from contextlib import contextmanager
+
+# 저널이 이만큼 쌓이면 스냅샷(closet.json)으로 합치고 저널을 비움
+CLOSET_JOURNAL_COMPACT_EVERY = int(os.environ.get('CLOSET_JOURNAL_COMPACT_EVERY', 1000))
+# 저널 기록마다 fsync (전원 장애까지 대비, 끄면 프로세스가 죽어도 OS 버퍼에는 남음)
+CLOSET_JOURNAL_FSYNC = os.environ.get('CLOSET_JOURNAL_FSYNC', 'false').lower() in ('1', 'true', 'yes')
+# lazy 모드에서 한 번에 디코딩하는 바이트 수 (옷 하나가 이보다 크면 더 읽어서 이어 붙임)
+LAZY_READ_CHUNK = 1 << 16
+
+
+def _scan_jsonl(mm):
+    """JSONL (한 줄에 옷 하나) → (옷, 시작, 끝 바이트 위치) 를 하나씩 yield"""
+    pos, size = 0, len(mm)
+    while pos < size:
+        end = mm.find(b"\n", pos)
+        if end < 0:
+            end = size
+        line = mm[pos:end]
+        if line.strip():
+            yield json.loads(line), pos, end
+        pos = end + 1
+
+
+def _scan_json_array(mm, pos, chunk_size=LAZY_READ_CHUNK):
+    """
+    {"clothes": [ ... ]} 의 배열 부분(pos = '[' 다음)을 원소 하나씩 디코딩
+    → (옷, 시작, 끝 바이트 위치) yield (closet_import._iter_json_array 와 같은 방식, 위치 계산만 추가)
+    """
+    decoder = json.JSONDecoder()
+    size = len(mm)
+    buf, i, eof = "", 0, pos >= size
+
+    while True:
+        # 공백/쉼표는 전부 1바이트 ASCII 라서 글자 수 = 바이트 수
+        start = i
+        while i < len(buf) and buf[i] in " \t\r\n,":
+            i += 1
+        pos += i - start
+        if i < len(buf) and buf[i] == "]":
+            return
+        if i < len(buf):
+            try:
+                item, end = decoder.raw_decode(buf, i)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                nbytes = len(buf[i:end].encode("utf-8"))
+                yield item, pos, pos + nbytes
+                pos += nbytes
+                i = end
+                continue
+        elif eof:
+            raise ValueError("JSON 배열이 끝나지 않았습니다")
+        # 원소가 잘려 있으면 현재 위치부터 더 크게 다시 읽음 (청크 끝에 걸린 멀티바이트 글자는 버려지고 다음에 다시 읽힘)
+        raw = mm[pos:pos + max(chunk_size, 2 * (len(buf) - i) * 4)]
+        eof = pos + len(raw) >= size
+        buf = raw.decode("utf-8", "strict" if eof else "ignore")
+        i = 0
+
 
 class ClosetLoader:
-    def __init__(self, file_path="closet.json"):
+    """
+    JSON 옷장 파일 로더
+    - 메모리에는 id → 옷 dict 인덱스를 유지 (중복 체크 / 수정 / 삭제 O(1), 순서는 파일 순서 유지)
+    - 추가/수정/삭제는 파일 전체를 다시 쓰지 않고 저널(<파일>.journal, JSONL)에 한 줄씩 추가
+    - 저널이 CLOSET_JOURNAL_COMPACT_EVERY 건 쌓이면 스냅샷으로 합침 (임시 파일 → rename 으로 원자적 교체)
+    - 로드할 때 스냅샷 위에 저널을 다시 적용 (중간에 죽어서 잘린 마지막 줄은 버림)
+    - 파일 형식: {"clothes": [...]} JSON 또는 .jsonl/.ndjson (한 줄에 옷 하나)
+
+    lazy=True: 큰 파일용 읽기 전용 모드
+    - 파일을 mmap 으로 열어두고 iter_clothes() 가 앞에서부터 한 벌씩 디코딩 (전체를 메모리에 올리지 않음)
+    - 저널 변경분만 메모리에 두고 읽을 때 덮어씀
+    - index=True 면 get_cloth() 가 사이드카 오프셋 인덱스(<파일>.idx)로 해당 옷만 읽음
+      (인덱스가 없거나 파일보다 오래됐으면 한 번 훑어서 새로 만듦)
+    """
+
+    def __init__(self, file_path="closet.json", compact_every=None, lazy=False, index=False):
         """옷장 파일 로더 초기화"""
         self.file_path = file_path
-        self.data = self.load_file()
-    
+        self.journal_path = file_path + ".journal"
+        self.index_path = file_path + ".idx"
+        self.jsonl = file_path.lower().endswith(('.jsonl', '.ndjson'))
+        self.lazy = lazy
+        self.use_index = index
+        self.compact_every = CLOSET_JOURNAL_COMPACT_EVERY if compact_every is None else compact_every
+        self._meta = {}        # clothes 외의 최상위 키 (그대로 보존)
+        self._clothes = {}     # id -> 옷 dict (lazy 모드에서는 저널 변경분, 삭제는 None)
+        self._journal = None   # 추가 모드로 열어둔 저널 파일
+        self._journal_entries = 0
+        self._batch_depth = 0
+        self._file = None      # lazy 모드: 열어둔 스냅샷 파일 / mmap
+        self._mm = None
+        self._offsets = None   # lazy 모드: id -> [시작, 끝] 바이트 위치
+        self._renamed = {}     # lazy 모드: 수정으로 바뀐 id (이전 id -> 새 id)
+        self.load_file()
+
+    @property
+    def data(self):
+        """파일과 같은 구조 ({"clothes": [...]}, 호출할 때마다 목록을 새로 만듦)"""
+        return {**self._meta, "clothes": list(self.iter_clothes())}
+
     def load_file(self):
-        """JSON 파일 읽기"""
+        """스냅샷 읽고 저널 다시 적용 (lazy 모드면 파일을 매핑만 함)"""
+        self.close()
+        self._meta = {}
+        self._clothes = {}
+        self._offsets = None
+        self._renamed = {}
+        if self.lazy:
+            self._map_file()
+        else:
+            data = self._read_snapshot()
+            self._meta = {k: v for k, v in data.items() if k != 'clothes'}
+            self._clothes = {c['id']: c for c in data.get('clothes', [])}
+        self._journal_entries = self._replay_journal()
+
+    def _read_snapshot(self):
         try:
             with open(self.file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+                if self.jsonl:
+                    data = {"clothes": [json.loads(line) for line in f if line.strip()]}
+                else:
+                    data = json.load(f)
             print(f"✅ 옷장 파일 로드 완료: {self.file_path}")
             return data
         except FileNotFoundError:
@@ -20,79 +134,329 @@ class ClosetLoader:
         except json.JSONDecodeError as e:
             print(f"❌ JSON 형식이 잘못되었습니다: {e}")
             return {"clothes": []}
-    
+
+    def _map_file(self):
+        try:
+            self._file = open(self.file_path, 'rb')
+        except FileNotFoundError:
+            print(f"❌ 파일을 찾을 수 없습니다: {self.file_path}")
+            return
+        # 빈 파일은 mmap 할 수 없음 (옷 0벌로 취급)
+        if os.fstat(self._file.fileno()).st_size:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        print(f"✅ 옷장 파일 매핑 완료 (lazy): {self.file_path}")
+
+    def _scan(self):
+        """스냅샷 파일의 옷을 (옷, 시작, 끝 바이트 위치) 로 하나씩 (저널 적용 전)"""
+        mm = self._mm
+        if mm is None:
+            return
+        if self.jsonl:
+            yield from _scan_jsonl(mm)
+            return
+        key = mm.find(b'"clothes"')
+        start = mm.find(b'[', key) if key >= 0 else -1
+        if start < 0:
+            print(f"❌ {{\"clothes\": [...]}} 형식이 아닙니다: {self.file_path}")
+            return
+        yield from _scan_json_array(mm, start + 1)
+
+    def _replay_journal(self):
+        """저널 적용 → 적용한 줄 수 (잘린 마지막 줄은 파일에서도 잘라냄)"""
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return 0
+
+        applied = 0
+        good_offset = 0
+        with f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    break
+                self._apply(entry)
+                applied += 1
+                good_offset += len(line)
+            truncated = good_offset < f.seek(0, os.SEEK_END)
+
+        if truncated:
+            print(f"⚠️ 저널 끝부분이 손상되어 버림: {self.journal_path} ({good_offset} 바이트까지 사용)")
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(good_offset)
+        if applied:
+            print(f"✅ 저널 {applied}건 적용: {self.journal_path}")
+        return applied
+
+    def _apply(self, entry):
+        """저널 한 줄을 메모리 인덱스에 반영 (같은 줄을 두 번 적용해도 결과가 같음)"""
+        op = entry['op']
+        if op == 'put':
+            self._clothes[entry['id']] = entry['cloth']
+        elif op == 'replace':
+            self._replace(entry['id'], entry['cloth'])
+        elif op == 'delete':
+            if self.lazy:
+                self._clothes[entry['id']] = None
+            else:
+                self._clothes.pop(entry['id'], None)
+
+    def _replace(self, cloth_id, cloth_data):
+        new_id = cloth_data['id']
+        if self.lazy:
+            if new_id != cloth_id:
+                self._clothes[cloth_id] = None
+                self._renamed[cloth_id] = new_id
+            self._clothes[new_id] = cloth_data
+            return
+        if new_id == cloth_id or cloth_id not in self._clothes:
+            # dict 는 같은 키에 다시 넣어도 순서가 그대로
+            self._clothes[new_id] = cloth_data
+            return
+        # id 가 바뀌면 같은 자리에 넣기 위해 순서를 다시 만듦 (드문 경우만 O(n))
+        clothes = {}
+        for key, value in self._clothes.items():
+            if key == cloth_id:
+                clothes[new_id] = cloth_data
+            elif key != new_id:
+                clothes[key] = value
+        self._clothes = clothes
+
+    def _log(self, entry):
+        """저널에 한 줄 추가 (배치 중이면 flush 는 배치 끝에 한 번)"""
+        if self._journal is None:
+            self._journal = open(self.journal_path, 'a', encoding='utf-8')
+        self._journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._journal_entries += 1
+        if self._batch_depth == 0:
+            self._flush()
+
+    def _flush(self):
+        if self._journal is not None:
+            self._journal.flush()
+            if CLOSET_JOURNAL_FSYNC:
+                os.fsync(self._journal.fileno())
+        if self.compact_every and self._journal_entries >= self.compact_every:
+            self.save_file()
+
+    @contextmanager
+    def batch(self):
+        """
+        여러 건 수정을 묶어서 저널 flush / 합치기를 한 번만
+            with loader.batch():
+                for cloth in new_clothes:
+                    loader.add_cloth(cloth)
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if self._batch_depth == 0:
+                self._flush()
+
     def get_all_clothes(self):
-        """모든 옷 가져오기"""
-        clothes = self.data.get('clothes', [])
+        """모든 옷 가져오기 (lazy 모드에서도 전부 읽어서 리스트로 → 큰 파일은 iter_clothes() 사용)"""
+        clothes = list(self.iter_clothes())
         print(f"✅ 총 {len(clothes)}개의 옷 로드")
         return clothes
-    
+
+    def iter_clothes(self):
+        """옷을 하나씩 (lazy 모드면 파일에서 바로 디코딩해서 한 벌씩만 메모리에 둠)"""
+        if not self.lazy:
+            return iter(list(self._clothes.values()))
+        return self._iter_lazy()
+
+    def _iter_lazy(self):
+        changes = self._clothes
+        seen = set()
+        for cloth, _, _ in self._scan():
+            cloth_id = cloth.get('id')
+            if cloth_id in changes:
+                # 저널에서 수정/삭제된 옷 (바뀐 옷은 id 가 바뀌었어도 원래 자리에서 내보냄)
+                if cloth_id in seen:
+                    continue
+                seen.add(cloth_id)
+                cloth = changes[cloth_id]
+                while cloth is None and cloth_id in self._renamed:
+                    cloth_id = self._renamed[cloth_id]
+                    if cloth_id in seen:
+                        break
+                    seen.add(cloth_id)
+                    cloth = changes.get(cloth_id)
+                if cloth is None:
+                    continue
+            yield cloth
+        # 저널로 새로 추가된 옷
+        for cloth_id, cloth in changes.items():
+            if cloth is not None and cloth_id not in seen:
+                yield cloth
+
+    def get_cloth(self, cloth_id):
+        """id 로 옷 하나 가져오기 (없으면 None)"""
+        if not self.lazy or cloth_id in self._clothes:
+            return self._clothes.get(cloth_id)
+        if self.use_index:
+            span = self._load_index().get(cloth_id)
+            return json.loads(self._mm[span[0]:span[1]]) if span else None
+        # 인덱스 없이: 앞에서부터 찾기
+        for cloth, _, _ in self._scan():
+            if cloth.get('id') == cloth_id:
+                return cloth
+        return None
+
+    def build_index(self):
+        """사이드카 오프셋 인덱스 만들기 (id → 스냅샷 파일의 [시작, 끝] 바이트 위치)"""
+        if self._mm is None:
+            self._offsets = {}
+            return self._offsets
+
+        offsets = {cloth.get('id'): (start, end) for cloth, start, end in self._scan()}
+        stat = os.fstat(self._file.fileno())
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(
+                {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "offsets": offsets},
+                f, ensure_ascii=False
+            )
+        os.replace(tmp_path, self.index_path)
+        self._offsets = offsets
+        print(f"✅ 오프셋 인덱스 생성: {self.index_path} ({len(offsets)}개)")
+        return offsets
+
+    def _load_index(self):
+        """사이드카 인덱스 읽기 (크기/수정 시각이 스냅샷과 다르면 새로 만듦)"""
+        if self._offsets is not None:
+            return self._offsets
+        if self._mm is not None:
+            try:
+                with open(self.index_path, 'r', encoding='utf-8') as f:
+                    index = json.load(f)
+                stat = os.fstat(self._file.fileno())
+                if index.get("size") == stat.st_size and index.get("mtime_ns") == stat.st_mtime_ns:
+                    self._offsets = index["offsets"]
+                    return self._offsets
+                print(f"⚠️ 오프셋 인덱스가 파일과 맞지 않아 다시 만듭니다: {self.index_path}")
+            except (FileNotFoundError, ValueError, KeyError):
+                pass
+        return self.build_index()
+
+    def _read_only(self):
+        print(f"❌ lazy 모드는 읽기 전용입니다 (수정하려면 lazy=False 로 열기): {self.file_path}")
+        return False
+
     def add_cloth(self, cloth_data):
-        """옷 추가하고 파일에 저장"""
-        if 'clothes' not in self.data:
-            self.data['clothes'] = []
-        
+        """옷 추가하고 저널에 기록"""
+        if self.lazy:
+            return self._read_only()
+
         # 중복 ID 체크
-        existing_ids = [c['id'] for c in self.data['clothes']]
-        if cloth_data['id'] in existing_ids:
+        if cloth_data['id'] in self._clothes:
             print(f"❌ 이미 존재하는 ID입니다: {cloth_data['id']}")
             return False
-        
-        self.data['clothes'].append(cloth_data)
-        self.save_file()
+
+        self._clothes[cloth_data['id']] = cloth_data
+        self._log({"op": "put", "id": cloth_data['id'], "cloth": cloth_data})
         print(f"✅ 옷 추가 완료: {cloth_data['id']}")
         return True
-    
+
     def delete_cloth(self, cloth_id):
-        """옷 삭제하고 파일에 저장"""
-        if 'clothes' not in self.data:
+        """옷 삭제하고 저널에 기록"""
+        if self.lazy:
+            return self._read_only()
+
+        if not self._clothes:
             print(f"❌ 옷장이 비어있습니다")
             return False
-        
-        original_count = len(self.data['clothes'])
-        
-        self.data['clothes'] = [
-            c for c in self.data['clothes'] if c['id'] != cloth_id
-        ]
-        
-        if len(self.data['clothes']) < original_count:
-            self.save_file()
-            print(f"✅ 옷 삭제 완료: {cloth_id}")
-            return True
-        else:
+
+        if self._clothes.pop(cloth_id, None) is None:
             print(f"❌ 옷을 찾을 수 없습니다: {cloth_id}")
             return False
-    
+
+        self._log({"op": "delete", "id": cloth_id})
+        print(f"✅ 옷 삭제 완료: {cloth_id}")
+        return True
+
     def update_cloth(self, cloth_id, cloth_data):
-        """옷 정보 수정하고 파일에 저장"""
-        if 'clothes' not in self.data:
+        """옷 정보 수정하고 저널에 기록 (같은 자리에 통째로 교체)"""
+        if self.lazy:
+            return self._read_only()
+
+        if not self._clothes:
             print(f"❌ 옷장이 비어있습니다")
             return False
-        
-        for i, cloth in enumerate(self.data['clothes']):
-            if cloth['id'] == cloth_id:
-                self.data['clothes'][i] = cloth_data
-                self.save_file()
-                print(f"✅ 옷 수정 완료: {cloth_id}")
-                return True
-        
-        print(f"❌ 옷을 찾을 수 없습니다: {cloth_id}")
-        return False
-    
+
+        if cloth_id not in self._clothes:
+            print(f"❌ 옷을 찾을 수 없습니다: {cloth_id}")
+            return False
+
+        # 다른 옷의 ID 로 바꾸면 그 옷이 사라지므로 add_cloth 처럼 거부
+        new_id = cloth_data['id']
+        if new_id != cloth_id and new_id in self._clothes:
+            print(f"❌ 이미 존재하는 ID입니다: {new_id}")
+            return False
+
+        self._replace(cloth_id, cloth_data)
+        self._log({"op": "replace", "id": cloth_id, "cloth": cloth_data})
+        print(f"✅ 옷 수정 완료: {cloth_id}")
+        return True
+
     def save_file(self):
-        """변경사항을 파일에 저장"""
+        """
+        현재 상태를 스냅샷으로 저장하고 저널 비우기
+        임시 파일에 쓰고 fsync 한 뒤 rename 하므로 중간에 죽어도 이전 스냅샷 + 저널이 그대로 남음
+        (rename 후 저널을 비우기 전에 죽으면 다음 로드 때 저널이 한 번 더 적용되지만 결과는 같음)
+        """
+        if self.lazy:
+            return self._read_only()
+
+        tmp_path = f"{self.file_path}.tmp"
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                if self.jsonl:
+                    for cloth in self._clothes.values():
+                        f.write(json.dumps(cloth, ensure_ascii=False) + "\n")
+                else:
+                    json.dump(self.data, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
+
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            with open(self.journal_path, 'w', encoding='utf-8'):
+                pass
+            self._journal_entries = 0
             print(f"✅ 파일 저장 완료: {self.file_path}")
             return True
         except Exception as e:
             print(f"❌ 파일 저장 실패: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
             return False
-    
+
+    def close(self):
+        """열어둔 저널 / 매핑한 파일 닫기 (스냅샷으로 합치지는 않음)"""
+        if self._journal is not None:
+            self._journal.flush()
+            self._journal.close()
+            self._journal = None
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
     def reload(self):
         """파일 다시 읽기 (외부에서 수정된 경우)"""
-        self.data = self.load_file()
+        self.load_file()
 
 
 # 테스트 코드
@@ -126,4 +490,16 @@ if __name__ == "__main__":
     # 추가 확인
     print("\n=== 추가 후 옷장 ===")
     clothes = loader.get_all_clothes()
-    print(f"총 {len(clothes)}개")
\ No newline at end of file
+    print(f"총 {len(clothes)}개")
+    loader.close()
+
+    # 큰 옷장 파일: lazy 모드로 한 벌씩 읽어서 날씨 필터에 바로 흘려보내기
+    print("\n=== lazy 모드 스트리밍 필터 테스트 ===")
+    from fashion_ai import iter_filter_by_weather
+
+    lazy_loader = ClosetLoader("closet.json", lazy=True, index=True)
+    for temp in (5, 18, 28):
+        count = sum(1 for _ in iter_filter_by_weather(lazy_loader.iter_clothes(), {"temp": temp}))
+        print(f"- {temp}도에 입을 수 있는 옷: {count}개")
+    print(f"- cloth_001: {lazy_loader.get_cloth('cloth_001')}")
+    lazy_loader.close()
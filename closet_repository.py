@@ -1,116 +1,208 @@
+import base64
+import json
+from datetime import datetime
 from uuid import UUID as UUID_type
-from typing import List, Optional, Dict, Any
-from models import SessionLocal, Cloth, cloth_to_dict, cloth_list_to_dicts
-
-# ==========================
-# 하드코딩 매핑 딕셔너리들
-# ==========================
-
-STYLE_MAP = {
-    "019b12e5-5d25-747c-987a-623b4f0b7b34": "캐쥬얼",
-    "019b12f9-b0be-796e-a3b0-10384f5bbbb1": "포멀",
-    "019b12f9-b0be-762f-b649-b9262eaad902": "데일리",
-    "019b12f9-b0be-74b1-ac7c-99e345d0aae7": "스트릿",
-    "019b12f9-b0be-7fe8-84e9-b4434ebab581": "러블리",
-    "019b12f9-b0be-74b9-b7b2-8a1443a4fb0c": "미니멀",
-}
-
-SEASON_MAP = {
-    "019b12e6-17b4-72b3-a11b-c01e79f49561": "여름",
-    "019b12f8-e445-7d91-ab93-c7bfbbb20ae7": "봄",
-    "019b12f8-e445-72cf-a22b-32aa8a4ec4e1": "가을",
-    "019b12f8-e445-7e63-b3ab-510ebe0e49b5": "겨울",
-    "019b12f8-e445-7d18-b36c-fa95a1d2ab48": "사계절",
-}
-
-ITEM_TYPE_MAP = {
-    "019b12e6-8b94-7674-9969-c5e5d6b5ff4c": "셔츠",
-    "019b12fc-3066-74b8-8f79-982f1c5fdcb0": "티셔츠",
-    "019b12fc-3067-783d-be58-a331c3d99062": "맨투맨",
-    "019b12fc-3067-766b-a80c-b5544142ce43": "후드",
-    "019b12fc-3067-7943-8a7a-26f380619cf4": "바지",
-    "019b12fc-3067-780f-b9f7-404fb1ee8777": "치마",
-    "019b12fc-3067-7e07-9519-f0bfadbb309f": "반바지",
-    "019b12fc-3067-704f-aace-60bc275b6f72": "패딩",
-    "019b12fc-3067-75ab-8f9d-a4d79cca44b1": "자켓",
-    "019b12fc-3067-7ebe-9889-bd9a74d6859d": "원피스",
-    "019b12fc-3067-7e17-9d90-0bb5fc810e19": "스니커즈",
-    "019b12fc-3067-7fec-9339-ce75dd423964": "구두",
-    "019b12fc-3067-7ffa-9f64-4e2bc6384266": "부츠",
-}
-
-COLOR_MAP = {
-    1: "화이트",
-    2: "블랙",
-    3: "블루",
-    4: "네이비",
-    5: "핑크",
-    6: "레드",
-    7: "퍼플",
-    8: "베이지",
-}
-
-MATERIAL_MAP = {
-    1: "면",
-    2: "니트",
-    3: "데님",
-    4: "폴리",
-    5: "린넨",
-    6: "패딩",
-    7: "스웨이드",
-    8: "레더",
-}
-
-# category_id: 4:상의, 5:하의, 6:신발, 7:아우터
-CATEGORY_MAP = {
-    4: "상의",
-    5: "하의",
-    6: "신발",
-    7: "아우터",
-}
+from typing import List, Optional, Dict, Any, Iterator
+from sqlalchemy import (
+    select, insert, update, delete, values, column, bindparam, tuple_, func, text, cast, any_, Text,
+)
+from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from models import (
+    SessionLocal, Cloth, cloth_to_dict, cloth_list_to_dicts, get_session, get_async_session,
+)
+from label_maps import (
+    STYLE_MAP,
+    SEASON_MAP,
+    ITEM_TYPE_MAP,
+    COLOR_MAP,
+    MATERIAL_MAP,
+    CATEGORY_MAP,
+)
+from closet_columns import ColumnarCloset, LabelVocabulary, ROW_COLUMNS
+from lookup_tables import LookupCache
+from closet_cache import ClosetSnapshotCache
+
+
+# AI 추천 경로용 Core 테이블/컬럼 (ColumnarCloset.from_tuples 컬럼 순서와 동일)
+# UUID 컬럼은 text 로 받아서 행마다 uuid.UUID 객체를 만들지 않음 (라벨 사전은 문자열 키도 지원)
+CLOTHES_TABLE = Cloth.__table__
+AI_COLUMNS = [
+    cast(CLOTHES_TABLE.c[name], Text).label(name)
+    if isinstance(CLOTHES_TABLE.c[name].type, UUID) else CLOTHES_TABLE.c[name]
+    for name in ROW_COLUMNS
+]
+
+# 사용자 옷장 버전 (마이그레이션 3 의 트리거가 clothes_table 변경마다 증가)
+CLOSET_VERSION_SQL = text("SELECT version FROM closet_versions WHERE user_id = :user_id")
+
+# 일괄 추가/수정에서 쓸 수 있는 컬럼 (cloth_id / created_at 은 DB 기본값)
+BULK_COLUMNS = (
+    "name", "image_url", "user_id", "category_id", "style_id",
+    "season_id", "item_type_id", "color_id", "material_id",
+)
+
+
+def encode_cursor(created_at: datetime, cloth_id) -> str:
+    """페이지네이션 커서: 마지막 행의 (created_at, cloth_id) 를 URL-safe 문자열로"""
+    raw = json.dumps([created_at.isoformat(), str(cloth_id)])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """encode_cursor 의 역변환 (형식이 잘못되면 ValueError)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, cloth_id = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(created_at), UUID_type(cloth_id)
+    except Exception:
+        raise ValueError("잘못된 cursor 입니다")
 
 
 class ClosetRepository:
     """
     clothes_table 에 대한 CRUD를 담당하는 레이어
     항상 JSON 직렬화 가능한 dict만 반환하도록 통일
+    세션은 get_session() 으로 가져옴 (요청 스코프 세션이 있으면 요청 안의 호출끼리 공유)
     """
 
+    def __init__(self):
+        # 코드값 → 라벨 사전 (lookup_labels 테이블, 버전이 바뀔 때만 다시 읽음)
+        self.lookups = LookupCache(self._load_lookup_version, self._load_lookup_entries)
+        # 사용자별 AI 추천용 옷장 스냅샷 (추가/수정/삭제 시 무효화, 다른 워커 변경은 closet_versions 로 감지)
+        self.snapshots = ClosetSnapshotCache()
+
     # ====== 여기부터 기존 코드 그대로 ======
 
     def get_all_clothes(self) -> Dict[str, Any]:
+        with get_session() as session:
+            try:
+                clothes: List[Cloth] = session.query(Cloth).all()
+                return {
+                    "success": True,
+                    "data": cloth_list_to_dicts(clothes)
+                }
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
+
+    def count_clothes(self) -> Dict[str, Any]:
+        """전체 옷 개수 (행 데이터는 가져오지 않음)"""
+        with get_session() as session:
+            try:
+                count = session.execute(select(func.count()).select_from(Cloth)).scalar_one()
+                return {"success": True, "data": count}
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
+
+    def ping(self, timeout_ms: int = 1000) -> Dict[str, Any]:
+        """DB 연결 확인용 SELECT 1 (statement_timeout 적용, 요청 세션과 분리된 독립 세션)"""
         session = SessionLocal()
         try:
-            clothes: List[Cloth] = session.query(Cloth).all()
-            return {
-                "success": True,
-                "data": cloth_list_to_dicts(clothes)
-            }
+            # SET LOCAL 과 같음 (트랜잭션 안에서만 적용, bind 파라미터 사용 가능)
+            session.execute(
+                text("SELECT set_config('statement_timeout', :ms, true)"),
+                {"ms": str(int(timeout_ms))}
+            )
+            session.execute(text("SELECT 1"))
+            session.rollback()
+            return {"success": True, "data": None}
         except Exception as e:
             session.rollback()
             return {"success": False, "error": str(e)}
         finally:
             session.close()
 
+    def _page_query(self, user_id: Optional[str], cursor: Optional[str]):
+        """(created_at, cloth_id) 순 keyset 쿼리 (cursor 이후 행만)"""
+        stmt = select(Cloth)
+        if user_id:
+            stmt = stmt.where(Cloth.user_id == UUID_type(str(user_id)))
+        if cursor:
+            created_at, cloth_id = decode_cursor(cursor)
+            stmt = stmt.where(
+                tuple_(Cloth.created_at, Cloth.cloth_id) > tuple_(created_at, cloth_id)
+            )
+        return stmt.order_by(Cloth.created_at, Cloth.cloth_id)
+
+    def get_clothes_page(
+        self,
+        user_id: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        keyset 페이지네이션 조회
+        - limit 개까지 + 다음 페이지가 있으면 next_cursor (없으면 None)
+        - OFFSET 을 쓰지 않으므로 뒤 페이지로 가도 비용이 일정함
+        """
+        with get_session() as session:
+            try:
+                stmt = self._page_query(user_id, cursor).limit(limit + 1)
+                clothes: List[Cloth] = list(session.execute(stmt).scalars())
+
+                next_cursor = None
+                if len(clothes) > limit:
+                    clothes = clothes[:limit]
+                    last = clothes[-1]
+                    next_cursor = encode_cursor(last.created_at, last.cloth_id)
+
+                return {
+                    "success": True,
+                    "data": cloth_list_to_dicts(clothes),
+                    "next_cursor": next_cursor,
+                }
+            except ValueError as e:
+                return {"success": False, "error": "INVALID_ARGUMENT", "message": str(e)}
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
+
+    def iter_clothes(
+        self,
+        user_id: Optional[str] = None,
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        서버 사이드 커서로 batch_size 행씩 가져오면서 dict 를 하나씩 yield
+        (전체 테이블을 메모리에 올리지 않음)
+        인자 오류(user_id/cursor 형식)는 첫 행을 가져오기 전에 ValueError 로 올라감
+        """
+        stmt = self._page_query(user_id, cursor)
+        if limit:
+            stmt = stmt.limit(limit)
+        stmt = stmt.execution_options(yield_per=batch_size)
+
+        def rows():
+            # 스트리밍 동안 커넥션을 오래 잡으므로 요청 세션과 분리된 독립 세션 사용
+            session = SessionLocal()
+            try:
+                for cloth in session.execute(stmt).scalars():
+                    yield cloth_to_dict(cloth)
+            finally:
+                session.close()
+
+        return rows()
+
     def get_cloth_by_id(self, cloth_id: str) -> Dict[str, Any]:
-        session = SessionLocal()
-        try:
-            cloth = session.query(Cloth).filter(
-                Cloth.cloth_id == cloth_id
-            ).first()
+        with get_session() as session:
+            try:
+                cloth = session.query(Cloth).filter(
+                    Cloth.cloth_id == cloth_id
+                ).first()
 
-            if not cloth:
-                return {"success": False, "error": "NOT_FOUND"}
+                if not cloth:
+                    return {"success": False, "error": "NOT_FOUND"}
 
-            return {
-                "success": True,
-                "data": cloth_to_dict(cloth)
-            }
-        except Exception as e:
-            session.rollback()
-            return {"success": False, "error": str(e)}
-        finally:
-            session.close()
+                return {
+                    "success": True,
+                    "data": cloth_to_dict(cloth)
+                }
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
 
     def add_cloth(
         self,
@@ -124,80 +216,266 @@ class ClosetRepository:
         color_id: Optional[int] = None,
         material_id: Optional[int] = None,
     ) -> Dict[str, Any]:
-        session = SessionLocal()
-        try:
-            cloth = Cloth(
-                name=name,
-                image_url=image_url,
-                user_id=user_id,
-                category_id=category_id,
-                style_id=style_id,
-                season_id=season_id,
-                item_type_id=item_type_id,
-                color_id=color_id,
-                material_id=material_id,
-            )
-            session.add(cloth)
-            session.commit()
-            session.refresh(cloth)
-            return {
-                "success": True,
-                "data": cloth_to_dict(cloth)
-            }
-        except Exception as e:
-            session.rollback()
-            return {"success": False, "error": str(e)}
-        finally:
-            session.close()
+        with get_session() as session:
+            try:
+                cloth = Cloth(
+                    name=name,
+                    image_url=image_url,
+                    user_id=user_id,
+                    category_id=category_id,
+                    style_id=style_id,
+                    season_id=season_id,
+                    item_type_id=item_type_id,
+                    color_id=color_id,
+                    material_id=material_id,
+                )
+                session.add(cloth)
+                session.commit()
+                session.refresh(cloth)
+                self.snapshots.invalidate(cloth.user_id)
+                return {
+                    "success": True,
+                    "data": cloth_to_dict(cloth)
+                }
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
 
     def update_cloth(
         self,
         cloth_id: str,
         **fields
     ) -> Dict[str, Any]:
-        session = SessionLocal()
-        try:
-            cloth = session.query(Cloth).filter(
-                Cloth.cloth_id == cloth_id
-            ).first()
-            if not cloth:
-                return {"success": False, "error": "NOT_FOUND"}
-
-            for key, value in fields.items():
-                if hasattr(cloth, key) and value is not None:
-                    setattr(cloth, key, value)
-
-            session.commit()
-            session.refresh(cloth)
-            return {
-                "success": True,
-                "data": cloth_to_dict(cloth)
-            }
-        except Exception as e:
-            session.rollback()
-            return {"success": False, "error": str(e)}
-        finally:
-            session.close()
+        with get_session() as session:
+            try:
+                cloth = session.query(Cloth).filter(
+                    Cloth.cloth_id == cloth_id
+                ).first()
+                if not cloth:
+                    return {"success": False, "error": "NOT_FOUND"}
+                previous_user_id = cloth.user_id
+
+                for key, value in fields.items():
+                    if hasattr(cloth, key) and value is not None:
+                        setattr(cloth, key, value)
+
+                session.commit()
+                session.refresh(cloth)
+                self.snapshots.invalidate(previous_user_id, cloth.user_id)
+                return {
+                    "success": True,
+                    "data": cloth_to_dict(cloth)
+                }
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
 
     def delete_cloth(self, cloth_id: str) -> Dict[str, Any]:
-        session = SessionLocal()
+        with get_session() as session:
+            try:
+                cloth = session.query(Cloth).filter(
+                    Cloth.cloth_id == cloth_id
+                ).first()
+                if not cloth:
+                    return {"success": False, "error": "NOT_FOUND"}
+
+                user_id = cloth.user_id
+                session.delete(cloth)
+                session.commit()
+                self.snapshots.invalidate(user_id)
+                return {"success": True, "data": None}
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
+
+    # ====== 일괄 처리 (한 트랜잭션, 요청 순서대로 결과) ======
+
+    def add_clothes_bulk(self, items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        여러 벌을 INSERT ... RETURNING 한 번으로 추가 (전부 성공 또는 전부 롤백)
+        items: 검증/형변환이 끝난 컬럼 dict 리스트 (name 필수)
+        data: 추가된 옷 dict 리스트 (items 순서)
+        """
+        if not items:
+            return {"success": True, "data": []}
+
+        # executemany 는 모든 행의 키가 같아야 하므로 빠진 컬럼은 None
+        params = [{column: item.get(column) for column in BULK_COLUMNS} for item in items]
+        with get_session() as session:
+            try:
+                rows = session.execute(
+                    insert(CLOTHES_TABLE).returning(
+                        *CLOTHES_TABLE.c, sort_by_parameter_order=True
+                    ),
+                    params,
+                ).all()
+                session.commit()
+                self.snapshots.invalidate(*{row.user_id for row in rows})
+                return {"success": True, "data": cloth_list_to_dicts(rows)}
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
+
+    def update_clothes_bulk(self, updates: List[tuple]) -> Dict[str, Any]:
+        """
+        여러 벌 수정: 바꾸는 필드 조합이 같은 것끼리 묶어서
+        UPDATE ... FROM (VALUES ...) 한 번씩 실행 (한 트랜잭션)
+        updates: [(cloth_id, {필드: 값})]  (값이 None 인 필드는 update_cloth 처럼 무시)
+        data: updates 순서대로 수정된 옷 dict, 없는 cloth_id 는 None
+        """
+        groups: Dict[tuple, List[int]] = {}
+        for i, (_, fields) in enumerate(updates):
+            names = tuple(sorted(k for k, v in fields.items() if k in BULK_COLUMNS and v is not None))
+            groups.setdefault(names, []).append(i)
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(updates)
+        changed_users = set()
+        with get_session() as session:
+            try:
+                for names, indexes in groups.items():
+                    if not names:
+                        # 바꿀 값이 없으면 현재 행만 조회
+                        ids = [updates[i][0] for i in indexes]
+                        rows = session.execute(
+                            select(CLOTHES_TABLE).where(CLOTHES_TABLE.c.cloth_id.in_(ids))
+                        ).all()
+                    else:
+                        data = values(
+                            column("cloth_id", CLOTHES_TABLE.c.cloth_id.type),
+                            *(column(name, CLOTHES_TABLE.c[name].type) for name in names),
+                            name="v",
+                        ).data([
+                            (updates[i][0], *(updates[i][1][name] for name in names))
+                            for i in indexes
+                        ])
+                        rows = session.execute(
+                            update(CLOTHES_TABLE)
+                            .where(CLOTHES_TABLE.c.cloth_id == data.c.cloth_id)
+                            .values({name: data.c[name] for name in names})
+                            .returning(*CLOTHES_TABLE.c)
+                        ).all()
+
+                    by_id = {row.cloth_id: row for row in rows}
+                    changed_users.update(row.user_id for row in rows)
+                    for i in indexes:
+                        row = by_id.get(updates[i][0])
+                        results[i] = cloth_to_dict(row) if row is not None else None
+                session.commit()
+                if any("user_id" in names for names in groups):
+                    # 옷 주인이 바뀌면 이전 사용자를 알 수 없으므로 전체 무효화
+                    self.snapshots.clear()
+                else:
+                    self.snapshots.invalidate(*changed_users)
+                return {"success": True, "data": results}
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
+
+    def delete_clothes_bulk(self, cloth_ids: List[UUID_type]) -> Dict[str, Any]:
+        """
+        여러 벌을 DELETE ... WHERE cloth_id = ANY(...) 한 번으로 삭제
+        data: cloth_ids 순서대로 삭제 여부 (없던 id 는 False)
+        """
+        if not cloth_ids:
+            return {"success": True, "data": []}
+
+        with get_session() as session:
+            try:
+                ids = bindparam("cloth_ids", list(cloth_ids), type_=ARRAY(CLOTHES_TABLE.c.cloth_id.type))
+                rows = session.execute(
+                    delete(CLOTHES_TABLE)
+                    .where(CLOTHES_TABLE.c.cloth_id == any_(ids))
+                    .returning(CLOTHES_TABLE.c.cloth_id, CLOTHES_TABLE.c.user_id)
+                ).all()
+                session.commit()
+                self.snapshots.invalidate(*{row.user_id for row in rows})
+                deleted = {row.cloth_id for row in rows}
+                return {"success": True, "data": [cloth_id in deleted for cloth_id in cloth_ids]}
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
+
+    # ====== 라벨 사전 ======
+
+    def _load_lookup_version(self) -> int:
+        with get_session() as session:
+            try:
+                return session.execute(
+                    text("SELECT version FROM lookup_version WHERE id = 1")
+                ).scalar_one()
+            except Exception:
+                session.rollback()
+                raise
+
+    def _load_lookup_entries(self) -> List[tuple]:
+        with get_session() as session:
+            try:
+                rows = session.execute(text("SELECT kind, code, label FROM lookup_labels"))
+                return [tuple(row) for row in rows]
+            except Exception:
+                session.rollback()
+                raise
+
+    def get_vocabulary(self) -> LabelVocabulary:
+        """현재 라벨 사전 (id ↔ 라벨 양방향)"""
+        return self.lookups.get()
+
+    def get_user_ids(self) -> Dict[str, Any]:
+        """옷이 한 벌이라도 있는 사용자 id 목록 (야간 배치 등 오프라인 작업용)"""
+        with get_session() as session:
+            try:
+                user_ids = session.execute(
+                    select(CLOTHES_TABLE.c.user_id)
+                    .where(CLOTHES_TABLE.c.user_id.isnot(None))
+                    .distinct()
+                    .order_by(CLOTHES_TABLE.c.user_id)
+                ).scalars()
+                return {"success": True, "data": [str(user_id) for user_id in user_ids]}
+            except Exception as e:
+                session.rollback()
+                return {"success": False, "error": str(e)}
+
+    # ====== 여기서부터 AI용 메서드 추가 ======
+
+    def _load_closet_version(self, session, user_id: str) -> Optional[int]:
+        """closet_versions 의 사용자 옷장 버전 (행이 없으면 0, 읽을 수 없으면 None → 캐시 안 함)"""
         try:
-            cloth = session.query(Cloth).filter(
-                Cloth.cloth_id == cloth_id
-            ).first()
-            if not cloth:
-                return {"success": False, "error": "NOT_FOUND"}
-
-            session.delete(cloth)
-            session.commit()
-            return {"success": True, "data": None}
-        except Exception as e:
+            version = session.execute(CLOSET_VERSION_SQL, {"user_id": user_id}).scalar_one_or_none()
+        except Exception:
             session.rollback()
-            return {"success": False, "error": str(e)}
-        finally:
-            session.close()
+            return None
+        return version or 0
 
-    # ====== 여기서부터 AI용 메서드 추가 ======
+    def get_ai_ready_closet(self, user_id: str) -> ColumnarCloset:
+        """
+        AI 추천용: 특정 사용자 옷장을 컬럼 배열(ColumnarCloset)로 리턴
+        코드값 → 라벨 코드 변환만 하고 dict 는 만들지 않음 (라벨 사전은 lookup_labels 기준)
+        (cloth_id 순으로 정렬해서 같은 옷장이면 항상 같은 순서/캐시 키)
+        추천마다 실행되므로 ORM 객체를 만들지 않고 필요한 컬럼만 Core select 로 튜플 조회
+        스냅샷 캐시가 최근에 확인됐으면 DB 조회 없이, 아니면 버전만 확인하고 같으면 캐시 사용
+        """
+        vocabulary = self.lookups.get()
+        key = str(user_id)
+        snapshot, fresh = self.snapshots.get(key, vocabulary.version)
+        if fresh:
+            return snapshot.closet
+
+        epoch = self.snapshots.epoch()
+        with get_session() as session:
+            # 버전을 먼저 읽어야 옷장 조회 사이에 바뀐 경우 다음 확인에서 다시 조회됨
+            version = self._load_closet_version(session, key)
+            if snapshot is not None and version == snapshot.version:
+                self.snapshots.confirm(key, snapshot)
+                return snapshot.closet
+
+            rows = session.execute(
+                select(*AI_COLUMNS)
+                .where(CLOTHES_TABLE.c.user_id == user_id)
+                .order_by(CLOTHES_TABLE.c.cloth_id)
+            ).all()
+            closet = ColumnarCloset.from_tuples(rows, vocabulary)
+        self.snapshots.put(key, closet, version, vocabulary.version, epoch)
+        return closet
 
     def get_ai_ready_clothes(self, user_id: str) -> List[Dict[str, Any]]:
         """
@@ -216,29 +494,79 @@ class ClosetRepository:
           }, ...
         ]
         """
-        session = SessionLocal()
+        return self.get_ai_ready_closet(user_id).to_dicts()
+
+
+class AsyncClosetRepository:
+    """
+    AI 추천 경로용 비동기 조회 (asgi_server 용, AsyncSession + asyncpg)
+    라벨 사전 / 옷장 스냅샷 캐시는 동기 ClosetRepository 와 같은 것을 같이 사용
+    """
+
+    def __init__(self, lookups: Optional[LookupCache] = None,
+                 snapshots: Optional[ClosetSnapshotCache] = None):
+        if lookups is None or snapshots is None:
+            repository = ClosetRepository()
+            lookups = lookups if lookups is not None else repository.lookups
+            snapshots = snapshots if snapshots is not None else repository.snapshots
+        self.lookups = lookups
+        self.snapshots = snapshots
+
+    async def _load_lookup_version(self) -> int:
+        async with get_async_session() as session:
+            result = await session.execute(text("SELECT version FROM lookup_version WHERE id = 1"))
+            return result.scalar_one()
+
+    async def _load_lookup_entries(self) -> List[tuple]:
+        async with get_async_session() as session:
+            result = await session.execute(text("SELECT kind, code, label FROM lookup_labels"))
+            return [tuple(row) for row in result]
+
+    async def get_vocabulary(self) -> LabelVocabulary:
+        return await self.lookups.get_async(self._load_lookup_version, self._load_lookup_entries)
+
+    async def _load_closet_version(self, session, user_id: str) -> Optional[int]:
         try:
-            clothes: List[Cloth] = (
-                session.query(Cloth)
-                .filter(Cloth.user_id == user_id)
-                .all()
+            result = await session.execute(CLOSET_VERSION_SQL, {"user_id": user_id})
+        except Exception:
+            await session.rollback()
+            return None
+        return result.scalar_one_or_none() or 0
+
+    async def get_ai_ready_closet(self, user_id: str) -> ColumnarCloset:
+        """ClosetRepository.get_ai_ready_closet 과 같은 결과 (커넥션은 조회 동안만 사용)"""
+        vocabulary = await self.get_vocabulary()
+        key = str(user_id)
+        snapshot, fresh = self.snapshots.get(key, vocabulary.version)
+        if fresh:
+            return snapshot.closet
+
+        epoch = self.snapshots.epoch()
+        async with get_async_session() as session:
+            version = await self._load_closet_version(session, key)
+            if snapshot is not None and version == snapshot.version:
+                self.snapshots.confirm(key, snapshot)
+                return snapshot.closet
+
+            result = await session.execute(
+                select(*AI_COLUMNS)
+                .where(CLOTHES_TABLE.c.user_id == user_id)
+                .order_by(CLOTHES_TABLE.c.cloth_id)
             )
+            closet = ColumnarCloset.from_tuples(result.all(), vocabulary)
+        self.snapshots.put(key, closet, version, vocabulary.version, epoch)
+        return closet
 
-            result: List[Dict[str, Any]] = []
-            for c in clothes:
-                result.append(
-                    {
-                        "id": str(c.cloth_id),
-                        "name": c.name,
-                        "image_url": c.image_url,
-                        "category": CATEGORY_MAP.get(c.category_id),
-                        "type": ITEM_TYPE_MAP.get(c.item_type_id),
-                        "color": COLOR_MAP.get(c.color_id),
-                        "style": STYLE_MAP.get(c.style_id),
-                        "material": MATERIAL_MAP.get(c.material_id),
-                        "season": SEASON_MAP.get(c.season_id),
-                    }
+    async def ping(self, timeout_ms: int = 1000) -> Dict[str, Any]:
+        """DB 연결 확인용 SELECT 1 (statement_timeout 적용)"""
+        try:
+            async with get_async_session() as session:
+                await session.execute(
+                    text("SELECT set_config('statement_timeout', :ms, true)"),
+                    {"ms": str(int(timeout_ms))}
                 )
-            return result
-        finally:
-            session.close()
\ No newline at end of file
+                await session.execute(text("SELECT 1"))
+                await session.rollback()
+            return {"success": True, "data": None}
+        except Exception as e:
+            return {"success": False, "error": str(e)}
@@ -1,19 +1,273 @@
-import anthropic
+import copy
 import json
 import os
+import numpy as np
 from dotenv import load_dotenv
 
+from closet_columns import ColumnarCloset, as_columnar
+from llm_transport import make_async_client, make_client
+from local_stylist import LocalOutfitEngine, SLOT_CATEGORY_CODE
+from outfit_validator import OutfitValidator
+from recommendation_cache import RecommendationCache
+from singleflight import SingleFlight
+from stream_parser import SlotStreamParser
+from weather_rules import MATERIAL_FIT, SEASON_FIT, temperature_band
+
+# iter_filter_by_weather 가 한 번에 거르는 옷 개수
+WEATHER_FILTER_CHUNK = 4096
+
+# 구조화 출력용 도구 스키마 (슬롯 하나 / 코디 하나)
+_SLOT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "item_id": {"type": ["string", "null"], "description": "옷 목록에 주어진 ID 그대로 (선택 안 하면 null)"},
+        "name": {"type": ["string", "null"]},
+        "reason": {"type": ["string", "null"], "description": "선택한 이유 한 문장"},
+    },
+    "required": ["item_id", "name", "reason"],
+}
+_OUTFIT_PROPERTIES = {
+    "top": _SLOT_SCHEMA,
+    "bottom": _SLOT_SCHEMA,
+    "outer": _SLOT_SCHEMA,
+    "shoes": _SLOT_SCHEMA,
+    "concept": {"type": "string", "description": "전체 코디 컨셉 한 문장"},
+    "tip": {"type": "string", "description": "스타일링 팁 한 문장"},
+    "color_harmony": {"type": "string", "description": "색상 조합 설명 한 문장"},
+}
+
+
+def estimate_tokens(text):
+    """
+    토큰 수 대략 추정 (로그용)
+    영문/숫자/기호는 4자당 1토큰, 한글 등 그 외 문자는 1자당 1토큰 정도로 계산
+    """
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return (ascii_chars + 3) // 4 + (len(text) - ascii_chars)
+
+
+def filter_by_weather(clothes, weather):
+    """날씨에 맞는 옷만 골라내기
+
+    계절 또는 재질 중 하나라도 온도 구간에 맞으면 포함 (규칙은 weather_rules 참고)
+    - ColumnarCloset 이 오면 코드 배열 마스크로 걸러서 ColumnarCloset 반환
+    - dict 리스트가 오면 구간별 라벨 집합(SEASON_FIT / MATERIAL_FIT)으로 걸러서 원래 dict 리스트 반환
+      (한 번 거르려고 ColumnarCloset 을 만드는 것보다 훨씬 빠름)
+    """
+    band = temperature_band(weather.get('temp'))
+    if isinstance(clothes, ColumnarCloset):
+        return clothes.select(clothes.weather_mask(band))
+
+    seasons = SEASON_FIT[band]
+    materials = MATERIAL_FIT[band]
+    return [
+        item for item in clothes
+        if item.get('season') in seasons or item.get('material') in materials
+    ]
+
+
+def iter_filter_by_weather(clothes, weather, chunk_size=WEATHER_FILTER_CHUNK):
+    """
+    옷 iterable 을 chunk_size 벌씩 filter_by_weather 로 걸러서 하나씩 yield
+    (ClosetLoader(lazy=True).iter_clothes() 등 옷장 전체를 메모리에 올리지 않는 오프라인 작업용)
+    """
+    chunk = []
+    for item in clothes:
+        chunk.append(item)
+        if len(chunk) >= chunk_size:
+            yield from filter_by_weather(chunk, weather)
+            chunk = []
+    if chunk:
+        yield from filter_by_weather(chunk, weather)
+
+
 
 class FashionRecommendationAI:
-    def __init__(self, api_key: str):
-        if not api_key:
-            raise ValueError("ANTHROPIC_API_KEY가 설정되어 있지 않습니다.")
-        self.client = anthropic.Anthropic(api_key=api_key)
+    # mode: "llm" = Claude 호출, "local" = 규칙 기반 엔진, "auto" = Claude 실패/지연 시 로컬로 대체
+    MODES = ("llm", "local", "auto")
+    SLOTS = ("top", "bottom", "outer", "shoes")
+
+    # 실제 사용 가능한 최신 Sonnet 모델 이름으로 교체해서 사용하세요.
+    MODEL = "claude-sonnet-4-20250514"
+    # 도구 입력(JSON)만 받으므로 짧게 (잘려도 빠진 슬롯은 OutfitValidator 가 채움)
+    MAX_TOKENS = 800
+
+    # 구조화 출력: 추천을 도구 호출 입력으로 받음 (텍스트 JSON 을 잘라 파싱하지 않음)
+    OUTFIT_TOOL = {
+        "name": "recommend_outfit",
+        "description": "옷 목록에서 고른 오늘의 코디를 제출합니다.",
+        "input_schema": {
+            "type": "object",
+            "properties": _OUTFIT_PROPERTIES,
+            "required": list(_OUTFIT_PROPERTIES),
+        },
+    }
+
+    # 요청마다 바뀌지 않는 지시문 (system 프롬프트 → 요청 간 캐시 대상)
+    # 모드(구조화 출력 / 텍스트 JSON)마다 고정된 프롬프트 하나씩이라 캐시 지점은 그대로 유지됨
+    _OUTFIT_RULES = """당신은 전문 스타일리스트입니다. 사용자가 보여주는 옷 목록과 오늘 날씨/일정으로 최고의 코디를 추천해주세요.
+
+## 추천 규칙
+1. 날씨와 일정에 딱 맞는 옷 선택
+2. 색상이 잘 어울리는 조합
+3. 스타일이 통일된 코디
+4. 상의와 하의는 반드시 선택 (아우터는 필요시에만)
+5. 옷의 ID는 옷 목록에 주어진 문자열 ID만 사용
+"""
+
+    # 구조화 출력(기본): 응답 형식은 도구 input_schema 가 정하므로 도구 호출만 지시
+    TOOL_SYSTEM_PROMPT = _OUTFIT_RULES + """
+## 응답 방법
+recommend_outfit 도구를 한 번 호출하는 것으로만 답하세요. 도구 밖에 텍스트는 쓰지 마세요.
+- item_id 는 옷 목록에 보여준 ID 그대로, 아우터/신발이 필요 없으면 null
+- reason / concept / tip / color_harmony 는 각각 한 문장
+"""
+
+    # 텍스트 JSON (RECOMMEND_STRUCTURED=false)
+    SYSTEM_PROMPT = _OUTFIT_RULES + """
+## 응답 형식 (JSON만 출력)
+다음과 같은 형식의 JSON만 출력하세요. 설명 텍스트는 넣지 마세요.
+
+{
+    "top": {
+        "item_id": "상의로 선택한 옷의 ID(문자열)",
+        "name": "상의 이름",
+        "reason": "이 상의를 선택한 이유"
+    },
+    "bottom": {
+        "item_id": "하의로 선택한 옷의 ID(문자열)",
+        "name": "하의 이름",
+        "reason": "이 하의를 선택한 이유"
+    },
+    "outer": {
+        "item_id": null,
+        "name": null,
+        "reason": null
+    },
+    "shoes": {
+        "item_id": null,
+        "name": null,
+        "reason": null
+    },
+    "concept": "전체 코디 컨셉",
+    "tip": "스타일링 팁",
+    "color_harmony": "색상 조합 설명"
+}
+
+**중요**
+- 반드시 옷 목록에 있는 옷의 ID만 사용하세요.
+- ID는 문자열이며, 목록에 보여준 그대로 사용해야 합니다.
+- 아우터가 필요 없으면 "outer"의 값은 모두 null로 설정하세요.
+- 신발을 선택할 수 있다면 shoes에 채우고, 없으면 null로 두세요.
+- JSON 형식만 출력하고 다른 설명은 절대 추가하지 마세요.
+"""
+
+    # 여러 날 코디 계획 (recommend_plan): 한 번 호출로 최대 PLAN_MAX_DAYS 일
+    PLAN_MAX_DAYS = 14
+    PLAN_MAX_TOKENS = 6000
+    # 계획은 날짜 수만큼만 출력 토큰을 허용 (PLAN_MAX_TOKENS 가 상한)
+    PLAN_TOKENS_PER_DAY = 400
+    PLAN_TOOL = {
+        "name": "plan_outfits",
+        "description": "요청한 날짜 순서대로 날짜별 코디를 제출합니다.",
+        "input_schema": {
+            "type": "object",
+            "properties": {
+                "days": {
+                    "type": "array",
+                    "items": {
+                        "type": "object",
+                        "properties": {"date": {"type": "string"}, **_OUTFIT_PROPERTIES},
+                        "required": ["date", *_OUTFIT_PROPERTIES],
+                    },
+                },
+            },
+            "required": ["days"],
+        },
+    }
+    _PLAN_RULES = """당신은 전문 스타일리스트입니다. 사용자가 보여주는 옷 목록으로 여러 날의 코디를 한 번에 계획해주세요.
+
+## 계획 규칙
+1. 날짜마다 그날 날씨와 일정에 딱 맞는 옷 선택
+2. 날짜마다 그날 온도 구간에 입을 수 있는 옷 ID 중에서만 선택
+3. 상의는 계획 전체에서 같은 옷을 두 번 쓰지 말 것 (하의/아우터/신발은 반복 가능)
+4. 상의와 하의는 반드시 선택 (아우터/신발은 필요시에만)
+5. 옷의 ID는 옷 목록에 주어진 문자열 ID만 사용
+"""
+    PLAN_TOOL_SYSTEM_PROMPT = _PLAN_RULES + """
+## 응답 방법
+plan_outfits 도구를 한 번 호출하는 것으로만 답하세요. 도구 밖에 텍스트는 쓰지 마세요.
+- days 는 요청한 날짜 순서대로 날짜마다 하나씩, date 는 요청의 날짜 그대로
+- item_id 는 옷 목록에 보여준 ID 그대로, 아우터/신발이 필요 없으면 null
+- reason / concept / tip / color_harmony 는 각각 한 문장
+"""
+    PLAN_SYSTEM_PROMPT = _PLAN_RULES + """
+## 응답 형식 (JSON만 출력)
+요청한 날짜 순서대로 날짜마다 하나씩, 다음과 같은 형식의 JSON만 출력하세요. 설명 텍스트는 넣지 마세요.
+
+{
+    "days": [
+        {
+            "date": "요청의 날짜 그대로",
+            "top": {"item_id": "상의 ID", "name": "상의 이름", "reason": "이 상의를 선택한 이유"},
+            "bottom": {"item_id": "하의 ID", "name": "하의 이름", "reason": "이 하의를 선택한 이유"},
+            "outer": {"item_id": null, "name": null, "reason": null},
+            "shoes": {"item_id": null, "name": null, "reason": null},
+            "concept": "그날 코디 컨셉",
+            "tip": "스타일링 팁",
+            "color_harmony": "색상 조합 설명"
+        }
+    ]
+}
+"""
+
+    def __init__(self, api_key: str = None, cache_size=None, cache_ttl=None, default_mode=None,
+                 max_candidates_per_category=None, prompt_format=None, client=None,
+                 async_client=None, precomputed=None):
+        # client 를 넘기지 않으면 LLM_TRANSPORT 설정(live/record/replay/synthetic)에 맞게 생성
+        self.client = client if client is not None else make_client(api_key)
+        # asgi_server 에서만 사용 (없으면 get_async_client() 에서 같은 설정으로 생성)
+        self._api_key = api_key
+        self.async_client = async_client
+
+        # 추천 결과 캐시 (RECOMMEND_CACHE_SIZE=0 이면 캐시 끔)
+        if cache_size is None:
+            cache_size = int(os.environ.get('RECOMMEND_CACHE_SIZE', 1024))
+        if cache_ttl is None:
+            cache_ttl = float(os.environ.get('RECOMMEND_CACHE_TTL', 600))
+        self.cache = RecommendationCache(max_size=cache_size, ttl_seconds=cache_ttl)
+        # 같은 추천을 동시에 여러 번 요청하면 Claude 호출 1번으로 합치기 (RECOMMEND_COALESCE=false 면 끔)
+        self.inflight = SingleFlight(
+            enabled=os.environ.get('RECOMMEND_COALESCE', 'true').lower() in ('1', 'true', 'yes')
+        )
+
+        # 로컬 추천 엔진 (LLM 없이 바로 응답 / auto 모드 대체 경로)
+        self.local_engine = LocalOutfitEngine()
+        self.default_mode = default_mode or os.environ.get('RECOMMEND_MODE', 'llm')
+        # auto 모드에서는 이 시간 안에 Claude 응답이 없으면 로컬 결과로 대체
+        self.auto_timeout = float(os.environ.get('RECOMMEND_AUTO_TIMEOUT', 15))
+
+        # 프롬프트에 넣을 카테고리별 최대 후보 수 (0 이면 제한 없음)
+        if max_candidates_per_category is None:
+            max_candidates_per_category = int(os.environ.get('PROMPT_MAX_PER_CATEGORY', 15))
+        self.max_candidates_per_category = max_candidates_per_category
+
+        # 프롬프트 옷 목록 형식: "verbose" = 항목별 키/값, "compact" = 헤더 + 한 줄씩 (짧은 ID 별칭)
+        self.prompt_format = prompt_format or os.environ.get('PROMPT_FORMAT', 'verbose')
+
+        # 고정 지시문 / 옷 목록 블록에 cache_control 지정 (PROMPT_CACHE=false 면 끔)
+        self.prompt_cache = os.environ.get('PROMPT_CACHE', 'true').lower() in ('1', 'true', 'yes')
+
+        # 추천을 도구 호출(tool_choice 강제)로 받기 (RECOMMEND_STRUCTURED=false 면 텍스트 JSON)
+        self.structured_output = os.environ.get('RECOMMEND_STRUCTURED', 'true').lower() in ('1', 'true', 'yes')
+
+        # 야간 배치로 미리 만든 결과 저장소 (get(cache_key) / get_async(cache_key), 없으면 확인 안 함)
+        self.precomputed = precomputed
     
-    def recommend(self, clothes, weather, schedule):
+    def recommend(self, clothes, weather, schedule, mode=None, stats=None, user_id=None):
         """패션 추천 메인 함수
 
-        :param clothes: [
+        :param clothes: ColumnarCloset (closet.get_ai_ready_closet) 또는 [
             {
                 "id": str,          # UUID 문자열
                 "name": str,
@@ -27,93 +281,707 @@ class FashionRecommendationAI:
         ]
         :param weather: {"temp": float|int, "condition": str}
         :param schedule: str (예: "출근", "데이트", "야외 활동")
+        :param mode: "llm" | "local" | "auto" (None 이면 RECOMMEND_MODE 기본값)
+        :param stats: dict 를 넘기면 처리 정보(engine, cache 등)를 채워줌
+        :param user_id: 동시 요청 합치기(single-flight) 키에 포함 (같은 사용자 요청끼리만 합침)
+        """
+        mode = mode or self.default_mode
+        if stats is None:
+            stats = {}
+
+        # 1~2. 날씨 필터링 → 로컬 모드 / 캐시 히트면 바로 반환
+        done, suitable_clothes, cache_key = self._prepare(clothes, weather, schedule, mode, stats)
+        if done is not None:
+            return done
+
+        # 3~4. 같은 사용자/옷장/날씨 구간/일정 요청이 이미 진행 중이면 그 결과를 같이 받기
+        (result, call_stats), shared = self.inflight.do(
+            (user_id, mode, cache_key),
+            lambda: self._recommend_llm(suitable_clothes, weather, schedule, mode, cache_key),
+        )
+        # follower 는 결과/처리 정보 모두 복사본 (leader 응답과 중첩 값을 공유하지 않도록)
+        stats.update(copy.deepcopy(call_stats) if shared else call_stats)
+        stats["coalesced"] = shared
+        return copy.deepcopy(result) if shared else result
+
+    def _prepare(self, clothes, weather, schedule, mode, stats):
+        """
+        recommend / recommend_async 공통 앞단계
+        → (바로 돌려줄 결과, None, None) 또는 (None, 필터링된 옷장, 캐시 키)
         """
-        # 1. 날씨에 맞는 옷 필터링
-        suitable_clothes = self._filter_by_weather(clothes, weather)
-        
+        if mode not in self.MODES:
+            return {"error": f"지원하지 않는 추천 모드입니다: {mode}"}, None, None
+
+        # 1. 날씨에 맞는 옷 필터링 (이후 단계는 전부 컬럼 배열 기준으로 처리)
+        suitable_clothes = self._filter_by_weather(as_columnar(clothes), weather)
+
         if not suitable_clothes:
             return {
                 "error": "날씨에 맞는 옷이 없습니다",
                 "suggestion": "옷장에 계절과 날씨에 맞는 옷을 추가해보세요"
-            }
-        
-        # 2. 프롬프트 만들기
-        prompt = self._create_prompt(suitable_clothes, weather, schedule)
-        
-        # 3. Claude에게 물어보기
+            }, None, None
+
+        # 로컬 모드: LLM 호출 없이 바로 계산
+        if mode == "local":
+            stats["engine"] = "local"
+            return self.local_engine.recommend(suitable_clothes, weather, schedule), None, None
+
+        # 2. 같은 옷장/날씨 구간/일정으로 최근에 추천한 적 있으면 바로 반환
+        cache_key = self._cache_key(suitable_clothes, weather, schedule)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            stats["engine"] = "llm"
+            stats["cache"] = "hit"
+            return copy.deepcopy(cached), None, None
+        stats["cache"] = "miss"
+        return None, suitable_clothes, cache_key
+
+    def _recommend_llm(self, suitable_clothes, weather, schedule, mode, cache_key):
+        """프롬프트 생성 + Claude 호출 (+ auto 모드 대체) → (결과, 처리 정보)"""
+        stats = {}
+        stored = self.precomputed.get(cache_key) if self.precomputed is not None else None
+        if stored is not None:
+            return self._use_precomputed(stored, cache_key, stats), stats
+
+        # 3. 카테고리별 상위 후보만 남기고 프롬프트 만들기
+        prompt, aliases = self._build_prompt(suitable_clothes, weather, schedule, stats)
+
+        # 4. Claude에게 물어보기
+        client = self.client
+        if mode == "auto":
+            # 대체 경로가 있으니 재시도 없이 짧은 타임아웃으로 호출
+            client = self.client.with_options(timeout=self.auto_timeout, max_retries=0)
+        result = self._ask_claude(client, prompt, aliases=aliases, stats=stats)
+        return self._finish_llm(result, suitable_clothes, weather, schedule, mode, cache_key, stats)
+
+    def _use_precomputed(self, stored, cache_key, stats):
+        """precompute.py 가 미리 만든 결과 사용 (이후 같은 요청은 메모리 캐시에서)"""
+        stats["engine"] = "llm"
+        stats["cache"] = "precomputed"
+        self.cache.set(cache_key, copy.deepcopy(stored))
+        return stored
+
+    def _finish_llm(self, result, suitable_clothes, weather, schedule, mode, cache_key, stats):
+        """Claude 결과 정리: 실패 시 auto 모드 대체, 성공한 결과만 캐시 → (결과, 처리 정보)"""
+        if 'error' in result:
+            if mode == "auto":
+                # Claude 실패 → 로컬 엔진으로 대체 (다음 요청은 다시 Claude 시도)
+                stats["engine"] = "local"
+                stats["fallback_reason"] = result['error']
+                return self.local_engine.recommend(suitable_clothes, weather, schedule), stats
+            stats["engine"] = "llm"
+            return result, stats
+
+        # 빈/틀린 슬롯은 로컬 보정 (Claude 재호출 없음)
+        stats["engine"] = "llm"
+        result = self._validate_outfit(
+            OutfitValidator(suitable_clothes, self.local_engine), result, weather, schedule, stats
+        )
+        if 'error' in result:
+            return result, stats
+
+        # 성공한 결과만 캐시 (실패는 다음 요청에서 다시 시도)
+        self.cache.set(cache_key, copy.deepcopy(result))
+        return result, stats
+
+    def _validate_outfit(self, validator, result, weather, schedule, stats):
+        """OutfitValidator 로 검증/보정하고 보정한 슬롯을 stats["repaired_slots"] 에 기록"""
+        result, _ = validator.check(result, weather, schedule)
+        repaired = stats["repaired_slots"] = list(validator.repaired)
+        if repaired:
+            print(f"🩹 응답 보정: {', '.join(repaired)} 을(를) 로컬 엔진으로 채움")
+        return result
+
+    def recommend_stream(self, clothes, weather, schedule, mode=None, stats=None):
+        """
+        스트리밍 추천: 슬롯(top/bottom/outer/shoes/concept...)이 완성될 때마다
+        ("slot", {"slot": 이름, "value": 값}) 을 yield 하고,
+        마지막에 ("done", 전체 추천 결과) 또는 ("error", {...}) 를 yield
+        """
+        mode = mode or self.default_mode
+        if stats is None:
+            stats = {}
+
+        done, suitable_clothes, cache_key = self._prepare(clothes, weather, schedule, mode, stats)
+        if done is None and self.precomputed is not None:
+            stored = self.precomputed.get(cache_key)
+            if stored is not None:
+                done = self._use_precomputed(stored, cache_key, stats)
+        if done is not None:
+            yield from self._replay_slots(done)
+            return
+        stats["engine"] = "llm"
+
+        prompt, aliases = self._build_prompt(suitable_clothes, weather, schedule, stats)
+
+        client = self.client
+        if mode == "auto":
+            client = self.client.with_options(timeout=self.auto_timeout, max_retries=0)
+
+        parser = SlotStreamParser()
+        validator = OutfitValidator(suitable_clothes, self.local_engine)
+        error = None
         try:
-            message = self.client.messages.create(
-                # 실제 사용 가능한 최신 Sonnet 모델 이름으로 교체해서 사용하세요.
-               
-                model="claude-sonnet-4-20250514",
-                max_tokens=2000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            
-            # 4. 결과 정리
-            content_text = ""
-            # Anthropic SDK의 message.content는 list 구조일 수 있으므로 안전하게 처리
-            if isinstance(message.content, list) and len(message.content) > 0:
-                # text 타입 블록만 연결
-                content_text = "".join(
-                    block.text for block in message.content 
-                    if hasattr(block, "text")
-                )
+            with client.messages.stream(**self._request(prompt)) as stream:
+                for event in stream:
+                    text = self._stream_delta(event)
+                    if text:
+                        yield from self._feed_slots(parser, text, aliases, validator, weather, schedule)
+                self._record_usage(stream.get_final_message(), stats)
+        except Exception as e:
+            error = f"AI 추천 실패: {str(e)}"
+
+        yield from self._finish_stream(
+            parser, error, validator, suitable_clothes, weather, schedule, mode, cache_key, stats
+        )
+
+    # ====== 여러 날 계획 ======
+
+    def recommend_plan(self, clothes, days, mode=None, stats=None, user_id=None):
+        """여러 날 코디를 한 번에 계획 (Claude 호출 1번)
+
+        - 날씨 필터는 온도 구간별로 한 번만, 옷 목록은 프롬프트 하나에 한 번만
+        - 응답은 날짜별로 검증 (그날 구간에 맞는 옷인지 / 카테고리가 맞는지 / 상의가 겹치지 않는지)
+          → 틀린 날만 로컬 엔진으로 다시 채움 (stats["repaired_days"])
+
+        :param days: [{"date": str, "weather": {"temp": ..., "condition": ...}, "schedule": str}, ...]
+        :return: {"days": [{"date", "weather", "schedule", "recommendation"}, ...]} 또는 {"error": ...}
+        """
+        mode = mode or self.default_mode
+        if stats is None:
+            stats = {}
+        if mode not in self.MODES:
+            return {"error": f"지원하지 않는 추천 모드입니다: {mode}"}
+
+        # 1. 온도 구간별로 한 번만 필터링
+        closet = as_columnar(clothes)
+        bands = [temperature_band(day['weather'].get('temp')) for day in days]
+        by_band = {}
+        for day, band in zip(days, bands):
+            if band not in by_band:
+                by_band[band] = self._filter_by_weather(closet, day['weather'])
+            if not by_band[band]:
+                return {
+                    "error": f"{day['date']}: 날씨에 맞는 옷이 없습니다",
+                    "suggestion": "옷장에 계절과 날씨에 맞는 옷을 추가해보세요"
+                }
+        stats["days"] = len(days)
+        stats["weather_bands"] = len(by_band)
+
+        if mode == "local":
+            stats["engine"] = "local"
+            return self._local_plan(days, bands, by_band)
+
+        # 2. 같은 옷장 + 같은 날짜별 조건으로 최근에 계획한 적 있으면 바로 반환
+        cache_key = self.cache.make_plan_key(closet, [
+            (day['date'], band, day['weather'].get('condition'), day['schedule'])
+            for day, band in zip(days, bands)
+        ])
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            stats["engine"] = "llm"
+            stats["cache"] = "hit"
+            return copy.deepcopy(cached)
+        stats["cache"] = "miss"
+
+        (result, call_stats), shared = self.inflight.do(
+            (user_id, "plan", mode, cache_key),
+            lambda: self._plan_llm(days, bands, by_band, mode, cache_key),
+        )
+        # follower 는 결과/처리 정보 모두 복사본 (leader 응답과 중첩 값을 공유하지 않도록)
+        stats.update(copy.deepcopy(call_stats) if shared else call_stats)
+        stats["coalesced"] = shared
+        return copy.deepcopy(result) if shared else result
+
+    def _plan_llm(self, days, bands, by_band, mode, cache_key):
+        """계획 프롬프트 + Claude 호출 + 날짜별 검증 → (결과, 처리 정보)"""
+        stats = {}
+        prompt, aliases = self._build_plan_prompt(days, bands, by_band, stats)
+
+        client = self.client
+        if mode == "auto":
+            client = self.client.with_options(timeout=self.auto_timeout, max_retries=0)
+        try:
+            message = client.messages.create(**self._request(
+                prompt,
+                system=self._system_prompt(plan=True),
+                max_tokens=min(self.PLAN_MAX_TOKENS, self.PLAN_TOKENS_PER_DAY * len(days)),
+                tool=self.PLAN_TOOL,
+            ))
+            self._record_usage(message, stats)
+            parsed = self._message_result(message)
+        except Exception as e:
+            parsed = {"error": f"AI 추천 실패: {str(e)}"}
+
+        if 'error' not in parsed and not isinstance(parsed.get('days'), list):
+            parsed = {"error": "결과 해석 실패", "raw": parsed}
+        if 'error' in parsed:
+            if mode == "auto":
+                stats["engine"] = "local"
+                stats["fallback_reason"] = parsed['error']
+                return self._local_plan(days, bands, by_band), stats
+            stats["engine"] = "llm"
+            return parsed, stats
+
+        stats["engine"] = "llm"
+        result = self._validate_plan(parsed['days'], days, bands, by_band, aliases, stats)
+        if 'error' not in result:
+            self.cache.set(cache_key, copy.deepcopy(result))
+        return result, stats
+
+    def _build_plan_prompt(self, days, bands, by_band, stats):
+        """
+        구간별 후보를 합친 옷 목록 블록(캐시 지점) + 구간별 입을 수 있는 ID / 날짜별 날씨·일정 블록
+        → (prompt, aliases)
+        """
+        # 구간마다 그 구간 날짜 수만큼은 상의 후보가 남도록 추리기 (일정은 구간의 첫 날 기준)
+        candidates, band_ids, seen = [], {}, set()
+        for band, suitable in by_band.items():
+            first = days[bands.index(band)]
+            limit = max(self.max_candidates_per_category, bands.count(band)) if self.max_candidates_per_category else 0
+            pruned = self._prune_candidates(suitable, first['weather'], first['schedule'], limit=limit)
+            band_ids[band] = []
+            for item in pruned:
+                band_ids[band].append(item.get('id'))
+                if item.get('id') not in seen:
+                    seen.add(item.get('id'))
+                    candidates.append(item)
+        stats["prompt_clothes"] = len(candidates)
+
+        aliases = self._make_id_aliases(candidates) if self.prompt_format == "compact" else None
+        alias_of = {real_id: alias for alias, real_id in (aliases or {}).items()}
+
+        band_lines = "\n".join(
+            f"- 구간 {band}: " + ", ".join(str(alias_of.get(i, i)) for i in ids)
+            for band, ids in band_ids.items()
+        )
+        day_lines = "\n".join(
+            f"- 날짜: {day['date']} | 온도: {day['weather'].get('temp')}도 | "
+            f"날씨: {day['weather'].get('condition')} | 일정: {day['schedule']} | 온도 구간: {band}"
+            for day, band in zip(days, bands)
+        )
+        request_block = {"type": "text", "text": f"""
+## 온도 구간별 입을 수 있는 옷 ID
+{band_lines}
+
+## 날짜별 날씨/일정
+{day_lines}
+
+위 {len(days)}일의 코디를 날짜 순서대로 JSON으로 계획해주세요. 상의는 날짜끼리 겹치지 않게 골라주세요.
+"""}
+        prompt = [self._closet_block(candidates, aliases), request_block]
+
+        stats["prompt_format"] = self.prompt_format
+        text = self._system_prompt(plan=True) + self.prompt_text(prompt)
+        stats["prompt_chars"] = len(text)
+        stats["prompt_tokens_est"] = estimate_tokens(text)
+        print(
+            f"📝 계획 프롬프트: {len(days)}일, 구간 {len(by_band)}개, 옷 {len(candidates)}개, "
+            f"{stats['prompt_chars']}자, 약 {stats['prompt_tokens_est']} 토큰"
+        )
+        return prompt, aliases
+
+    def _validate_plan(self, entries, days, bands, by_band, aliases, stats):
+        """
+        Claude 가 준 날짜별 코디 검증 → 요청한 날짜마다 하나씩
+        (빠진 날은 로컬 엔진으로, 틀린 슬롯/겹친 상의는 그 슬롯만 로컬 보정)
+        """
+        # 구간별 검증기 (그 구간 옷장의 id 해시)
+        validators = {band: OutfitValidator(suitable, self.local_engine) for band, suitable in by_band.items()}
+
+        entries = [entry for entry in entries if isinstance(entry, dict)]
+        by_date = {str(entry.get('date')): entry for entry in entries}
+        requested = {str(day['date']) for day in days}
+
+        plan, used_tops, repaired = [], set(), []
+        for i, (day, band) in enumerate(zip(days, bands)):
+            entry = by_date.get(str(day['date']))
+            if entry is None and i < len(entries) and str(entries[i].get('date')) not in requested:
+                # 날짜를 안 적었거나 다르게 적었으면 순서로 맞춤
+                entry = entries[i]
+            outfit = self._plan_outfit(entry, aliases)
+
+            if outfit is None:
+                outfit = self._local_plan_day(day, by_band[band], used_tops)
+                fixed = True
             else:
-                content_text = str(message.content)
+                outfit, fixed = validators[band].check(outfit, day['weather'], day['schedule'], exclude=used_tops)
+            if 'error' in outfit:
+                return {"error": f"{day['date']}: {outfit['error']}", "suggestion": outfit.get('suggestion', '')}
+            if fixed:
+                repaired.append(day['date'])
+
+            used_tops.add(outfit['top']['item_id'])
+            plan.append(self._plan_entry(day, outfit))
+
+        stats["repaired_days"] = repaired
+        if repaired:
+            print(f"🩹 계획 검증: {len(repaired)}일을 로컬 엔진으로 보정 ({', '.join(map(str, repaired))})")
+        return {"days": plan}
+
+    def _plan_outfit(self, entry, aliases):
+        """계획 응답의 하루치 → recommend 결과와 같은 형식 (없으면 None)"""
+        if entry is None:
+            return None
+        outfit = {key: value for key, value in entry.items() if key != 'date'}
+        for slot in self.SLOTS:
+            self._restore_item_id(outfit.get(slot), aliases)
+        return outfit
+
+    def _local_plan(self, days, bands, by_band):
+        """로컬 엔진으로 날짜별 코디 (상의는 남아 있는 동안 겹치지 않게)"""
+        plan, used_tops = [], set()
+        for day, band in zip(days, bands):
+            outfit = self._local_plan_day(day, by_band[band], used_tops)
+            if 'error' in outfit:
+                return {"error": f"{day['date']}: {outfit['error']}", "suggestion": outfit.get('suggestion', '')}
+            used_tops.add(outfit['top']['item_id'])
+            plan.append(self._plan_entry(day, outfit))
+        return {"days": plan}
+
+    def _local_plan_day(self, day, suitable, used_tops):
+        """이미 입은 상의를 뺀 옷장으로 로컬 추천 (남은 상의가 없으면 다시 허용)"""
+        if used_tops:
+            categories = suitable.codes["category"]
+            is_top = categories == SLOT_CATEGORY_CODE["top"]
+            used = np.fromiter((i in used_tops for i in suitable.ids()), dtype=bool, count=len(suitable))
+            if (is_top & ~used).any():
+                suitable = suitable.select(~(is_top & used))
+        return self.local_engine.recommend(suitable, day['weather'], day['schedule'])
+
+    @staticmethod
+    def _plan_entry(day, outfit):
+        return {
+            "date": day['date'],
+            "weather": day['weather'],
+            "schedule": day['schedule'],
+            "recommendation": outfit,
+        }
+
+    # ====== 비동기 버전 (asgi_server 용, AsyncAnthropic) ======
+
+    def get_async_client(self):
+        """비동기 Claude 클라이언트 (처음 사용할 때 LLM_TRANSPORT 설정으로 생성)"""
+        if self.async_client is None:
+            self.async_client = make_async_client(self._api_key)
+        return self.async_client
+
+    async def recommend_async(self, clothes, weather, schedule, mode=None, stats=None, user_id=None):
+        """recommend 와 같은 결과 — Claude 응답을 기다리는 동안 이벤트 루프를 막지 않음"""
+        mode = mode or self.default_mode
+        if stats is None:
+            stats = {}
+
+        done, suitable_clothes, cache_key = self._prepare(clothes, weather, schedule, mode, stats)
+        if done is not None:
+            return done
+
+        (result, call_stats), shared = await self.inflight.do_async(
+            (user_id, mode, cache_key),
+            lambda: self._recommend_llm_async(suitable_clothes, weather, schedule, mode, cache_key),
+        )
+        # follower 는 결과/처리 정보 모두 복사본 (leader 응답과 중첩 값을 공유하지 않도록)
+        stats.update(copy.deepcopy(call_stats) if shared else call_stats)
+        stats["coalesced"] = shared
+        return copy.deepcopy(result) if shared else result
+
+    async def _recommend_llm_async(self, suitable_clothes, weather, schedule, mode, cache_key):
+        stats = {}
+        if self.precomputed is not None:
+            stored = await self.precomputed.get_async(cache_key)
+            if stored is not None:
+                return self._use_precomputed(stored, cache_key, stats), stats
 
-            result = self._parse_response(content_text)
-            return result
-            
+        prompt, aliases = self._build_prompt(suitable_clothes, weather, schedule, stats)
+
+        client = self.get_async_client()
+        if mode == "auto":
+            client = client.with_options(timeout=self.auto_timeout, max_retries=0)
+        try:
+            message = await client.messages.create(**self._request(prompt))
+            self._record_usage(message, stats)
+            result = self._message_result(message, aliases=aliases)
+        except Exception as e:
+            result = {"error": f"AI 추천 실패: {str(e)}"}
+        return self._finish_llm(result, suitable_clothes, weather, schedule, mode, cache_key, stats)
+
+    async def recommend_stream_async(self, clothes, weather, schedule, mode=None, stats=None):
+        """recommend_stream 과 같은 이벤트를 async for 로 내보냄"""
+        mode = mode or self.default_mode
+        if stats is None:
+            stats = {}
+
+        done, suitable_clothes, cache_key = self._prepare(clothes, weather, schedule, mode, stats)
+        if done is None and self.precomputed is not None:
+            stored = await self.precomputed.get_async(cache_key)
+            if stored is not None:
+                done = self._use_precomputed(stored, cache_key, stats)
+        if done is not None:
+            for event in self._replay_slots(done):
+                yield event
+            return
+        stats["engine"] = "llm"
+
+        prompt, aliases = self._build_prompt(suitable_clothes, weather, schedule, stats)
+
+        client = self.get_async_client()
+        if mode == "auto":
+            client = client.with_options(timeout=self.auto_timeout, max_retries=0)
+
+        parser = SlotStreamParser()
+        validator = OutfitValidator(suitable_clothes, self.local_engine)
+        error = None
+        try:
+            async with client.messages.stream(**self._request(prompt)) as stream:
+                async for stream_event in stream:
+                    text = self._stream_delta(stream_event)
+                    if text:
+                        for event in self._feed_slots(parser, text, aliases, validator, weather, schedule):
+                            yield event
+                self._record_usage(await stream.get_final_message(), stats)
+        except Exception as e:
+            error = f"AI 추천 실패: {str(e)}"
+
+        for event in self._finish_stream(
+            parser, error, validator, suitable_clothes, weather, schedule, mode, cache_key, stats
+        ):
+            yield event
+
+    # ====== 스트리밍 공통 ======
+
+    def _request(self, prompt, system=None, max_tokens=None, tool=None):
+        """
+        messages.create / messages.stream 인자 (prompt = _create_prompt 의 content 블록)
+        structured_output 이면 tool(기본 OUTFIT_TOOL) 호출을 강제해서 JSON 을 도구 입력으로 받음
+        """
+        request = {
+            "model": self.MODEL,
+            "max_tokens": max_tokens or self.MAX_TOKENS,
+            "system": self._system_blocks(system),
+            "messages": [{"role": "user", "content": prompt}],
+        }
+        if self.structured_output:
+            tool = tool or self.OUTFIT_TOOL
+            request["tools"] = [tool]
+            request["tool_choice"] = {"type": "tool", "name": tool["name"]}
+        return request
+
+    @staticmethod
+    def _stream_delta(event):
+        """스트림 이벤트 → JSON 텍스트 조각 (도구 호출이면 input_json, 아니면 text)"""
+        if event.type == "input_json":
+            return event.partial_json
+        if event.type == "text":
+            return event.text
+        return None
+
+    def _feed_slots(self, parser, text, aliases, validator, weather, schedule):
+        """스트림 텍스트 조각 → 완성된 슬롯 이벤트 (틀린 id 는 보내기 전에 로컬 보정)"""
+        for slot, value in parser.feed(text):
+            if slot in self.SLOTS:
+                self._restore_item_id(value, aliases)
+                checked, _ = validator.check_slot(slot, value, weather, schedule)
+                if checked is not None:
+                    value = parser.result[slot] = checked
+            yield "slot", {"slot": slot, "value": value}
+
+    def _finish_stream(self, parser, error, validator, suitable_clothes, weather, schedule, mode, cache_key, stats):
+        """
+        스트림 종료 처리: 실패 시 auto 모드 대체 / 에러
+        끝까지 받았으면 (잘렸어도) 빠진/틀린 슬롯을 로컬 보정해서 추가로 보낸 뒤 캐시 후 done
+        """
+        sent = parser.result
+        if error is None and not parser.done and not sent:
+            error = "결과 해석 실패"
+
+        if error is not None:
+            if mode == "auto" and not sent:
+                # 아직 아무 슬롯도 보내지 않았으면 로컬 결과로 대체
+                stats["engine"] = "local"
+                stats["fallback_reason"] = error
+                result = self.local_engine.recommend(suitable_clothes, weather, schedule)
+                yield from self._replay_slots(result)
+                return
+            yield "error", {"error": error, "raw": parser.buffer}
+            return
+
+        result = self._validate_outfit(validator, sent, weather, schedule, stats)
+        if 'error' in result:
+            yield "error", result
+            return
+        for slot, value in result.items():
+            if sent.get(slot) != value:
+                yield "slot", {"slot": slot, "value": value}
+
+        self.cache.set(cache_key, copy.deepcopy(result))
+        yield "done", result
+
+    def _replay_slots(self, result):
+        """이미 완성된 결과(캐시/로컬)를 스트리밍 이벤트 형식으로 내보내기"""
+        if 'error' in result:
+            yield "error", result
+            return
+        for slot, value in result.items():
+            yield "slot", {"slot": slot, "value": value}
+        yield "done", result
+
+    def _cache_key(self, suitable_clothes, weather, schedule):
+        return self.cache.make_key(
+            suitable_clothes,
+            temperature_band(weather.get('temp')),
+            weather.get('condition'),
+            schedule,
+        )
+
+    def _build_prompt(self, suitable_clothes, weather, schedule, stats):
+        """후보 추리기 + 프롬프트 생성 + 크기 로그 → (prompt, aliases)"""
+        candidates = self._prune_candidates(suitable_clothes, weather, schedule)
+        stats["prompt_clothes"] = len(candidates)
+        stats["pruned_clothes"] = len(suitable_clothes) - len(candidates)
+        aliases = self._make_id_aliases(candidates) if self.prompt_format == "compact" else None
+        prompt = self._create_prompt(candidates, weather, schedule, aliases=aliases)
+        stats["prompt_format"] = self.prompt_format
+        text = self._system_prompt() + self.prompt_text(prompt)
+        stats["prompt_chars"] = len(text)
+        stats["prompt_tokens_est"] = estimate_tokens(text)
+        print(
+            f"📝 프롬프트: {self.prompt_format}, 옷 {len(candidates)}개, "
+            f"{stats['prompt_chars']}자, 약 {stats['prompt_tokens_est']} 토큰"
+        )
+        return prompt, aliases
+
+    def _record_usage(self, message, stats):
+        """실제 입력/출력 토큰 수 + 프롬프트 캐시 읽기/생성 토큰 수 기록 (추정치와 비교용)"""
+        usage = getattr(message, "usage", None)
+        if stats is not None and usage is not None:
+            stats["input_tokens"] = getattr(usage, "input_tokens", None)
+            stats["output_tokens"] = getattr(usage, "output_tokens", None)
+            stats["cache_read_tokens"] = getattr(usage, "cache_read_input_tokens", None) or 0
+            stats["cache_creation_tokens"] = getattr(usage, "cache_creation_input_tokens", None) or 0
+            print(
+                f"💾 프롬프트 캐시: 읽기 {stats['cache_read_tokens']} / "
+                f"생성 {stats['cache_creation_tokens']} / 미캐시 {stats['input_tokens']} 토큰"
+            )
+
+    def _ask_claude(self, client, prompt, aliases=None, stats=None):
+        """Claude 호출 + 응답 파싱 (실패 시 {"error": ...})"""
+        try:
+            message = client.messages.create(**self._request(prompt))
+            self._record_usage(message, stats)
+            return self._message_result(message, aliases=aliases)
         except Exception as e:
             return {"error": f"AI 추천 실패: {str(e)}"}
-    
+
+    def _message_result(self, message, aliases=None):
+        """응답 메시지 → 결과 dict (tool_use 블록이면 도구 입력 그대로, 아니면 텍스트 JSON 해석)"""
+        content = message.content if isinstance(message.content, list) else []
+        for block in content:
+            if getattr(block, "type", None) == "tool_use":
+                result = dict(block.input) if isinstance(block.input, dict) else {}
+                for slot in self.SLOTS:
+                    self._restore_item_id(result.get(slot), aliases)
+                return result
+        return self._parse_response(self._message_text(message), aliases=aliases)
+
+    @staticmethod
+    def _message_text(message):
+        """응답 메시지 → 텍스트"""
+        # Anthropic SDK의 message.content는 list 구조일 수 있으므로 안전하게 처리
+        if isinstance(message.content, list) and len(message.content) > 0:
+            # text 타입 블록만 연결
+            return "".join(
+                block.text for block in message.content
+                if hasattr(block, "text")
+            )
+        return str(message.content)
+
+    def _prune_candidates(self, clothes, weather, schedule, limit=None):
+        """
+        옷장이 커도 프롬프트 크기가 일정하도록 카테고리별 상위 N개만 남기기
+        (점수: 로컬 엔진의 날씨 적합도 + 일정-스타일 선호도, 원래 순서는 유지)
+        """
+        if limit is None:
+            limit = self.max_candidates_per_category
+        if not limit or len(clothes) <= limit:
+            return clothes
+
+        closet = as_columnar(clothes)
+        scores = self.local_engine.score_items(closet, weather, schedule)
+        categories = closet.codes["category"]
+
+        keep = []
+        for code in np.unique(categories):
+            indices = np.flatnonzero(categories == code)
+            if len(indices) > limit:
+                indices = indices[np.argsort(-scores[indices], kind="stable")[:limit]]
+            keep.append(indices)
+        keep = np.sort(np.concatenate(keep))
+
+        return closet.select(keep)
+
     def _filter_by_weather(self, clothes, weather):
-        """날씨에 맞는 옷만 골라내기"""
-        temp = weather.get('temp')
-        suitable = []
-        
-        for item in clothes:
-            season = item.get('season')     # 봄/여름/가을/겨울/사계절
-            material = item.get('material') # 면/니트/데님/폴리/린넨/패딩/스웨이드/레더
-
-            # --- 계절 기준 ---
-            if season == '사계절':
-                season_ok = True
-            elif temp is not None and temp < 10 and season == '겨울':
-                season_ok = True
-            elif temp is not None and 10 <= temp < 20 and season in ['봄', '가을']:
-                season_ok = True
-            elif temp is not None and temp >= 20 and season == '여름':
-                season_ok = True
-            else:
-                season_ok = False
-            
-            # --- 재질 기준 ---
-            if material is None:
-                material_ok = False
-            elif temp is not None and temp < 15 and material in ['니트', '패딩', '레더', '스웨이드']:
-                # 추울 때: 두껍고 보온성 있는 재질
-                material_ok = True
-            elif temp is not None and 15 <= temp < 25 and material in ['면', '데님', '폴리']:
-                # 선선~약간 따뜻: 중간 두께
-                material_ok = True
-            elif temp is not None and temp >= 25 and material in ['린넨', '면']:
-                # 더울 때: 통풍 잘 되는 재질
-                material_ok = True
-            else:
-                material_ok = False
-            
-            # 둘 중 하나라도 맞으면 포함
-            if season_ok or material_ok:
-                suitable.append(item)
-        
-        return suitable
-    
-    def _create_prompt(self, clothes, weather, schedule):
-        """Claude에게 보낼 질문 만들기"""
-        
-        # 옷 목록 텍스트로 만들기
+        """날씨에 맞는 옷만 골라내기 (filter_by_weather 참고)"""
+        return filter_by_weather(clothes, weather)
+
+    def _make_id_aliases(self, clothes):
+        """긴 UUID 대신 프롬프트에 쓸 짧은 별칭 ({"i1": 실제 id, ...})"""
+        return {f"i{n}": item.get('id') for n, item in enumerate(clothes, start=1)}
+
+    def _create_prompt(self, clothes, weather, schedule, aliases=None):
+        """Claude에게 보낼 질문 만들기 → user 메시지 content 블록 리스트
+
+        고정 지시문(스타일리스트 역할/규칙/응답 형식)은 system 프롬프트(_system_prompt)로 분리하고,
+        user 메시지는 덜 바뀌는 것부터: 옷 목록(사용자 + 온도 구간 + 일정별로 같음) → 오늘 날씨/일정
+        옷 목록 블록 끝에 캐시 지점을 둬서 같은 사용자의 반복 추천은 앞부분을 캐시된 입력으로 처리
+
+        :param aliases: {"별칭": 실제 id} - 있으면 compact 표 형식 + 별칭 ID로 옷 목록 작성
+        """
+        closet_block = self._closet_block(clothes, aliases)
+
+        request_block = {"type": "text", "text": f"""
+## 오늘 날씨
+- 온도: {weather.get('temp')}도
+- 날씨: {weather.get('condition')}
+
+## 오늘 일정
+- 일정 유형: {schedule}
+
+위 옷 목록에서 오늘 날씨와 일정에 맞는 코디를 JSON으로 추천해주세요.
+"""}
+        return [closet_block, request_block]
+
+    def _closet_block(self, clothes, aliases=None):
+        """옷 목록 content 블록 (끝에 캐시 지점)"""
+        if aliases is not None:
+            clothes_text = self._format_clothes_compact(clothes, aliases)
+        else:
+            clothes_text = self._format_clothes_verbose(clothes)
+
+        block = {"type": "text", "text": f"## 입을 수 있는 옷들\n{clothes_text}\n"}
+        if self.prompt_cache:
+            block["cache_control"] = {"type": "ephemeral"}
+        return block
+
+    def _system_prompt(self, plan=False):
+        """모드에 맞는 고정 지시문 (구조화 출력이면 도구 호출 지시, 아니면 JSON 형식 설명)"""
+        if plan:
+            return self.PLAN_TOOL_SYSTEM_PROMPT if self.structured_output else self.PLAN_SYSTEM_PROMPT
+        return self.TOOL_SYSTEM_PROMPT if self.structured_output else self.SYSTEM_PROMPT
+
+    def _system_blocks(self, system=None):
+        """system 파라미터 (고정 지시문, 캐시 지점 포함)"""
+        block = {"type": "text", "text": system or self._system_prompt()}
+        if self.prompt_cache:
+            block["cache_control"] = {"type": "ephemeral"}
+        return [block]
+
+    @staticmethod
+    def prompt_text(blocks):
+        """content 블록 리스트 → 이어붙인 텍스트 (로그/길이 계산용)"""
+        return "".join(block["text"] for block in blocks)
+
+    def _format_clothes_verbose(self, clothes):
+        """옷 한 벌당 키/값 여러 줄"""
         clothes_text = ""
         for item in clothes:
             clothes_text += f"""
@@ -126,80 +994,55 @@ class FashionRecommendationAI:
   재질: {item.get('material')}
   계절: {item.get('season')}
 """
-        
-        prompt = f"""
-당신은 전문 스타일리스트입니다. 다음 정보로 최고의 코디를 추천해주세요.
-
-## 입을 수 있는 옷들
-{clothes_text}
-
-## 오늘 날씨
-- 온도: {weather.get('temp')}도
-- 날씨: {weather.get('condition')}
-
-## 오늘 일정
-- 일정 유형: {schedule}
-
-## 추천 규칙
-1. 날씨와 일정에 딱 맞는 옷 선택
-2. 색상이 잘 어울리는 조합
-3. 스타일이 통일된 코디
-4. 상의와 하의는 반드시 선택 (아우터는 필요시에만)
-5. 옷의 ID는 위에 주어진 문자열 ID만 사용
+        return clothes_text
 
-## 응답 형식 (JSON만 출력)
-다음과 같은 형식의 JSON만 출력하세요. 설명 텍스트는 넣지 마세요.
-
-{{
-    "top": {{
-        "item_id": "상의로 선택한 옷의 ID(문자열)",
-        "name": "상의 이름",
-        "reason": "이 상의를 선택한 이유"
-    }},
-    "bottom": {{
-        "item_id": "하의로 선택한 옷의 ID(문자열)",
-        "name": "하의 이름",
-        "reason": "이 하의를 선택한 이유"
-    }},
-    "outer": {{
-        "item_id": null,
-        "name": null,
-        "reason": null
-    }},
-    "shoes": {{
-        "item_id": null,
-        "name": null,
-        "reason": null
-    }},
-    "concept": "전체 코디 컨셉",
-    "tip": "스타일링 팁",
-    "color_harmony": "색상 조합 설명"
-}}
+    def _format_clothes_compact(self, clothes, aliases):
+        """헤더 한 줄 + 옷 한 벌당 '|' 구분 한 줄"""
+        alias_of = {real_id: alias for alias, real_id in aliases.items()}
+        lines = ["ID|이름|카테고리|종류|색상|스타일|재질|계절"]
+        for item in clothes:
+            fields = [
+                alias_of.get(item.get('id'), item.get('id')),
+                item.get('name', ''),
+                item.get('category'),
+                item.get('type'),
+                item.get('color'),
+                item.get('style'),
+                item.get('material'),
+                item.get('season'),
+            ]
+            lines.append("|".join(
+                "" if v is None else str(v).replace("|", "/").replace("\n", " ")
+                for v in fields
+            ))
+        return "\n".join(lines)
 
-**중요**
-- 반드시 위 목록에 있는 옷의 ID만 사용하세요.
-- ID는 문자열이며, 위에 보여준 그대로 사용해야 합니다.
-- 아우터가 필요 없으면 "outer"의 값은 모두 null로 설정하세요.
-- 신발을 선택할 수 있다면 shoes에 채우고, 없으면 null로 두세요.
-- JSON 형식만 출력하고 다른 설명은 절대 추가하지 마세요.
-"""
-        return prompt
-    
-    def _parse_response(self, response_text):
-        """Claude 답변을 JSON으로 변환"""
-        try:
-            # JSON 부분만 추출
-            start = response_text.find('{')
-            end = response_text.rfind('}') + 1
-            json_str = response_text[start:end]
-            return json.loads(json_str)
-        except Exception as e:
-            print(f"파싱 에러: {e}")
+    def _parse_response(self, response_text, aliases=None):
+        """
+        Claude 텍스트 답변을 dict 로 변환 (도구 호출을 안 쓸 때 / 텍스트로 녹화된 응답)
+        첫 '{' 의 객체를 키 단위로 읽어서 뒤에 붙은 설명은 무시하고,
+        중간에 잘린 답변이면 완성된 키까지만 살림 (빠진 슬롯은 검증 단계에서 보정)
+        """
+        parser = SlotStreamParser()
+        parser.feed(response_text)
+        result = parser.result
+        if not result:
+            print("파싱 에러: 응답에서 JSON 객체를 찾지 못함")
             return {
-                "error": "결과 해석 실패", 
+                "error": "결과 해석 실패",
                 "raw": response_text
             }
 
+        # compact 형식이면 별칭 ID를 실제 cloth_id로 되돌리기
+        for slot in self.SLOTS:
+            self._restore_item_id(result.get(slot), aliases)
+        return result
+
+    def _restore_item_id(self, picked, aliases):
+        """슬롯 값의 별칭 item_id → 실제 cloth_id"""
+        if aliases and isinstance(picked, dict) and picked.get('item_id') in aliases:
+            picked['item_id'] = aliases[picked['item_id']]
+
 
 # 단독 실행 테스트용 코드 (DB와는 무관한 샘플)
 if __name__ == "__main__":
@@ -0,0 +1,10 @@
+# gunicorn 설정 (render.yaml 의 startCommand 에서 -c 로 사용)
+
+
+def post_fork(server, worker):
+    """
+    fork 된 워커가 부모 프로세스의 DB 커넥션을 이어 쓰지 않도록 풀 초기화
+    (--preload 로 앱을 미리 로드한 경우에도 안전)
+    """
+    from models import dispose_engine
+    dispose_engine()
@@ -0,0 +1,88 @@
+# DB / SDK 의존성 없이 어디서든 import 할 수 있도록 라벨 매핑만 모아둔 모듈
+# (closet_repository, local_stylist 등에서 공용으로 사용)
+# 실제 라벨 사전은 DB lookup_labels 테이블 (이 매핑은 초기 데이터 + DB 를 못 읽을 때의 기본값)
+# 새 스타일/종류는 lookup_labels 에 INSERT 하면 재배포 없이 반영됨
+
+# ==========================
+# 하드코딩 매핑 딕셔너리들
+# ==========================
+
+STYLE_MAP = {
+    "019b12e5-5d25-747c-987a-623b4f0b7b34": "캐쥬얼",
+    "019b12f9-b0be-796e-a3b0-10384f5bbbb1": "포멀",
+    "019b12f9-b0be-762f-b649-b9262eaad902": "데일리",
+    "019b12f9-b0be-74b1-ac7c-99e345d0aae7": "스트릿",
+    "019b12f9-b0be-7fe8-84e9-b4434ebab581": "러블리",
+    "019b12f9-b0be-74b9-b7b2-8a1443a4fb0c": "미니멀",
+}
+
+SEASON_MAP = {
+    "019b12e6-17b4-72b3-a11b-c01e79f49561": "여름",
+    "019b12f8-e445-7d91-ab93-c7bfbbb20ae7": "봄",
+    "019b12f8-e445-72cf-a22b-32aa8a4ec4e1": "가을",
+    "019b12f8-e445-7e63-b3ab-510ebe0e49b5": "겨울",
+    "019b12f8-e445-7d18-b36c-fa95a1d2ab48": "사계절",
+}
+
+ITEM_TYPE_MAP = {
+    "019b12e6-8b94-7674-9969-c5e5d6b5ff4c": "셔츠",
+    "019b12fc-3066-74b8-8f79-982f1c5fdcb0": "티셔츠",
+    "019b12fc-3067-783d-be58-a331c3d99062": "맨투맨",
+    "019b12fc-3067-766b-a80c-b5544142ce43": "후드",
+    "019b12fc-3067-7943-8a7a-26f380619cf4": "바지",
+    "019b12fc-3067-780f-b9f7-404fb1ee8777": "치마",
+    "019b12fc-3067-7e07-9519-f0bfadbb309f": "반바지",
+    "019b12fc-3067-704f-aace-60bc275b6f72": "패딩",
+    "019b12fc-3067-75ab-8f9d-a4d79cca44b1": "자켓",
+    "019b12fc-3067-7ebe-9889-bd9a74d6859d": "원피스",
+    "019b12fc-3067-7e17-9d90-0bb5fc810e19": "스니커즈",
+    "019b12fc-3067-7fec-9339-ce75dd423964": "구두",
+    "019b12fc-3067-7ffa-9f64-4e2bc6384266": "부츠",
+}
+
+COLOR_MAP = {
+    1: "화이트",
+    2: "블랙",
+    3: "블루",
+    4: "네이비",
+    5: "핑크",
+    6: "레드",
+    7: "퍼플",
+    8: "베이지",
+}
+
+MATERIAL_MAP = {
+    1: "면",
+    2: "니트",
+    3: "데님",
+    4: "폴리",
+    5: "린넨",
+    6: "패딩",
+    7: "스웨이드",
+    8: "레더",
+}
+
+# category_id: 4:상의, 5:하의, 6:신발, 7:아우터
+CATEGORY_MAP = {
+    4: "상의",
+    5: "하의",
+    6: "신발",
+    7: "아우터",
+}
+
+# 종류 → 카테고리 (종류만 있고 category_id 가 없는 데이터를 가져올 때 사용)
+TYPE_CATEGORY = {
+    "셔츠": "상의",
+    "티셔츠": "상의",
+    "맨투맨": "상의",
+    "후드": "상의",
+    "원피스": "상의",
+    "바지": "하의",
+    "치마": "하의",
+    "반바지": "하의",
+    "패딩": "아우터",
+    "자켓": "아우터",
+    "스니커즈": "신발",
+    "구두": "신발",
+    "부츠": "신발",
+}
@@ -0,0 +1,581 @@
+"""
+Claude 호출 전송 계층 (LLM_TRANSPORT 로 선택)
+- live     : anthropic.Anthropic 그대로 (기본값)
+- record   : 실제로 호출하고 응답/지연 시간을 카세트 디렉터리에 저장 (요청 해시 = 파일 이름)
+- replay   : 저장된 응답을 네트워크 없이 돌려줌 (없으면 에러, LLM_REPLAY_MISS=synthetic 이면 합성 응답)
+- synthetic: 프롬프트의 옷 ID 로 올바른 형식의 추천 JSON 을 만들어 돌려줌 (녹화 불필요)
+
+tool_choice 로 도구 호출을 강제한 요청이면 (FashionRecommendationAI 구조화 출력)
+replay / synthetic 도 같은 JSON 을 tool_use 블록(input)으로 돌려주고, 스트림은 input_json 이벤트로 흘려보냄
+
+make_async_client() 는 같은 설정의 비동기 버전 (AsyncAnthropic, asgi_server 용)
+
+replay / synthetic 은 LLM_LATENCY 로 응답 지연을 흉내냄
+- "none" (기본) / "fixed:0.8" (초) / "lognormal:0.8,0.5" (중앙값 초, sigma) / "recorded" (녹화 시점 지연)
+부하 테스트 예:
+    LLM_TRANSPORT=replay LLM_LATENCY=recorded gunicorn -c gunicorn.conf.py api_server:app
+"""
+import asyncio
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from types import SimpleNamespace
+
+TRANSPORTS = ("live", "record", "replay", "synthetic")
+DEFAULT_CASSETTE_DIR = "cassettes"
+
+# 스트리밍 흉내낼 때 한 번에 내보내는 글자 수
+STREAM_CHUNK_CHARS = 24
+# 카세트 키 / 저장에 쓰는 요청 필드 (tools / tool_choice 는 있을 때만 키에 포함 → 기존 카세트 키 유지)
+REQUEST_FIELDS = ("model", "max_tokens", "system", "messages", "tools", "tool_choice")
+
+
+class CassetteMiss(LookupError):
+    """replay 모드에서 요청에 해당하는 녹화 응답이 없을 때"""
+
+
+def request_key(model, max_tokens, messages, system=None, tools=None, tool_choice=None):
+    """요청 내용(모델/토큰 제한/시스템 프롬프트/메시지/도구) → 카세트 키 (sha256)"""
+    request = {"model": model, "max_tokens": max_tokens, "system": system, "messages": messages}
+    if tools is not None:
+        request["tools"] = tools
+    if tool_choice is not None:
+        request["tool_choice"] = tool_choice
+    payload = json.dumps(request, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def forced_tool(request):
+    """tool_choice 로 강제한 도구 이름 (없으면 None)"""
+    choice = request.get("tool_choice")
+    if isinstance(choice, dict) and choice.get("type") == "tool":
+        return choice.get("name")
+    return None
+
+
+# ---------------------------------------------------------------------------
+# 합성 응답
+# ---------------------------------------------------------------------------
+
+# verbose: "- ID: xxx\n  이름: ...\n  카테고리: 상의" / compact: "i1|이름|상의|..."
+_VERBOSE_ITEM = re.compile(r"- ID: (\S+)\n  이름: (.*)\n  카테고리: (\S+)")
+_COMPACT_ITEM = re.compile(r"^(i\d+)\|([^|\n]*)\|([^|\n]*)\|", re.MULTILINE)
+
+SLOT_CATEGORY = {"top": "상의", "bottom": "하의", "outer": "아우터", "shoes": "신발"}
+# 계획 프롬프트 (FashionRecommendationAI._build_plan_prompt): 구간별 ID 목록 / 날짜별 한 줄
+_PLAN_BAND = re.compile(r"^- 구간 (\S+): (.*)$", re.MULTILINE)
+_PLAN_DAY = re.compile(r"^- 날짜: (.+?) \|.*\| 온도 구간: (\S+)$", re.MULTILINE)
+
+
+def prompt_candidates(prompt):
+    """프롬프트 옷 목록 → [(id, 이름, 카테고리)]"""
+    return _VERBOSE_ITEM.findall(prompt) or _COMPACT_ITEM.findall(prompt)
+
+
+def synthetic_response(prompt):
+    """카테고리별 첫 번째 후보를 고른 추천 JSON 문자열 (계획 프롬프트면 날짜별로)"""
+    candidates = prompt_candidates(prompt)
+    days = _PLAN_DAY.findall(prompt)
+    if days:
+        return json.dumps({"days": _synthetic_plan(candidates, days, prompt)}, ensure_ascii=False)
+    return json.dumps(_synthetic_outfit(candidates), ensure_ascii=False)
+
+
+def _synthetic_outfit(candidates, skip=()):
+    first = {}
+    for item_id, name, category in candidates:
+        if not (category == SLOT_CATEGORY["top"] and item_id in skip):
+            first.setdefault(category, (item_id, name))
+    result = {}
+    for slot, category in SLOT_CATEGORY.items():
+        item_id, name = first.get(category, (None, None))
+        result[slot] = {
+            "item_id": item_id,
+            "name": name,
+            "reason": f"{category} 중 날씨에 맞는 옷" if item_id else None,
+        }
+    result.update(concept="합성 코디", tip="합성 응답 팁", color_harmony="합성 응답 색상 조합")
+    return result
+
+
+def _synthetic_plan(candidates, days, prompt):
+    """날짜마다 그 구간 후보 중 아직 안 입은 첫 상의 + 카테고리별 첫 후보"""
+    band_ids = {band: set(ids.split(", ")) for band, ids in _PLAN_BAND.findall(prompt)}
+    plan, used_tops = [], set()
+    for date, band in days:
+        allowed = band_ids.get(band)
+        day_candidates = [c for c in candidates if allowed is None or c[0] in allowed]
+        outfit = _synthetic_outfit(day_candidates, skip=used_tops)
+        used_tops.add(outfit["top"]["item_id"])
+        plan.append({"date": date, **outfit})
+    return plan
+
+
+def _prompt_text(messages):
+    content = messages[-1]["content"] if messages else ""
+    if isinstance(content, list):
+        return "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return content
+
+
+# ---------------------------------------------------------------------------
+# 지연 시간 모델
+# ---------------------------------------------------------------------------
+
+class LatencyModel:
+    """응답 지연(초) 샘플러 — none / fixed / lognormal / recorded"""
+
+    def __init__(self, spec=None, seed=None):
+        self.spec = (spec or "none").strip().lower()
+        self.kind, _, args = self.spec.partition(":")
+        values = [float(v) for v in args.split(",") if v.strip()]
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+        if self.kind in ("none", "0", ""):
+            self.kind = "none"
+        elif self.kind == "fixed" and len(values) == 1:
+            self.seconds = values[0]
+        elif self.kind == "lognormal" and len(values) == 2:
+            self.median, self.sigma = values
+        elif self.kind != "recorded":
+            raise ValueError(f"지원하지 않는 LLM_LATENCY 값입니다: {spec}")
+
+    def sample(self, recorded=None):
+        if self.kind == "fixed":
+            return self.seconds
+        if self.kind == "lognormal":
+            with self._lock:
+                return self.median * self._rng.lognormvariate(0.0, self.sigma)
+        if self.kind == "recorded":
+            return recorded or 0.0
+        return 0.0
+
+
+# ---------------------------------------------------------------------------
+# 카세트 저장소
+# ---------------------------------------------------------------------------
+
+class CassetteStore:
+    """<dir>/<key>.json 한 파일에 요청 1건 (임시 파일 → rename 으로 원자적 저장)"""
+
+    def __init__(self, directory=None):
+        self.directory = directory or os.environ.get("LLM_CASSETTE_DIR", DEFAULT_CASSETTE_DIR)
+        # replay 중에는 같은 카세트를 반복해서 읽으므로 한 번 읽은 파일은 메모리에 보관
+        self._loaded = {}
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def load(self, key):
+        cassette = self._loaded.get(key)
+        if cassette is not None:
+            return cassette
+        try:
+            with open(self.path(key), encoding="utf-8") as f:
+                cassette = self._loaded[key] = json.load(f)
+        except FileNotFoundError:
+            return None
+        return cassette
+
+    def save(self, key, request, text, usage, latency):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "key": key,
+                "request": request,
+                "response": {"text": text, "usage": usage},
+                "latency": round(latency, 4),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            }, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path(key))
+
+
+def _usage_dict(usage):
+    if usage is None:
+        return None
+    return {
+        "input_tokens": getattr(usage, "input_tokens", None),
+        "output_tokens": getattr(usage, "output_tokens", None),
+        "cache_read_input_tokens": getattr(usage, "cache_read_input_tokens", None),
+        "cache_creation_input_tokens": getattr(usage, "cache_creation_input_tokens", None),
+    }
+
+
+def _message(text, usage, model, tool=None):
+    """anthropic Message 와 같은 모양 (content[].text 또는 content[].input, usage.*_tokens)"""
+    if tool is None:
+        content = SimpleNamespace(type="text", text=text)
+    else:
+        try:
+            tool_input = json.loads(text)
+        except ValueError:
+            tool_input = {}
+        content = SimpleNamespace(type="tool_use", id="toolu_offline", name=tool, input=tool_input)
+    return SimpleNamespace(
+        model=model,
+        role="assistant",
+        stop_reason="end_turn" if tool is None else "tool_use",
+        content=[content],
+        usage=SimpleNamespace(**(usage or {"input_tokens": None, "output_tokens": None})),
+    )
+
+
+def message_text(message):
+    """응답 메시지 → 카세트에 저장할 텍스트 (tool_use 블록은 input 을 JSON 으로)"""
+    parts = []
+    for block in message.content:
+        if getattr(block, "type", None) == "tool_use":
+            parts.append(json.dumps(block.input, ensure_ascii=False))
+        else:
+            parts.append(getattr(block, "text", ""))
+    return "".join(parts)
+
+
+def _event_delta(event):
+    """스트림 이벤트 → 텍스트 조각 (text / input_json 이벤트만, 나머지는 None)"""
+    if event.type == "text":
+        return event.text
+    if event.type == "input_json":
+        return event.partial_json
+    return None
+
+
+def _stream_events(chunks, tool):
+    """텍스트 조각 → SDK MessageStream 과 같은 모양의 이벤트 (도구 호출이면 input_json)"""
+    if tool is None:
+        return [SimpleNamespace(type="text", text=chunk) for chunk in chunks]
+    return [SimpleNamespace(type="input_json", partial_json=chunk) for chunk in chunks]
+
+
+# ---------------------------------------------------------------------------
+# record: 실제 호출 + 저장
+# ---------------------------------------------------------------------------
+
+class RecordingClient:
+    """anthropic 클라이언트를 감싸서 messages.create / messages.stream 결과를 카세트로 저장"""
+
+    transport = "record"
+
+    def __init__(self, client, store):
+        self._client = client
+        self.store = store
+        self.messages = self
+        self.recorded = 0
+
+    def with_options(self, **options):
+        return RecordingClient(self._client.with_options(**options), self.store)
+
+    def create(self, **kwargs):
+        started = time.perf_counter()
+        message = self._client.messages.create(**kwargs)
+        self._save(kwargs, message_text(message), _usage_dict(message.usage), time.perf_counter() - started)
+        return message
+
+    def stream(self, **kwargs):
+        return _RecordingStream(self, kwargs)
+
+    def _save(self, kwargs, text, usage, latency):
+        request = {k: kwargs.get(k) for k in REQUEST_FIELDS}
+        self.store.save(request_key(**request), request, text, usage, latency)
+        self.recorded += 1
+
+
+class _RecordingStream:
+    def __init__(self, owner, kwargs):
+        self._owner = owner
+        self._kwargs = kwargs
+        self._chunks = []
+
+    def __enter__(self):
+        self._started = time.perf_counter()
+        self._manager = self._owner._client.messages.stream(**self._kwargs)
+        self._stream = self._manager.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return self._manager.__exit__(exc_type, exc, tb)
+
+    @property
+    def text_stream(self):
+        for text in self._stream.text_stream:
+            self._chunks.append(text)
+            yield text
+
+    def __iter__(self):
+        for event in self._stream:
+            delta = _event_delta(event)
+            if delta is not None:
+                self._chunks.append(delta)
+            yield event
+
+    def get_final_message(self):
+        message = self._stream.get_final_message()
+        self._owner._save(
+            self._kwargs, "".join(self._chunks), _usage_dict(message.usage),
+            time.perf_counter() - self._started,
+        )
+        return message
+
+
+class AsyncRecordingClient(RecordingClient):
+    """RecordingClient 의 AsyncAnthropic 버전"""
+
+    def with_options(self, **options):
+        return AsyncRecordingClient(self._client.with_options(**options), self.store)
+
+    async def create(self, **kwargs):
+        started = time.perf_counter()
+        message = await self._client.messages.create(**kwargs)
+        self._save(kwargs, message_text(message), _usage_dict(message.usage), time.perf_counter() - started)
+        return message
+
+    def stream(self, **kwargs):
+        return _AsyncRecordingStream(self, kwargs)
+
+
+class _AsyncRecordingStream(_RecordingStream):
+    async def __aenter__(self):
+        self._started = time.perf_counter()
+        self._manager = self._owner._client.messages.stream(**self._kwargs)
+        self._stream = await self._manager.__aenter__()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return await self._manager.__aexit__(exc_type, exc, tb)
+
+    @property
+    async def text_stream(self):
+        async for text in self._stream.text_stream:
+            self._chunks.append(text)
+            yield text
+
+    async def __aiter__(self):
+        async for event in self._stream:
+            delta = _event_delta(event)
+            if delta is not None:
+                self._chunks.append(delta)
+            yield event
+
+    async def get_final_message(self):
+        message = await self._stream.get_final_message()
+        self._owner._save(
+            self._kwargs, "".join(self._chunks), _usage_dict(message.usage),
+            time.perf_counter() - self._started,
+        )
+        return message
+
+
+# ---------------------------------------------------------------------------
+# replay / synthetic: 네트워크 없이 응답
+# ---------------------------------------------------------------------------
+
+class OfflineClient:
+    """
+    messages.create / messages.stream / with_options 만 흉내내는 클라이언트
+    - responder(request, key) → (text, usage, recorded_latency)
+    - with_options(timeout=...) 보다 지연이 길면 그만큼 기다린 뒤 TimeoutError (auto 모드 대체 경로 확인용)
+    """
+
+    def __init__(self, transport, responder, latency, timeout=None, store=None):
+        self.transport = transport
+        self._responder = responder
+        self.latency = latency
+        self.timeout = timeout
+        self.store = store
+        self.messages = self
+
+    def with_options(self, timeout=None, **options):
+        return OfflineClient(
+            self.transport, self._responder, self.latency, timeout=timeout, store=self.store
+        )
+
+    def _respond(self, kwargs):
+        request = {k: kwargs.get(k) for k in REQUEST_FIELDS}
+        text, usage, recorded = self._responder(request, request_key(**request))
+        return text, usage, self.latency.sample(recorded)
+
+    def _wait(self, seconds):
+        if self.timeout is not None and seconds > self.timeout:
+            time.sleep(self.timeout)
+            raise TimeoutError(f"응답 시간 초과 ({self.timeout}초)")
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def create(self, **kwargs):
+        text, usage, delay = self._respond(kwargs)
+        self._wait(delay)
+        return _message(text, usage, kwargs.get("model"), forced_tool(kwargs))
+
+    def stream(self, **kwargs):
+        text, usage, delay = self._respond(kwargs)
+        return _OfflineStream(self, text, usage, delay, kwargs.get("model"), forced_tool(kwargs))
+
+
+class _OfflineStream:
+    """지연 시간을 조각 수만큼 나눠서 텍스트를 흘려보내는 스트림"""
+
+    def __init__(self, client, text, usage, delay, model, tool=None):
+        self._client = client
+        self._text = text
+        self._usage = usage
+        self._delay = delay
+        self._model = model
+        self._tool = tool
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def _chunks(self):
+        return [
+            self._text[i:i + STREAM_CHUNK_CHARS]
+            for i in range(0, len(self._text), STREAM_CHUNK_CHARS)
+        ] or [""]
+
+    @property
+    def text_stream(self):
+        for event in self:
+            if event.type == "text":
+                yield event.text
+
+    def __iter__(self):
+        events = _stream_events(self._chunks(), self._tool)
+        if self._client.timeout is not None and self._delay > self._client.timeout:
+            self._client._wait(self._delay)  # TimeoutError
+        for event in events:
+            self._client._wait(self._delay / len(events))
+            yield event
+
+    def get_final_message(self):
+        return _message(self._text, self._usage, self._model, self._tool)
+
+
+class AsyncOfflineClient(OfflineClient):
+    """OfflineClient 의 비동기 버전 (지연은 asyncio.sleep 으로 흉내내서 이벤트 루프를 막지 않음)"""
+
+    def with_options(self, timeout=None, **options):
+        return AsyncOfflineClient(
+            self.transport, self._responder, self.latency, timeout=timeout, store=self.store
+        )
+
+    async def _wait_async(self, seconds):
+        if self.timeout is not None and seconds > self.timeout:
+            await asyncio.sleep(self.timeout)
+            raise TimeoutError(f"응답 시간 초과 ({self.timeout}초)")
+        if seconds > 0:
+            await asyncio.sleep(seconds)
+
+    async def create(self, **kwargs):
+        text, usage, delay = self._respond(kwargs)
+        await self._wait_async(delay)
+        return _message(text, usage, kwargs.get("model"), forced_tool(kwargs))
+
+    def stream(self, **kwargs):
+        text, usage, delay = self._respond(kwargs)
+        return _AsyncOfflineStream(self, text, usage, delay, kwargs.get("model"), forced_tool(kwargs))
+
+
+class _AsyncOfflineStream(_OfflineStream):
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    @property
+    async def text_stream(self):
+        async for event in self:
+            if event.type == "text":
+                yield event.text
+
+    async def __aiter__(self):
+        events = _stream_events(self._chunks(), self._tool)
+        if self._client.timeout is not None and self._delay > self._client.timeout:
+            await self._client._wait_async(self._delay)  # TimeoutError
+        for event in events:
+            await self._client._wait_async(self._delay / len(events))
+            yield event
+
+    async def get_final_message(self):
+        return _message(self._text, self._usage, self._model, self._tool)
+
+
+def _synthetic_responder(request, key):
+    prompt = _prompt_text(request["messages"])
+    text = synthetic_response(prompt)
+    return text, {"input_tokens": len(prompt) // 2, "output_tokens": len(text) // 2}, None
+
+
+def _replay_responder(store, on_miss):
+    def respond(request, key):
+        cassette = store.load(key)
+        if cassette is None:
+            if on_miss == "synthetic":
+                return _synthetic_responder(request, key)
+            raise CassetteMiss(f"녹화된 응답이 없습니다: {store.path(key)}")
+        response = cassette["response"]
+        return response["text"], response.get("usage"), cassette.get("latency")
+    return respond
+
+
+def make_client(api_key=None, transport=None, cassette_dir=None, latency=None, asynchronous=False):
+    """
+    LLM_TRANSPORT 설정에 맞는 Claude 클라이언트 생성
+    (live / record 는 API 키 필요, replay / synthetic 은 키 없이 동작)
+    asynchronous=True 면 await 로 쓰는 비동기 클라이언트
+    """
+    transport = (transport or os.environ.get("LLM_TRANSPORT", "live")).lower()
+    if transport not in TRANSPORTS:
+        raise ValueError(f"지원하지 않는 LLM_TRANSPORT 입니다: {transport}")
+
+    if transport in ("live", "record"):
+        if not api_key:
+            raise ValueError("ANTHROPIC_API_KEY가 설정되어 있지 않습니다.")
+        import anthropic
+        if asynchronous:
+            client = anthropic.AsyncAnthropic(api_key=api_key)
+        else:
+            client = anthropic.Anthropic(api_key=api_key)
+        if transport == "live":
+            return client
+        recorder = AsyncRecordingClient if asynchronous else RecordingClient
+        return recorder(client, CassetteStore(cassette_dir))
+
+    if not isinstance(latency, LatencyModel):
+        seed = os.environ.get("LLM_LATENCY_SEED")
+        latency = LatencyModel(
+            latency or os.environ.get("LLM_LATENCY"),
+            seed=int(seed) if seed else None,
+        )
+    offline = AsyncOfflineClient if asynchronous else OfflineClient
+    if transport == "synthetic":
+        return offline("synthetic", _synthetic_responder, latency)
+
+    store = CassetteStore(cassette_dir)
+    on_miss = os.environ.get("LLM_REPLAY_MISS", "error").lower()
+    return offline("replay", _replay_responder(store, on_miss), latency, store=store)
+
+
+def make_async_client(api_key=None, transport=None, cassette_dir=None, latency=None):
+    """make_client 의 비동기 버전 (AsyncAnthropic / 비동기 녹화·재생·합성 클라이언트)"""
+    return make_client(api_key, transport, cassette_dir, latency, asynchronous=True)
+
+
+def describe(client):
+    """health 응답용 전송 계층 정보"""
+    info = {"transport": getattr(client, "transport", "live")}
+    latency = getattr(client, "latency", None)
+    if latency is not None:
+        info["latency"] = latency.spec
+    store = getattr(client, "store", None)
+    if store is not None:
+        info["cassette_dir"] = store.directory
+    return info
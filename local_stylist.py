@@ -0,0 +1,319 @@
+import functools
+
+import numpy as np
+
+from closet_columns import VOCAB, LABEL_INDEX, as_columnar
+from recommendation_cache import normalize_text
+from weather_rules import (
+    TEMP_BANDS,
+    SEASON_FIT,
+    MATERIAL_FIT,
+    OUTER_BANDS,
+    temperature_band,
+)
+
+# ==========================
+# 라벨 사전 (closet_columns 코드와 동일, 마지막 인덱스 = 알 수 없음)
+# ==========================
+
+COLORS = VOCAB["color"]
+STYLES = VOCAB["style"]
+MATERIALS = VOCAB["material"]
+SEASONS = VOCAB["season"]
+
+COLOR_INDEX = LABEL_INDEX["color"]
+STYLE_INDEX = LABEL_INDEX["style"]
+BAND_INDEX = {band: i for i, band in enumerate(TEMP_BANDS)}
+
+SLOTS = ["top", "bottom", "outer", "shoes"]
+SLOT_CATEGORY = {"top": "상의", "bottom": "하의", "outer": "아우터", "shoes": "신발"}
+SLOT_CATEGORY_CODE = {slot: LABEL_INDEX["category"][label] for slot, label in SLOT_CATEGORY.items()}
+
+NEUTRAL_COLORS = {"화이트", "블랙", "네이비", "베이지"}
+
+# 특히 잘 어울리는 / 안 어울리는 색 조합 (순서 무관)
+COLOR_PAIR_SCORES = {
+    ("화이트", "블랙"): 1.0,
+    ("화이트", "네이비"): 1.0,
+    ("화이트", "블루"): 1.0,
+    ("베이지", "네이비"): 0.95,
+    ("베이지", "블루"): 0.9,
+    ("화이트", "핑크"): 0.9,
+    ("네이비", "핑크"): 0.9,
+    ("블랙", "레드"): 0.9,
+    ("블랙", "퍼플"): 0.85,
+    ("블루", "네이비"): 0.5,
+    ("핑크", "퍼플"): 0.4,
+    ("레드", "핑크"): 0.2,
+    ("레드", "퍼플"): 0.2,
+}
+
+# 함께 입어도 어색하지 않은 스타일 조합 (순서 무관)
+STYLE_PAIR_SCORES = {
+    ("캐쥬얼", "데일리"): 0.85,
+    ("캐쥬얼", "스트릿"): 0.75,
+    ("미니멀", "포멀"): 0.8,
+    ("미니멀", "데일리"): 0.8,
+    ("미니멀", "캐쥬얼"): 0.7,
+    ("스트릿", "데일리"): 0.7,
+    ("러블리", "데일리"): 0.7,
+    ("러블리", "캐쥬얼"): 0.6,
+    ("러블리", "미니멀"): 0.6,
+    ("포멀", "데일리"): 0.5,
+}
+
+# 일정 키워드별 선호 스타일
+SCHEDULE_STYLE_RULES = [
+    (("출근", "회사", "회의", "미팅", "면접", "발표", "결혼식", "격식"),
+     {"포멀": 1.0, "미니멀": 0.8, "데일리": 0.4}),
+    (("데이트", "소개팅", "파티", "모임"),
+     {"러블리": 1.0, "미니멀": 0.8, "캐쥬얼": 0.6}),
+    (("운동", "야외", "등산", "캠핑", "여행", "산책", "놀이공원"),
+     {"캐쥬얼": 1.0, "스트릿": 0.9, "데일리": 0.7}),
+    (("학교", "수업", "카페", "쇼핑", "친구"),
+     {"데일리": 1.0, "캐쥬얼": 0.9, "스트릿": 0.7}),
+]
+DEFAULT_SCHEDULE_STYLE = {"데일리": 0.8, "캐쥬얼": 0.8, "미니멀": 0.7}
+
+BAND_TIPS = {
+    "lt10": "추운 날씨라 아우터 안에 니트나 맨투맨으로 레이어드하면 보온성이 좋아요.",
+    "10-15": "일교차가 크니 아우터를 걸쳤다 벗었다 할 수 있게 입어보세요.",
+    "15-20": "가벼운 아우터 하나면 아침저녁 쌀쌀함에 대비할 수 있어요.",
+    "20-25": "활동하기 좋은 날씨라 가벼운 소재로 산뜻하게 연출해보세요.",
+    "ge25": "더운 날씨라 통풍이 잘 되는 소재로 시원하게 입는 걸 추천해요.",
+    "unknown": "날씨 정보가 부족하니 가볍게 걸칠 아이템을 챙겨보세요.",
+}
+
+
+def _pair_matrix(labels, pair_scores, same_score, default_score, unknown_score,
+                 neutral=None, neutral_score=None):
+    """라벨 쌍 점수표 → (n+1)x(n+1) 대칭 행렬 (마지막 행/열 = 알 수 없음)"""
+    n = len(labels)
+    matrix = np.full((n + 1, n + 1), default_score, dtype=np.float32)
+    for i, a in enumerate(labels):
+        for j, b in enumerate(labels):
+            if i == j:
+                matrix[i, j] = same_score
+            elif neutral and (a in neutral or b in neutral):
+                matrix[i, j] = neutral_score
+    for (a, b), score in pair_scores.items():
+        if a in labels and b in labels:
+            i, j = labels.index(a), labels.index(b)
+            matrix[i, j] = matrix[j, i] = score
+    matrix[n, :] = unknown_score
+    matrix[:, n] = unknown_score
+    return matrix
+
+
+COLOR_HARMONY = _pair_matrix(
+    COLORS, COLOR_PAIR_SCORES,
+    same_score=0.6, default_score=0.4, unknown_score=0.5,
+    neutral=NEUTRAL_COLORS, neutral_score=0.8,
+)
+
+STYLE_CONSISTENCY = _pair_matrix(
+    STYLES, STYLE_PAIR_SCORES,
+    same_score=1.0, default_score=0.25, unknown_score=0.5,
+)
+
+
+def _fit_matrix(labels, fit_table, match_score, miss_score, unknown_score, overrides=None):
+    """온도 구간 x 라벨 적합도 행렬 (마지막 열 = 알 수 없음)"""
+    matrix = np.full((len(TEMP_BANDS), len(labels) + 1), miss_score, dtype=np.float32)
+    for b, band in enumerate(TEMP_BANDS):
+        for i, label in enumerate(labels):
+            if label in fit_table[band]:
+                matrix[b, i] = (overrides or {}).get(label, match_score)
+        matrix[b, len(labels)] = unknown_score
+    return matrix
+
+
+# '사계절'은 어느 구간에나 맞지만 딱 맞는 계절 옷을 조금 더 우선
+SEASON_WEATHER_FIT = _fit_matrix(SEASONS, SEASON_FIT, 1.0, 0.2, 0.4, overrides={"사계절": 0.8})
+MATERIAL_WEATHER_FIT = _fit_matrix(MATERIALS, MATERIAL_FIT, 1.0, 0.2, 0.4)
+
+
+@functools.lru_cache(maxsize=256)
+def schedule_affinity(schedule):
+    """일정 문자열 → 스타일별 선호도 벡터 (마지막 = 알 수 없음)"""
+    text = normalize_text(schedule)
+    weights = DEFAULT_SCHEDULE_STYLE
+    for keywords, style_weights in SCHEDULE_STYLE_RULES:
+        if any(keyword in text for keyword in keywords):
+            weights = style_weights
+            break
+
+    vector = np.full(len(STYLES) + 1, 0.3, dtype=np.float32)
+    for label, weight in weights.items():
+        vector[STYLE_INDEX[label]] = weight
+    vector[len(STYLES)] = 0.4
+    vector.setflags(write=False)
+    return vector
+
+
+class LocalOutfitEngine:
+    """
+    LLM 없이 옷장만으로 코디를 고르는 규칙 기반 엔진
+    - 아이템 단위 점수: 날씨 적합도(재질/계절) + 일정-스타일 선호도
+    - 조합 점수: 색상 조화 + 스타일 통일감 (행렬 브로드캐스팅으로 전 조합 계산)
+    - 카테고리별 상위 top_k 개만 조합에 넣어 옷장이 커져도 일정한 시간에 응답
+    """
+
+    def __init__(self, top_k=12):
+        self.top_k = top_k
+
+    def score_items(self, clothes, weather, schedule):
+        """아이템별 단독 점수 (날씨 적합도 + 일정 선호도)"""
+        closet = as_columnar(clothes)
+        band = temperature_band(weather.get('temp'))
+        return _unary_scores(closet, band, schedule)
+
+    def recommend(self, clothes, weather, schedule):
+        """_create_prompt 응답 형식과 동일한 dict 반환 (dict 리스트 / ColumnarCloset 모두 가능)"""
+        closet = as_columnar(clothes)
+        band = temperature_band(weather.get('temp'))
+        colors = closet.scoring_codes("color")
+        styles = closet.scoring_codes("style")
+        unary = _unary_scores(closet, band, schedule)
+        categories = closet.codes["category"]
+
+        # 슬롯별 후보 (상위 top_k 개)
+        candidates = {}
+        for slot in SLOTS:
+            if slot == "outer" and band not in OUTER_BANDS:
+                candidates[slot] = np.empty(0, dtype=np.int64)
+                continue
+            idx = np.flatnonzero(categories == SLOT_CATEGORY_CODE[slot])
+            if len(idx) > self.top_k:
+                best = np.argpartition(-unary[idx], self.top_k - 1)[:self.top_k]
+                idx = idx[best]
+            candidates[slot] = idx
+
+        if len(candidates["top"]) == 0 or len(candidates["bottom"]) == 0:
+            return {
+                "error": "상의와 하의가 모두 있어야 추천할 수 있습니다",
+                "suggestion": "옷장에 날씨에 맞는 상의와 하의를 추가해보세요"
+            }
+
+        # 빈 슬롯(아우터/신발 없음)은 점수 0짜리 가상 후보 하나로 처리
+        slot_unary, slot_colors, slot_styles, slot_valid = [], [], [], []
+        for slot in SLOTS:
+            idx = candidates[slot]
+            if len(idx) == 0:
+                slot_unary.append(np.zeros(1, dtype=np.float32))
+                slot_colors.append(np.full(1, len(COLORS), dtype=np.int16))
+                slot_styles.append(np.full(1, len(STYLES), dtype=np.int16))
+                slot_valid.append(np.zeros(1, dtype=np.float32))
+            else:
+                slot_unary.append(unary[idx])
+                slot_colors.append(colors[idx])
+                slot_styles.append(styles[idx])
+                slot_valid.append(np.ones(len(idx), dtype=np.float32))
+
+        # 각 슬롯을 4차원 텐서의 한 축으로 펼쳐서 전 조합 점수 계산
+        def expand(values, axis):
+            shape = [1] * len(SLOTS)
+            shape[axis] = len(values)
+            return values.reshape(shape)
+
+        total = sum(expand(slot_unary[a], a) for a in range(len(SLOTS)))
+        for a in range(len(SLOTS)):
+            for b in range(a + 1, len(SLOTS)):
+                pair = 0.5 * (
+                    COLOR_HARMONY[slot_colors[a][:, None], slot_colors[b][None, :]]
+                    + STYLE_CONSISTENCY[slot_styles[a][:, None], slot_styles[b][None, :]]
+                )
+                pair *= slot_valid[a][:, None] * slot_valid[b][None, :]
+                shape = [1] * len(SLOTS)
+                shape[a], shape[b] = pair.shape
+                total = total + pair.reshape(shape)
+
+        best = np.unravel_index(int(np.argmax(total)), total.shape)
+        picks = {}
+        for axis, slot in enumerate(SLOTS):
+            idx = candidates[slot]
+            picks[slot] = closet.row(int(idx[best[axis]])) if len(idx) else None
+
+        return self._describe(picks, band, schedule)
+
+    def describe_item(self, item, weather, schedule):
+        """옷 하나 → 슬롯 dict (LLM 응답의 빈/틀린 슬롯을 채울 때 사용)"""
+        band = temperature_band(weather.get('temp'))
+        return {
+            "item_id": item.get('id'),
+            "name": _display_name(item),
+            "reason": _item_reason(item, band, schedule),
+        }
+
+    def describe(self, picks, weather, schedule):
+        """{slot: 옷 dict 또는 None} → recommend 와 같은 형식 (concept/tip/color_harmony 포함)"""
+        return self._describe(picks, temperature_band(weather.get('temp')), schedule)
+
+    def _describe(self, picks, band, schedule):
+        """선택 결과를 LLM 응답과 같은 스키마로 정리"""
+        result = {}
+        for slot in SLOTS:
+            item = picks[slot]
+            if item is None:
+                result[slot] = {"item_id": None, "name": None, "reason": None}
+                continue
+            result[slot] = {
+                "item_id": item.get('id'),
+                "name": _display_name(item),
+                "reason": _item_reason(item, band, schedule),
+            }
+
+        chosen = [picks[slot] for slot in SLOTS if picks[slot] is not None]
+        styles = [item.get('style') for item in chosen if item.get('style')]
+        main_style = max(set(styles), key=styles.count) if styles else "데일리"
+
+        top_color = picks["top"].get('color')
+        bottom_color = picks["bottom"].get('color')
+        harmony = COLOR_HARMONY[
+            COLOR_INDEX.get(top_color, len(COLORS)),
+            COLOR_INDEX.get(bottom_color, len(COLORS)),
+        ]
+        if harmony >= 0.85:
+            feel = "깔끔하고 안정적인"
+        elif harmony >= 0.6:
+            feel = "무난하게 잘 어울리는"
+        else:
+            feel = "개성 있는 포인트가 되는"
+
+        result["concept"] = f"{main_style} 무드의 {schedule} 코디"
+        result["tip"] = BAND_TIPS[band]
+        result["color_harmony"] = (
+            f"{top_color or '상의'} 상의와 {bottom_color or '하의'} 하의의 {feel} 조합입니다."
+        )
+        return result
+
+
+def _unary_scores(closet, band, schedule):
+    b = BAND_INDEX[band]
+    weather_fit = (
+        0.6 * MATERIAL_WEATHER_FIT[b, closet.scoring_codes("material")]
+        + 0.4 * SEASON_WEATHER_FIT[b, closet.scoring_codes("season")]
+    )
+    return weather_fit + 0.8 * schedule_affinity(schedule)[closet.scoring_codes("style")]
+
+
+def _display_name(item):
+    name = item.get('name')
+    if name:
+        return name
+    return " ".join(v for v in (item.get('color'), item.get('type')) if v) or None
+
+
+def _item_reason(item, band, schedule):
+    parts = []
+    material = item.get('material')
+    if material and material in MATERIAL_FIT[band]:
+        parts.append(f"{material} 소재라 오늘 날씨에 적당하고")
+    elif item.get('season') in SEASON_FIT[band]:
+        parts.append(f"{item.get('season')} 옷이라 오늘 날씨에 적당하고")
+    style = item.get('style')
+    if style:
+        parts.append(f"{style} 스타일이 {schedule} 일정에 잘 맞습니다")
+    else:
+        parts.append(f"{schedule} 일정에 무난하게 어울립니다")
+    return " ".join(parts)
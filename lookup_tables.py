@@ -0,0 +1,111 @@
+import asyncio
+import os
+import threading
+import time
+
+from closet_columns import LabelVocabulary, STATIC_MAPS
+
+# 라벨 사전 버전을 DB 에 다시 물어보는 최소 간격 (초)
+LOOKUP_CHECK_INTERVAL = float(os.environ.get("LOOKUP_CHECK_INTERVAL", 30))
+
+
+def seed_entries():
+    """label_maps 하드코딩 매핑 → lookup_labels 초기 데이터 [(kind, code, label)]"""
+    return [
+        (kind, str(code), label)
+        for kind, mapping in STATIC_MAPS.items()
+        for code, label in mapping.items()
+    ]
+
+
+class LookupCache:
+    """
+    워커 프로세스당 하나씩 들고 있는 라벨 사전 캐시
+    - 평소에는 메모리의 LabelVocabulary 스냅샷을 그대로 돌려줌
+    - check_interval 초마다 한 번만 DB 버전(lookup_version)을 확인하고, 바뀌었을 때만 전체 재로딩
+    - DB 를 못 읽으면 마지막 스냅샷(처음엔 label_maps 기본 사전)을 계속 사용
+
+    load_version(): 현재 버전 (int), load_entries(): [(kind, code, label)]
+    """
+
+    def __init__(self, load_version, load_entries, check_interval=None):
+        self._load_version = load_version
+        self._load_entries = load_entries
+        self.check_interval = LOOKUP_CHECK_INTERVAL if check_interval is None else check_interval
+        self._vocabulary = LabelVocabulary.static()
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._async_refresh = None
+        self.reloads = 0
+
+    def get(self) -> LabelVocabulary:
+        """현재 라벨 사전 (필요할 때만 버전 확인)"""
+        checked_at = self._checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.check_interval:
+            return self._vocabulary
+
+        with self._lock:
+            # 다른 스레드가 방금 확인했으면 그대로 사용
+            if self._checked_at is not None and time.monotonic() - self._checked_at < self.check_interval:
+                return self._vocabulary
+            self._refresh()
+            self._checked_at = time.monotonic()
+            return self._vocabulary
+
+    async def get_async(self, load_version, load_entries) -> LabelVocabulary:
+        """
+        get() 의 asyncio 버전 (load_version / load_entries 는 코루틴 함수)
+        확인 중에 들어온 코루틴은 같은 확인을 기다렸다가 결과를 함께 사용
+        """
+        checked_at = self._checked_at
+        if checked_at is not None and time.monotonic() - checked_at < self.check_interval:
+            return self._vocabulary
+
+        if self._async_refresh is None:
+            self._async_refresh = asyncio.ensure_future(self._refresh_async(load_version, load_entries))
+        refresh = self._async_refresh
+        try:
+            await asyncio.shield(refresh)
+        finally:
+            if self._async_refresh is refresh and refresh.done():
+                self._async_refresh = None
+        return self._vocabulary
+
+    async def _refresh_async(self, load_version, load_entries):
+        try:
+            version = await load_version()
+            if version != self._vocabulary.version:
+                self._install(version, await load_entries())
+        except Exception as e:
+            print(f"⚠️ 라벨 사전 확인 실패, 기존 사전 사용: {e}")
+        self._checked_at = time.monotonic()
+
+    def invalidate(self):
+        """다음 get() 에서 바로 버전 확인"""
+        self._checked_at = None
+
+    def _refresh(self):
+        try:
+            version = self._load_version()
+            if version == self._vocabulary.version:
+                return
+            self._install(version, self._load_entries())
+        except Exception as e:
+            print(f"⚠️ 라벨 사전 확인 실패, 기존 사전 사용: {e}")
+
+    def _install(self, version, entries):
+        # DB 항목 우선, 그 다음 label_maps (DB 에서 지워진 예전 코드값도 계속 해석되도록)
+        self._vocabulary = LabelVocabulary.from_entries(
+            list(entries) + seed_entries(), version=version
+        )
+        self.reloads += 1
+        print(f"🏷️ 라벨 사전 로딩 (버전 {version}, {len(entries)}개)")
+
+    def stats(self):
+        vocabulary = self._vocabulary
+        return {
+            "version": vocabulary.version,
+            "reloads": self.reloads,
+            "check_interval": self.check_interval,
+            "labels": {field: len(labels) - 1 for field, labels in vocabulary.labels.items()},
+        }
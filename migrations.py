@@ -0,0 +1,350 @@
+"""
+스키마 마이그레이션 (버전 관리)
+
+- schema_migrations 테이블에 적용된 버전을 기록
+- 여러 gunicorn 워커가 동시에 시작해도 advisory lock 으로 한 번만 적용
+- 인덱스는 CREATE INDEX CONCURRENTLY 로 만들어서 운영 중 쓰기를 막지 않음
+  (CONCURRENTLY 는 트랜잭션 안에서 못 쓰므로 그런 마이그레이션은 autocommit 으로 실행)
+
+사용법:
+    python migrations.py status
+    python migrations.py upgrade [버전]
+    python migrations.py downgrade <버전>
+"""
+import sys
+import time
+from dataclasses import dataclass
+from typing import List
+
+from sqlalchemy import text
+
+from lookup_tables import seed_entries
+
+# 다른 앱과 겹치지 않는 임의의 advisory lock 키
+MIGRATION_LOCK_KEY = 7305120401
+LOCK_POLL_SECONDS = 0.5
+
+
+@dataclass
+class Migration:
+    version: int
+    description: str
+    upgrade: List[str]
+    downgrade: List[str]
+    # False 면 문장마다 autocommit 으로 실행 (CREATE INDEX CONCURRENTLY 등)
+    transactional: bool = True
+
+
+def _sql_literal(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(
+        version=1,
+        description="clothes_table 조회용 인덱스 (user_id / user_id+category_id / user_id+created_at)",
+        upgrade=[
+            # get_ai_ready_closet: WHERE user_id = ?
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_clothes_user_id "
+            "ON clothes_table (user_id)",
+            # 사용자 + 카테고리별 조회
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_clothes_user_category "
+            "ON clothes_table (user_id, category_id)",
+            # GET /api/clothes?user_id= 의 keyset 페이지네이션 (created_at, cloth_id)
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_clothes_user_created "
+            "ON clothes_table (user_id, created_at, cloth_id)",
+            # GET /api/clothes (user_id 없이) 의 keyset 페이지네이션
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_clothes_created "
+            "ON clothes_table (created_at, cloth_id)",
+        ],
+        downgrade=[
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_clothes_created",
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_clothes_user_created",
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_clothes_user_category",
+            "DROP INDEX CONCURRENTLY IF EXISTS ix_clothes_user_id",
+        ],
+        transactional=False,
+    ),
+    Migration(
+        version=2,
+        description="라벨 사전 테이블 (lookup_labels) + 변경 시 버전 증가 트리거",
+        upgrade=[
+            """
+            CREATE TABLE IF NOT EXISTS lookup_labels (
+                kind TEXT NOT NULL,
+                code TEXT NOT NULL,
+                label TEXT NOT NULL,
+                PRIMARY KEY (kind, code)
+            )
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS lookup_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                version BIGINT NOT NULL
+            )
+            """,
+            "INSERT INTO lookup_version (id, version) VALUES (1, 0) ON CONFLICT (id) DO NOTHING",
+            """
+            CREATE OR REPLACE FUNCTION bump_lookup_version() RETURNS trigger AS $$
+            BEGIN
+                UPDATE lookup_version SET version = version + 1 WHERE id = 1;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            "DROP TRIGGER IF EXISTS lookup_labels_version ON lookup_labels",
+            """
+            CREATE TRIGGER lookup_labels_version
+            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON lookup_labels
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_lookup_version()
+            """,
+            # label_maps 하드코딩 매핑을 초기 데이터로 (이미 있는 코드는 그대로)
+            "INSERT INTO lookup_labels (kind, code, label) VALUES "
+            + ", ".join(
+                "(" + ", ".join(_sql_literal(v) for v in entry) + ")"
+                for entry in seed_entries()
+            )
+            + " ON CONFLICT (kind, code) DO NOTHING",
+        ],
+        downgrade=[
+            "DROP TABLE IF EXISTS lookup_labels",
+            "DROP TABLE IF EXISTS lookup_version",
+            "DROP FUNCTION IF EXISTS bump_lookup_version()",
+        ],
+    ),
+    Migration(
+        version=3,
+        description="사용자별 옷장 버전 (closet_versions) + clothes_table 변경 시 버전 증가 트리거",
+        upgrade=[
+            """
+            CREATE TABLE IF NOT EXISTS closet_versions (
+                user_id UUID PRIMARY KEY,
+                version BIGINT NOT NULL
+            )
+            """,
+            # 문장 단위 트리거: 대량 INSERT(closet_import) 도 사용자당 한 번만 증가
+            """
+            CREATE OR REPLACE FUNCTION bump_closet_versions() RETURNS trigger AS $$
+            BEGIN
+                IF TG_OP = 'TRUNCATE' THEN
+                    UPDATE closet_versions SET version = version + 1;
+                    RETURN NULL;
+                END IF;
+
+                IF TG_OP = 'INSERT' THEN
+                    INSERT INTO closet_versions (user_id, version)
+                    SELECT DISTINCT user_id, 1 FROM new_rows WHERE user_id IS NOT NULL
+                    ON CONFLICT (user_id) DO UPDATE SET version = closet_versions.version + 1;
+                ELSIF TG_OP = 'UPDATE' THEN
+                    INSERT INTO closet_versions (user_id, version)
+                    SELECT user_id, 1 FROM (
+                        SELECT user_id FROM old_rows UNION SELECT user_id FROM new_rows
+                    ) changed WHERE user_id IS NOT NULL
+                    ON CONFLICT (user_id) DO UPDATE SET version = closet_versions.version + 1;
+                ELSE
+                    INSERT INTO closet_versions (user_id, version)
+                    SELECT DISTINCT user_id, 1 FROM old_rows WHERE user_id IS NOT NULL
+                    ON CONFLICT (user_id) DO UPDATE SET version = closet_versions.version + 1;
+                END IF;
+                RETURN NULL;
+            END
+            $$ LANGUAGE plpgsql
+            """,
+            # 전이 테이블(REFERENCING)은 이벤트 하나짜리 트리거에만 쓸 수 있어서 이벤트별로 생성
+            "DROP TRIGGER IF EXISTS clothes_closet_version_insert ON clothes_table",
+            """
+            CREATE TRIGGER clothes_closet_version_insert
+            AFTER INSERT ON clothes_table REFERENCING NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_closet_versions()
+            """,
+            "DROP TRIGGER IF EXISTS clothes_closet_version_update ON clothes_table",
+            """
+            CREATE TRIGGER clothes_closet_version_update
+            AFTER UPDATE ON clothes_table REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_closet_versions()
+            """,
+            "DROP TRIGGER IF EXISTS clothes_closet_version_delete ON clothes_table",
+            """
+            CREATE TRIGGER clothes_closet_version_delete
+            AFTER DELETE ON clothes_table REFERENCING OLD TABLE AS old_rows
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_closet_versions()
+            """,
+            "DROP TRIGGER IF EXISTS clothes_closet_version_truncate ON clothes_table",
+            """
+            CREATE TRIGGER clothes_closet_version_truncate
+            AFTER TRUNCATE ON clothes_table
+            FOR EACH STATEMENT EXECUTE FUNCTION bump_closet_versions()
+            """,
+        ],
+        downgrade=[
+            "DROP TRIGGER IF EXISTS clothes_closet_version_truncate ON clothes_table",
+            "DROP TRIGGER IF EXISTS clothes_closet_version_delete ON clothes_table",
+            "DROP TRIGGER IF EXISTS clothes_closet_version_update ON clothes_table",
+            "DROP TRIGGER IF EXISTS clothes_closet_version_insert ON clothes_table",
+            "DROP FUNCTION IF EXISTS bump_closet_versions()",
+            "DROP TABLE IF EXISTS closet_versions",
+        ],
+    ),
+    Migration(
+        version=4,
+        description="야간 배치로 미리 만든 추천 결과 (precomputed_recommendations)",
+        upgrade=[
+            # cache_key = RecommendationCache.make_key (필터링된 옷장 + 온도 구간 + 날씨 + 일정)
+            """
+            CREATE TABLE IF NOT EXISTS precomputed_recommendations (
+                cache_key TEXT PRIMARY KEY,
+                user_id UUID,
+                target_date DATE,
+                result JSONB NOT NULL,
+                created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+                expires_at TIMESTAMPTZ NOT NULL
+            )
+            """,
+            # 만료된 결과 정리용
+            "CREATE INDEX IF NOT EXISTS ix_precomputed_expires "
+            "ON precomputed_recommendations (expires_at)",
+        ],
+        downgrade=[
+            "DROP TABLE IF EXISTS precomputed_recommendations",
+        ],
+    ),
+]
+
+
+def _ensure_version_table(conn):
+    conn.execute(text(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+        """
+    ))
+
+
+def _applied_versions(conn):
+    return {row[0] for row in conn.execute(text("SELECT version FROM schema_migrations"))}
+
+
+def _run_statements(engine, migration, statements):
+    """마이그레이션 문장 실행 (transactional=False 면 문장별 autocommit)"""
+    if migration.transactional:
+        with engine.begin() as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+    else:
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            for statement in statements:
+                conn.execute(text(statement))
+
+
+def _with_lock(engine, fn):
+    """
+    advisory lock 을 잡은 상태로 fn(conn) 실행 (세션 레벨 락, 연결 종료 시 자동 해제)
+    pg_advisory_lock 으로 기다리면 그 대기 쿼리의 스냅샷 때문에
+    다른 워커의 CREATE INDEX CONCURRENTLY 가 끝나지 않으므로 try_lock 을 폴링함
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as lock_conn:
+        while not lock_conn.execute(
+            text("SELECT pg_try_advisory_lock(:key)"), {"key": MIGRATION_LOCK_KEY}
+        ).scalar():
+            time.sleep(LOCK_POLL_SECONDS)
+        try:
+            return fn(lock_conn)
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:key)"), {"key": MIGRATION_LOCK_KEY})
+
+
+def current_version(engine=None) -> int:
+    engine = engine or _default_engine()
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        applied = _applied_versions(conn)
+    return max(applied, default=0)
+
+
+def upgrade(engine=None, target=None, verbose=True) -> List[int]:
+    """target 버전까지(없으면 최신까지) 적용 안 된 마이그레이션 실행 → 적용한 버전 목록"""
+    engine = engine or _default_engine()
+
+    def run(lock_conn):
+        _ensure_version_table(lock_conn)
+        applied = _applied_versions(lock_conn)
+        done = []
+        for migration in MIGRATIONS:
+            if migration.version in applied:
+                continue
+            if target is not None and migration.version > target:
+                break
+            if verbose:
+                print(f"⬆️  마이그레이션 {migration.version}: {migration.description}")
+            _run_statements(engine, migration, migration.upgrade)
+            lock_conn.execute(
+                text("INSERT INTO schema_migrations (version, description) VALUES (:v, :d)"),
+                {"v": migration.version, "d": migration.description},
+            )
+            done.append(migration.version)
+        return done
+
+    return _with_lock(engine, run)
+
+
+def downgrade(engine=None, target=0, verbose=True) -> List[int]:
+    """target 버전보다 높은 마이그레이션을 역순으로 되돌림 → 되돌린 버전 목록"""
+    engine = engine or _default_engine()
+
+    def run(lock_conn):
+        _ensure_version_table(lock_conn)
+        applied = _applied_versions(lock_conn)
+        done = []
+        for migration in reversed(MIGRATIONS):
+            if migration.version <= target or migration.version not in applied:
+                continue
+            if verbose:
+                print(f"⬇️  마이그레이션 되돌리기 {migration.version}: {migration.description}")
+            _run_statements(engine, migration, migration.downgrade)
+            lock_conn.execute(
+                text("DELETE FROM schema_migrations WHERE version = :v"),
+                {"v": migration.version},
+            )
+            done.append(migration.version)
+        return done
+
+    return _with_lock(engine, run)
+
+
+def status(engine=None):
+    """[(version, description, 적용 여부)]"""
+    engine = engine or _default_engine()
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        applied = _applied_versions(conn)
+    return [(m.version, m.description, m.version in applied) for m in MIGRATIONS]
+
+
+def _default_engine():
+    from models import engine
+    return engine
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "status"
+
+    if command == "upgrade":
+        target = int(sys.argv[2]) if len(sys.argv) > 2 else None
+        applied = upgrade(target=target)
+        print(f"✅ 적용 완료: {applied or '변경 없음'}")
+    elif command == "downgrade":
+        if len(sys.argv) < 3:
+            print("❌ 되돌릴 목표 버전을 지정하세요: python migrations.py downgrade <버전>")
+            sys.exit(1)
+        reverted = downgrade(target=int(sys.argv[2]))
+        print(f"✅ 되돌리기 완료: {reverted or '변경 없음'}")
+    elif command == "status":
+        for version, description, applied in status():
+            mark = "✅" if applied else "⬜"
+            print(f"{mark} {version}: {description}")
+    else:
+        print(f"❌ 알 수 없는 명령: {command} (status | upgrade | downgrade)")
+        sys.exit(1)
@@ -1,5 +1,9 @@
 import os
+import threading
+import time
 import uuid
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
 from dotenv import load_dotenv
 
 from sqlalchemy import (
@@ -11,7 +15,9 @@ from sqlalchemy import (
     text,
 )
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import QueuePool
 from sqlalchemy.sql import func
 
 load_dotenv()
@@ -19,11 +25,212 @@ load_dotenv()
 # Render / 로컬 공용 DB URL
 DATABASE_URL = os.environ.get("DATABASE_URL")
 
-engine = create_engine(DATABASE_URL)
+# 커넥션 풀 설정 (워커 수 x (pool_size + max_overflow) 가 DB max_connections 를 넘지 않게)
+DB_POOL_SIZE = int(os.environ.get("DB_POOL_SIZE", 5))
+DB_MAX_OVERFLOW = int(os.environ.get("DB_MAX_OVERFLOW", 10))
+DB_POOL_TIMEOUT = float(os.environ.get("DB_POOL_TIMEOUT", 30))
+DB_POOL_RECYCLE = int(os.environ.get("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.environ.get("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+
+# 시작할 때 migrations.py 의 마이그레이션(인덱스 등)을 자동 적용할지
+DB_AUTO_MIGRATE = os.environ.get("DB_AUTO_MIGRATE", "true").lower() in ("1", "true", "yes")
+
+
+class PoolMetrics:
+    """커넥션 풀 체크아웃 대기 시간 / 사용 현황 카운터"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record_wait(self, seconds, timed_out=False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3)
+                if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """체크아웃 대기 시간을 기록하는 QueuePool (새 연결이 필요하면 연결 시간 포함)"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            pool_metrics.record_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        pool_metrics.record_wait(time.perf_counter() - started)
+        return conn
+
+
+engine = create_engine(
+    DATABASE_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    # Postgres 재시작 후 끊긴 연결을 쓰지 않도록 체크아웃 시 확인 + 주기적으로 교체
+    pool_pre_ping=DB_POOL_PRE_PING,
+    pool_recycle=DB_POOL_RECYCLE,
+)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 Base = declarative_base()
 
 
+def pool_stats():
+    """풀 상태 (health 체크용)"""
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checked_in": pool.checkedin(),
+        **pool_metrics.snapshot(),
+    }
+
+
+def dispose_engine():
+    """
+    fork 직후 자식 프로세스에서 호출 (gunicorn post_fork)
+    부모가 열어둔 연결은 닫지 않고 버리기만 해서 부모 쪽 소켓을 건드리지 않음
+    """
+    engine.dispose(close=False)
+
+
+# ---------- 비동기 엔진 (asgi_server 용, 처음 사용할 때 생성) ----------
+
+_async_engine = None
+_async_sessionmaker = None
+
+
+def async_database_url(url=None):
+    """
+    DATABASE_URL → asyncpg 드라이버 URL
+    (postgres:// / postgresql+psycopg2:// 모두 postgresql+asyncpg:// 로, sslmode 는 asyncpg 의 ssl 로)
+    """
+    url = make_url(url or DATABASE_URL)
+    query = dict(url.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return url.set(drivername="postgresql+asyncpg", query=query)
+
+
+def get_async_engine():
+    """동기 엔진과 같은 풀 설정의 AsyncEngine (asyncpg 필요)"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+        _async_engine = create_async_engine(
+            async_database_url(),
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_pre_ping=DB_POOL_PRE_PING,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+        _async_sessionmaker = async_sessionmaker(_async_engine, expire_on_commit=False)
+    return _async_engine
+
+
+@asynccontextmanager
+async def get_async_session():
+    """get_session() 의 비동기 버전: 새 AsyncSession 을 열고 끝나면 닫음"""
+    get_async_engine()
+    async with _async_sessionmaker() as session:
+        yield session
+
+
+def async_pool_stats():
+    """비동기 풀 상태 (엔진을 아직 안 만들었으면 None)"""
+    if _async_engine is None:
+        return None
+    pool = _async_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "checked_in": pool.checkedin(),
+    }
+
+
+async def dispose_async_engine():
+    """서버 종료 시 비동기 풀 정리"""
+    global _async_engine, _async_sessionmaker
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine = _async_sessionmaker = None
+
+
+# ---------- 요청 스코프 세션 ----------
+
+_request_session = ContextVar("request_session", default=None)
+
+
+def begin_request_session():
+    """요청 시작 시 호출: 이 요청 안의 get_session() 호출이 같은 세션을 공유"""
+    return _request_session.set(SessionLocal())
+
+
+def end_request_session(token, error=None):
+    """요청 종료 시 호출: 에러가 있었으면 롤백 후 세션 반납"""
+    session = _request_session.get()
+    try:
+        if session is not None:
+            if error is not None:
+                session.rollback()
+            session.close()
+    finally:
+        _request_session.reset(token)
+
+
+@contextmanager
+def get_session():
+    """
+    요청 스코프 세션이 있으면 그 세션을, 없으면 새 세션을 열고 끝나면 닫음
+    요청 세션도 (가장 바깥) 저장소 호출이 끝나면 트랜잭션을 끝내고 커넥션을 풀에 반납
+    → 옷장 조회 뒤 Claude 응답을 기다리는 동안 "idle in transaction" 으로 커넥션을 잡고 있지 않음
+    """
+    shared = _request_session.get()
+    if shared is not None:
+        depth = shared.info.get("depth", 0)
+        shared.info["depth"] = depth + 1
+        try:
+            yield shared
+        finally:
+            shared.info["depth"] = depth
+            if depth == 0:
+                # close() 후에도 세션은 다시 쓸 수 있음 (다음 호출에서 새 트랜잭션)
+                shared.close()
+        return
+
+    session = SessionLocal()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
 class Cloth(Base):
     """
     clothes_table 스키마에 맞춘 ORM 모델
@@ -61,9 +268,14 @@ def init_db():
     """
     모든 모델에 대한 테이블을 생성.
     기존 테이블이 있으면 그대로 두고, 없을 때만 생성함.
+    이후 아직 적용 안 된 마이그레이션(인덱스 등)을 적용 (DB_AUTO_MIGRATE=false 면 생략)
     """
     Base.metadata.create_all(bind=engine)
 
+    if DB_AUTO_MIGRATE:
+        import migrations
+        migrations.upgrade(engine)
+
 
 # ---------- 직렬화 유틸 ----------
 
@@ -0,0 +1,104 @@
+import numpy as np
+
+from closet_columns import as_columnar
+from local_stylist import SLOTS, SLOT_CATEGORY_CODE
+
+# 반드시 채워야 하는 슬롯 (아우터/신발은 null 허용)
+REQUIRED_SLOTS = ("top", "bottom")
+TEXT_FIELDS = ("concept", "tip", "color_harmony")
+EMPTY_SLOT = {"item_id": None, "name": None, "reason": None}
+
+
+class OutfitValidator:
+    """
+    Claude 응답(추천 / 계획의 하루치) 검증 + 로컬 보정
+    - item_id 는 날씨 필터를 통과한 옷장에서 id 해시(ColumnarCloset.position)로 찾고, 카테고리가 슬롯과 맞는지 확인
+    - 빈(상의/하의) 슬롯이나 틀린 id 만 로컬 엔진 단독 점수 1위 옷으로 채움 → Claude 재호출 없음
+    - 컨셉/팁/색상 설명이 빠졌으면 (응답이 잘렸을 때) 로컬 엔진 설명으로 채움
+    """
+
+    def __init__(self, clothes, engine):
+        self.closet = as_columnar(clothes)
+        self.engine = engine
+        self._categories = self.closet.codes["category"]
+        self._scores = {}
+        # 이 검증기로 보정한 슬롯/필드 누적 (스트리밍은 슬롯마다 따로 검증하므로)
+        self.repaired = []
+
+    def item(self, slot, item_id):
+        """슬롯에 쓸 수 있는 id 면 행 번호, 아니면 None"""
+        i = self.closet.position(item_id) if isinstance(item_id, str) else None
+        if i is None or self._categories[i] != SLOT_CATEGORY_CODE[slot]:
+            return None
+        return i
+
+    def check_slot(self, slot, value, weather, schedule, exclude=()):
+        """
+        슬롯 하나 검증 → (값, 보정 여부)
+        값이 None 이면 채울 옷이 없는 필수 슬롯 (상의/하의가 옷장에 없음)
+        """
+        item_id = value.get('item_id') if isinstance(value, dict) else None
+        if item_id is None and slot not in REQUIRED_SLOTS:
+            return dict(EMPTY_SLOT), False
+        if self.item(slot, item_id) is not None and item_id not in exclude:
+            for key in EMPTY_SLOT:
+                value.setdefault(key, None)
+            return value, False
+
+        self.repaired.append(slot)
+        best = self._best(slot, weather, schedule, exclude)
+        if best is None:
+            return (None if slot in REQUIRED_SLOTS else dict(EMPTY_SLOT)), True
+        return self.engine.describe_item(self.closet.row(best), weather, schedule), True
+
+    def check(self, result, weather, schedule, exclude=()):
+        """
+        추천 결과 전체 검증 → (결과, 보정한 슬롯/필드 목록)
+        상의/하의를 채울 수 없으면 ({"error": ...}, 목록)
+        exclude: 상의로 쓰면 안 되는 id (계획에서 이미 입은 상의)
+        """
+        result = dict(result) if isinstance(result, dict) else {}
+        repaired = []
+        for slot in SLOTS:
+            value, fixed = self.check_slot(
+                slot, result.get(slot), weather, schedule, exclude if slot == "top" else ()
+            )
+            if value is None:
+                return {
+                    "error": "상의와 하의가 모두 있어야 추천할 수 있습니다",
+                    "suggestion": "옷장에 날씨에 맞는 상의와 하의를 추가해보세요"
+                }, repaired
+            result[slot] = value
+            if fixed:
+                repaired.append(slot)
+
+        missing = [key for key in TEXT_FIELDS if not isinstance(result.get(key), str)]
+        if missing:
+            picks = {
+                slot: self.closet.row(self.closet.position(result[slot]['item_id']))
+                if result[slot]['item_id'] is not None else None
+                for slot in SLOTS
+            }
+            described = self.engine.describe(picks, weather, schedule)
+            for key in missing:
+                result[key] = described[key]
+            repaired.extend(missing)
+            self.repaired.extend(missing)
+        return result, repaired
+
+    def _best(self, slot, weather, schedule, exclude):
+        """슬롯 카테고리에서 단독 점수가 가장 높은 옷 (exclude 로 다 빠지면 exclude 무시)"""
+        indices = np.flatnonzero(self._categories == SLOT_CATEGORY_CODE[slot])
+        if not len(indices):
+            return None
+        if exclude:
+            excluded = [self.closet.position(item_id) for item_id in exclude]
+            remaining = np.setdiff1d(indices, [i for i in excluded if i is not None])
+            if len(remaining):
+                indices = remaining
+
+        key = (weather.get('temp'), schedule)
+        scores = self._scores.get(key)
+        if scores is None:
+            scores = self._scores[key] = self.engine.score_items(self.closet, weather, schedule)
+        return int(indices[np.argmax(scores[indices])])
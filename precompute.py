@@ -0,0 +1,320 @@
+"""
+다음 날 추천 미리 만들기 (야간 배치)
+
+- 예보(파일 또는 로컬 대체 예보) × 일정 목록으로 옷이 있는 사용자 전원의 추천을 미리 계산해서
+  precomputed_recommendations 에 저장 → 아침에 /api/recommend 가 Claude 호출 없이 바로 응답
+- 서버와 똑같이 get_ai_ready_closet → 날씨 필터 → _build_prompt 로 프롬프트를 만들어서
+  저장 키도 서버 추천 캐시 키와 같음 (옷장이 바뀌면 키가 달라져서 자동으로 안 쓰임)
+- 제출: Anthropic Message Batches API (live 전송 계층일 때) 또는 동시 실행 수를 제한한 일반 호출
+- 이미 저장된(만료 안 된) 키는 건너뜀 → 중간에 실패해도 다시 실행하면 남은 것만 계산
+
+사용법:
+    python precompute.py --forecast forecast.json
+    python precompute.py --stand-in --date 2025-03-04 --schedules 출근,데이트 --concurrency 16
+    LLM_TRANSPORT=synthetic python precompute.py --stand-in --output precompute.json
+
+예보 파일 형식 (users 는 선택 — 사용자별로 다른 예보/일정):
+    {"date": "2025-03-04", "weather": {"temp": 12, "condition": "맑음"}, "schedules": ["출근", "데이트"],
+     "users": {"<user_id>": {"weather": {...}, "schedules": [...]}}}
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+from dotenv import load_dotenv
+
+from closet_cache import ClosetSnapshotCache
+from closet_repository import ClosetRepository
+from fashion_ai import FashionRecommendationAI
+from llm_transport import describe as describe_llm_transport
+from outfit_validator import OutfitValidator
+from precomputed_store import PrecomputedStore
+
+# 로컬 대체 예보: 월별 평년 기온 (서울, 1월~12월)
+STAND_IN_MONTHLY_TEMP = (-2, 0, 6, 13, 18, 23, 26, 26, 22, 15, 8, 1)
+STAND_IN_CONDITION = "맑음"
+DEFAULT_SCHEDULES = ("출근",)
+SUBMIT_MODES = ("auto", "batch", "direct")
+BATCH_POLL_SECONDS = 30
+
+
+class Forecast:
+    """다음 날 날씨/일정 (사용자별 덮어쓰기 가능)"""
+
+    def __init__(self, target_date, weather, schedules, users=None):
+        self.target_date = target_date
+        self.weather = weather
+        self.schedules = list(schedules)
+        self.users = users or {}
+
+    @classmethod
+    def from_file(cls, path, schedules=None):
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(
+            date.fromisoformat(data["date"]),
+            data["weather"],
+            schedules or data.get("schedules") or DEFAULT_SCHEDULES,
+            data.get("users"),
+        )
+
+    @classmethod
+    def stand_in(cls, target_date, schedules=None):
+        """예보 API 없이 돌릴 때: 그 달 평년 기온 + 맑음"""
+        weather = {
+            "temp": STAND_IN_MONTHLY_TEMP[target_date.month - 1],
+            "condition": STAND_IN_CONDITION,
+        }
+        return cls(target_date, weather, schedules or DEFAULT_SCHEDULES)
+
+    def conditions(self, user_id):
+        """사용자 한 명의 (날씨, 일정) 목록"""
+        override = self.users.get(user_id, {})
+        weather = override.get("weather", self.weather)
+        return [(weather, schedule) for schedule in override.get("schedules", self.schedules)]
+
+
+class Job:
+    __slots__ = ("user_id", "weather", "schedule", "cache_key", "suitable", "request", "aliases")
+
+    def __init__(self, user_id, weather, schedule, cache_key, suitable):
+        self.user_id = user_id
+        self.weather = weather
+        self.schedule = schedule
+        self.cache_key = cache_key
+        self.suitable = suitable
+        self.request = None
+        self.aliases = None
+
+
+def iter_jobs(repo, ai, user_ids, forecast, counts):
+    """사용자별 옷장 조회 → (날씨, 일정)마다 서버와 같은 캐시 키의 작업"""
+    for user_id in user_ids:
+        closet = repo.get_ai_ready_closet(user_id)
+        if not closet:
+            counts["empty_closet"] += 1
+            continue
+        counts["users"] += 1
+        for weather, schedule in forecast.conditions(user_id):
+            done, suitable, cache_key = ai._prepare(closet, weather, schedule, "llm", {})
+            if done is not None:
+                # 날씨에 맞는 옷이 없음 → 아침에도 같은 에러라 미리 만들 필요 없음
+                counts["no_suitable"] += 1
+                continue
+            yield Job(user_id, weather, schedule, cache_key, suitable)
+
+
+def build_requests(ai, jobs):
+    """프롬프트 생성 (작업마다 찍히는 프롬프트 로그는 숨김)"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        for job in jobs:
+            prompt, job.aliases = ai._build_prompt(job.suitable, job.weather, job.schedule, {})
+            job.request = ai._request(prompt)
+
+
+def submit_direct(client, jobs, concurrency):
+    """동시 실행 수를 concurrency 로 제한해서 한 건씩 호출 → [(작업, 메시지 또는 예외)]"""
+    def call(job):
+        try:
+            return job, client.messages.create(**job.request)
+        except Exception as e:
+            return job, e
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        return list(pool.map(call, jobs))
+
+
+def submit_batch(client, jobs, poll_seconds=BATCH_POLL_SECONDS):
+    """Message Batches API 로 한 번에 제출하고 끝날 때까지 기다림 → [(작업, 메시지 또는 예외)]"""
+    by_id = {f"job-{i}": job for i, job in enumerate(jobs)}
+    batch = client.messages.batches.create(
+        requests=[{"custom_id": custom_id, "params": job.request} for custom_id, job in by_id.items()]
+    )
+    print(f"📦 배치 제출: {batch.id} ({len(jobs)}건)")
+    while batch.processing_status != "ended":
+        time.sleep(poll_seconds)
+        batch = client.messages.batches.retrieve(batch.id)
+
+    results = []
+    for entry in client.messages.batches.results(batch.id):
+        job = by_id.pop(entry.custom_id, None)
+        if job is None:
+            continue
+        if entry.result.type == "succeeded":
+            results.append((job, entry.result.message))
+        else:
+            results.append((job, RuntimeError(f"배치 결과 {entry.result.type}")))
+    # 결과에 없는 요청 (만료 등)
+    results.extend((job, RuntimeError("배치 결과 없음")) for job in by_id.values())
+    return results
+
+
+def batch_api_available(client):
+    """live 전송 계층이고 SDK 가 Message Batches 를 지원하면 True (녹화/재생/합성은 일반 호출)"""
+    return (
+        describe_llm_transport(client).get("transport") == "live"
+        and hasattr(getattr(client, "messages", None), "batches")
+    )
+
+
+def run(forecast, user_ids=None, submit="auto", concurrency=8, batch_size=1000,
+        ai=None, repo=None, store=None, dry_run=False):
+    """미리 만들기 실행 → 결과 요약 dict"""
+    if ai is None:
+        # api_server 와 같이 .env / 환경 변수의 API 키로 (live / record 전송 계층에 필요)
+        load_dotenv()
+        ai = FashionRecommendationAI(api_key=os.environ.get('ANTHROPIC_API_KEY'), cache_size=0)
+    # 옷장 스냅샷 캐시는 배치에서 쓸 일이 없으므로 끔 (사용자 전원을 메모리에 올리지 않도록)
+    if repo is None:
+        repo = ClosetRepository()
+        repo.snapshots = ClosetSnapshotCache(max_items=0)
+    store = store or PrecomputedStore()
+
+    if user_ids is None:
+        listed = repo.get_user_ids()
+        if not listed["success"]:
+            raise RuntimeError(f"사용자 목록 조회 실패: {listed['error']}")
+        user_ids = listed["data"]
+
+    use_batch_api = submit == "batch" or (submit == "auto" and batch_api_available(ai.client))
+    if submit == "batch" and not batch_api_available(ai.client):
+        raise RuntimeError("Message Batches API 를 쓸 수 없는 클라이언트입니다 (LLM_TRANSPORT=live 필요)")
+
+    counts = {
+        "users": 0, "empty_closet": 0, "no_suitable": 0, "jobs": 0, "skipped": 0,
+        "submitted": 0, "stored": 0, "repaired": 0, "failed": 0, "input_tokens": 0, "output_tokens": 0,
+    }
+    errors = {}
+    started = time.perf_counter()
+    print(
+        f"🌙 {forecast.target_date} 추천 미리 만들기: 사용자 {len(user_ids)}명, "
+        f"제출 방식 {'batch' if use_batch_api else f'direct (동시 {concurrency})'}"
+    )
+
+    jobs = iter_jobs(repo, ai, user_ids, forecast, counts)
+    while True:
+        chunk = list(itertools.islice(jobs, batch_size))
+        if not chunk:
+            break
+        counts["jobs"] += len(chunk)
+
+        # 같은 키(옷장/조건이 같은 사용자)는 한 번만, 이미 저장된 키는 건너뜀 (skipped)
+        unique = {}
+        for job in chunk:
+            unique.setdefault(job.cache_key, job)
+        stored_keys = set() if dry_run else store.existing(list(unique))
+        pending = [job for key, job in unique.items() if key not in stored_keys]
+        counts["skipped"] += len(chunk) - len(pending)
+        if not pending:
+            continue
+
+        build_requests(ai, pending)
+        if dry_run:
+            counts["submitted"] += len(pending)
+            continue
+
+        if use_batch_api:
+            results = submit_batch(ai.client, pending)
+        else:
+            results = submit_direct(ai.client, pending, concurrency)
+        counts["submitted"] += len(pending)
+
+        rows = []
+        for job, message in results:
+            if isinstance(message, Exception):
+                counts["failed"] += 1
+                errors[type(message).__name__] = errors.get(type(message).__name__, 0) + 1
+                continue
+            usage = getattr(message, "usage", None)
+            counts["input_tokens"] += getattr(usage, "input_tokens", 0) or 0
+            counts["output_tokens"] += getattr(usage, "output_tokens", 0) or 0
+            result = ai._message_result(message, aliases=job.aliases)
+            if "error" not in result:
+                # 서버와 같은 검증/보정 (틀린 id 는 로컬 보정, 재호출 없음)
+                validator = OutfitValidator(job.suitable, ai.local_engine)
+                result, repaired = validator.check(result, job.weather, job.schedule)
+                counts["repaired"] += bool(repaired)
+            job.suitable = None
+            if "error" in result:
+                counts["failed"] += 1
+                errors["parse"] = errors.get("parse", 0) + 1
+                continue
+            rows.append((job.cache_key, job.user_id, forecast.target_date, result))
+        counts["stored"] += store.put_many(rows)
+        print(
+            f"  ✅ {counts['jobs']}건 처리 (저장 {counts['stored']}, 건너뜀 {counts['skipped']}, "
+            f"실패 {counts['failed']})"
+        )
+
+    elapsed = time.perf_counter() - started
+    report = {
+        "target_date": forecast.target_date.isoformat(),
+        "weather": forecast.weather,
+        "schedules": forecast.schedules,
+        "submit": "batch" if use_batch_api else "direct",
+        "dry_run": dry_run,
+        **counts,
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 2),
+        "jobs_per_second": round(counts["submitted"] / elapsed, 2) if elapsed else None,
+    }
+    print(f"🌅 완료: {json.dumps(report, ensure_ascii=False)}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="다음 날 추천을 미리 만들어 precomputed_recommendations 에 저장")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--forecast", help="예보 JSON 파일")
+    source.add_argument("--stand-in", action="store_true", help="예보 대신 월별 평년 기온 사용")
+    parser.add_argument("--date", help="대상 날짜 (기본: 내일, --stand-in 에서만 사용)")
+    parser.add_argument("--schedules", help="쉼표로 구분한 일정 목록 (예보 파일 값보다 우선)")
+    parser.add_argument("--users", help="사용자 id 파일 (한 줄에 하나, 기본: 옷이 있는 사용자 전원)")
+    parser.add_argument("--submit", choices=SUBMIT_MODES, default="auto",
+                        help="auto: live 면 Message Batches API, 아니면 direct")
+    parser.add_argument("--concurrency", type=int, default=8, help="direct 제출 시 동시 호출 수")
+    parser.add_argument("--batch-size", type=int, default=1000, help="한 번에 제출할 작업 수")
+    parser.add_argument("--purge", action="store_true", help="시작 전에 만료된 결과 삭제")
+    parser.add_argument("--dry-run", action="store_true", help="프롬프트까지만 만들고 호출/저장 안 함")
+    parser.add_argument("--output", help="결과 요약 JSON 저장 경로")
+    args = parser.parse_args()
+
+    schedules = [s.strip() for s in args.schedules.split(",") if s.strip()] if args.schedules else None
+    if args.forecast:
+        forecast = Forecast.from_file(args.forecast, schedules)
+    else:
+        target = date.fromisoformat(args.date) if args.date else date.today() + timedelta(days=1)
+        forecast = Forecast.stand_in(target, schedules)
+
+    user_ids = None
+    if args.users:
+        with open(args.users, "r", encoding="utf-8") as f:
+            user_ids = [line.strip() for line in f if line.strip()]
+
+    from models import init_db
+    init_db()
+
+    store = PrecomputedStore()
+    if args.purge and not args.dry_run:
+        print(f"🧹 만료된 결과 {store.purge_expired()}건 삭제")
+
+    report = run(
+        forecast,
+        user_ids=user_ids,
+        submit=args.submit,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        store=store,
+        dry_run=args.dry_run,
+    )
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+import time
+
+from sqlalchemy import text
+
+from models import get_session, get_async_session
+
+# 미리 만든 추천 결과 보관 시간 (다음 날 아침~저녁까지 쓰도록 기본 36시간)
+PRECOMPUTE_TTL_HOURS = float(os.environ.get('PRECOMPUTE_TTL_HOURS', 36))
+# /api/recommend 에서 미리 만든 결과를 먼저 확인할지 (false 면 조회 안 함)
+PRECOMPUTE_LOOKUP = os.environ.get('PRECOMPUTE_LOOKUP', 'true').lower() in ('1', 'true', 'yes')
+# 테이블이 없거나 DB 오류가 나면 이 시간 동안 조회를 건너뜀 (매 요청 실패 쿼리 방지)
+PRECOMPUTE_RETRY_SECONDS = 60
+
+GET_SQL = text(
+    "SELECT result FROM precomputed_recommendations "
+    "WHERE cache_key = :cache_key AND expires_at > now()"
+)
+EXISTING_SQL = text(
+    "SELECT cache_key FROM precomputed_recommendations "
+    "WHERE cache_key = ANY(:cache_keys) AND expires_at > now()"
+)
+PUT_SQL = text("""
+    INSERT INTO precomputed_recommendations (cache_key, user_id, target_date, result, created_at, expires_at)
+    VALUES (:cache_key, :user_id, :target_date, CAST(:result AS JSONB), now(),
+            now() + make_interval(secs => :ttl_seconds))
+    ON CONFLICT (cache_key) DO UPDATE SET
+        user_id = EXCLUDED.user_id,
+        target_date = EXCLUDED.target_date,
+        result = EXCLUDED.result,
+        created_at = EXCLUDED.created_at,
+        expires_at = EXCLUDED.expires_at
+""")
+PURGE_SQL = text("DELETE FROM precomputed_recommendations WHERE expires_at <= now()")
+
+
+class PrecomputedStore:
+    """
+    야간 배치(precompute.py)가 미리 만든 추천 결과 저장소 (precomputed_recommendations 테이블)
+    - 키는 RecommendationCache.make_key 와 같음 → 옷장/온도 구간/날씨/일정이 같은 요청만 그대로 사용
+    - 워커 여러 개가 같은 결과를 보도록 DB 에 저장 (한 번 읽은 결과는 워커 메모리 캐시로 옮겨짐)
+    - 조회 실패(마이그레이션 전 등)는 추천을 막지 않고 PRECOMPUTE_RETRY_SECONDS 동안 조회를 쉼
+    """
+
+    def __init__(self, enabled=None, ttl_hours=None):
+        self.enabled = PRECOMPUTE_LOOKUP if enabled is None else enabled
+        self.ttl_seconds = (PRECOMPUTE_TTL_HOURS if ttl_hours is None else ttl_hours) * 3600
+        self._skip_until = 0.0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _active(self):
+        return self.enabled and time.monotonic() >= self._skip_until
+
+    def _record(self, result):
+        if isinstance(result, str):
+            # asyncpg 는 JSONB 를 문자열로 돌려줌
+            result = json.loads(result)
+        with self._lock:
+            if result is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return result
+
+    def _failed(self, error):
+        with self._lock:
+            self.errors += 1
+            self._skip_until = time.monotonic() + PRECOMPUTE_RETRY_SECONDS
+        print(f"⚠️ 미리 만든 추천 조회 실패 ({PRECOMPUTE_RETRY_SECONDS}초 동안 건너뜀): {error}")
+
+    def get(self, cache_key):
+        """만료 안 된 결과 (없으면 None)"""
+        if not self._active():
+            return None
+        with get_session() as session:
+            try:
+                result = session.execute(GET_SQL, {"cache_key": cache_key}).scalar_one_or_none()
+            except Exception as e:
+                session.rollback()
+                self._failed(e)
+                return None
+        return self._record(result)
+
+    async def get_async(self, cache_key):
+        """get() 의 비동기 버전 (asgi_server 용)"""
+        if not self._active():
+            return None
+        async with get_async_session() as session:
+            try:
+                result = (await session.execute(GET_SQL, {"cache_key": cache_key})).scalar_one_or_none()
+            except Exception as e:
+                await session.rollback()
+                self._failed(e)
+                return None
+        return self._record(result)
+
+    def existing(self, cache_keys):
+        """이미 저장된(만료 안 된) 키 집합 (배치 재실행 시 건너뛰기용)"""
+        if not cache_keys:
+            return set()
+        with get_session() as session:
+            return set(session.execute(EXISTING_SQL, {"cache_keys": list(cache_keys)}).scalars())
+
+    def put_many(self, rows):
+        """[(cache_key, user_id, target_date, result), ...] 저장 (같은 키는 덮어씀) → 저장 건수"""
+        if not rows:
+            return 0
+        params = [
+            {
+                "cache_key": cache_key,
+                "user_id": user_id,
+                "target_date": target_date,
+                "result": json.dumps(result, ensure_ascii=False),
+                "ttl_seconds": self.ttl_seconds,
+            }
+            for cache_key, user_id, target_date, result in rows
+        ]
+        with get_session() as session:
+            try:
+                session.execute(PUT_SQL, params)
+                session.commit()
+            except Exception:
+                session.rollback()
+                raise
+        return len(params)
+
+    def purge_expired(self):
+        """만료된 결과 삭제 → 삭제 건수"""
+        with get_session() as session:
+            deleted = session.execute(PURGE_SQL).rowcount
+            session.commit()
+        return deleted
+
+    def stats(self):
+        """히트/미스 카운터 (health 체크 등에서 사용)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "ttl_hours": round(self.ttl_seconds / 3600, 2),
+                "hits": self.hits,
+                "misses": self.misses,
+                "errors": self.errors,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
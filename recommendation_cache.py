@@ -0,0 +1,131 @@
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+
+class RecommendationCache:
+    """
+    추천 결과 캐시 (LRU + TTL)
+    - 최대 max_size 개까지 보관, 넘치면 가장 오래 안 쓴 항목부터 제거
+    - ttl_seconds 가 지난 항목은 조회 시점에 만료 처리
+    - 여러 요청 스레드에서 동시에 접근하므로 lock 으로 보호
+    """
+
+    def __init__(self, max_size=1024, ttl_seconds=600):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._items = OrderedDict()   # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(clothes, temp_band, condition, schedule):
+        """
+        필터링된 옷장 + 온도 구간 + 날씨 상태 + 일정으로 캐시 키 생성
+        - ColumnarCloset: 내용 해시(fingerprint) 사용 (DB 조회 시 cloth_id 순 정렬)
+        - dict 리스트: 옷 순서가 달라도 같은 옷장이면 같은 키가 나오도록 id 기준 정렬
+        """
+        return RecommendationCache._hash(
+            [_closet_signature(clothes), temp_band, normalize_text(condition), normalize_text(schedule)]
+        )
+
+    @staticmethod
+    def make_plan_key(clothes, days):
+        """
+        여러 날 계획(recommend_plan)용 캐시 키
+        days: [(날짜, 온도 구간, 날씨 상태, 일정), ...] (날짜 순서도 키에 포함)
+        """
+        return RecommendationCache._hash([
+            "plan",
+            _closet_signature(clothes),
+            [
+                [str(date), temp_band, normalize_text(condition), normalize_text(schedule)]
+                for date, temp_band, condition, schedule in days
+            ],
+        ])
+
+    @staticmethod
+    def _hash(payload):
+        payload = json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """캐시 조회 (없거나 만료됐으면 None)"""
+        if self.max_size <= 0:
+            return None
+
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._items[key]
+                self.evictions += 1
+                self.misses += 1
+                return None
+
+            self._items.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """캐시 저장 (용량 초과 시 LRU 제거)"""
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._items[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        """히트/미스 카운터 (health 체크 등에서 사용)"""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._items),
+                "max_size": self.max_size,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+
+def _closet_signature(clothes):
+    if hasattr(clothes, 'fingerprint'):
+        return clothes.fingerprint()
+    return sorted(
+        (
+            item.get('id') or '',
+            item.get('name') or '',
+            item.get('category') or '',
+            item.get('type') or '',
+            item.get('color') or '',
+            item.get('style') or '',
+            item.get('material') or '',
+            item.get('season') or '',
+        )
+        for item in clothes
+    )
+
+
+def normalize_text(value):
+    """공백/대소문자 차이만 있는 입력은 같은 값으로 취급"""
+    if value is None:
+        return ''
+    return ' '.join(str(value).split()).lower()
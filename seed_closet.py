@@ -1,29 +1,16 @@
 # seed_closet.py
-from models import Base, engine, SessionLocal, Cloth
-import json
+# closet.json 을 DB 에 넣는 스크립트 (실제 처리는 closet_import.py)
+import sys
+
+from closet_import import import_file
+from models import init_db
 
-def seed_from_json(json_path: str = "closet.json"):
-    # 테이블이 없다면 생성
-    Base.metadata.create_all(bind=engine)
 
-    with open(json_path, "r", encoding="utf-8") as f:
-        clothes_data = json.load(f)
+def seed_from_json(json_path: str = "closet.json", user_id: str = None):
+    # 테이블이 없다면 생성
+    init_db()
+    return import_file(json_path, user_id=user_id)
 
-    db = SessionLocal()
-    try:
-        for item in clothes_data:
-            cloth = Cloth(
-                name=item["name"],
-                cloth_type=item["cloth_type"],
-                color=item["color"],
-                style=item["style"],
-                material=item["material"],
-                season=item["season"],
-            )
-            db.add(cloth)
-        db.commit()
-    finally:
-        db.close()
 
 if __name__ == "__main__":
-    seed_from_json()
\ No newline at end of file
+    seed_from_json(user_id=sys.argv[1] if len(sys.argv) > 1 else None)
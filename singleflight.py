@@ -0,0 +1,108 @@
+import asyncio
+import threading
+
+
+class _Call:
+    __slots__ = ("done", "result", "error", "waiters")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """
+    같은 키로 동시에 들어온 호출을 하나로 합치기 (single-flight)
+    - 처음 들어온 요청(leader)만 fn 을 실행하고, 실행 중에 같은 키로 들어온 요청(follower)은
+      그 결과를 기다렸다가 함께 받음 (예외도 똑같이 전달)
+    - do() 는 스레드용, do_async() 는 이벤트 루프용 (카운터는 같이 집계)
+    - 끝난 호출은 바로 지워지므로 결과를 보관하지는 않음 (보관은 RecommendationCache 담당)
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._calls = {}
+        self._futures = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+        self.errors = 0
+
+    def do(self, key, fn):
+        """→ (fn 결과, shared) — shared=True 면 다른 요청의 호출 결과를 받은 것"""
+        if not self.enabled:
+            return fn(), False
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                self.leaders += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    async def do_async(self, key, fn):
+        """
+        do() 의 asyncio 버전 (fn 은 코루틴 함수) → (결과, shared)
+        호출은 별도 태스크로 실행하고 leader 도 follower 처럼 shield 로 기다림
+        → 요청 하나(leader 포함)가 취소돼도 (클라이언트 연결 끊김 등) 나머지 요청은 결과를 받음
+        """
+        if not self.enabled:
+            return await fn(), False
+
+        task = self._futures.get(key)
+        if task is not None:
+            with self._lock:
+                self.coalesced += 1
+            return await asyncio.shield(task), True
+
+        task = self._futures[key] = asyncio.ensure_future(fn())
+        with self._lock:
+            self.leaders += 1
+        task.add_done_callback(lambda done: self._finish_async(key, done))
+        return await asyncio.shield(task), False
+
+    def _finish_async(self, key, task):
+        """태스크가 끝나면 키 정리 + 에러 집계 (기다리는 요청이 없어도 예외 경고가 남지 않도록 꺼내 둠)"""
+        if self._futures.get(key) is task:
+            del self._futures[key]
+        if not task.cancelled() and task.exception() is not None:
+            with self._lock:
+                self.errors += 1
+
+    def stats(self):
+        """합쳐진 호출 수 (health 체크 등에서 사용)"""
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {
+                "enabled": self.enabled,
+                "in_flight": len(self._calls) + len(self._futures),
+                "leaders": self.leaders,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "coalesce_rate": round(self.coalesced / total, 4) if total else 0.0,
+            }
@@ -0,0 +1,104 @@
+import json
+
+
+class SlotStreamParser:
+    """
+    스트리밍으로 들어오는 JSON 텍스트 조각을 받아서
+    최상위 객체의 키(top/bottom/outer/shoes/concept...) 값이 완성될 때마다 바로 돌려주는 파서
+
+    parser = SlotStreamParser()
+    for chunk in text_stream:
+        for key, value in parser.feed(chunk):
+            ...
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self.result = {}
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._key = None
+        self._awaiting_value = False
+        self._value_start = None
+        self._done = False
+
+    def feed(self, chunk):
+        """텍스트 조각 추가 → 이번에 완성된 (key, value) 리스트"""
+        self.buffer += chunk
+        completed = []
+        buf = self.buffer
+
+        while self._pos < len(buf) and not self._done:
+            i = self._pos
+            ch = buf[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == '\\':
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        if self._value_start is None:
+                            # 최상위 키
+                            self._key = json.loads(buf[self._string_start:i + 1])
+                        elif self._value_start == self._string_start:
+                            # 문자열 값 완성
+                            self._emit(buf, i + 1, completed)
+                continue
+
+            if self._depth == 0:
+                # 첫 '{' 이전의 텍스트(설명 문구 등)는 무시
+                if ch == '{':
+                    self._depth = 1
+                continue
+
+            if self._awaiting_value and not ch.isspace():
+                self._awaiting_value = False
+                self._value_start = i
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in '{[':
+                self._depth += 1
+            elif ch in '}]':
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    # 객체/배열 값 완성
+                    self._emit(buf, i + 1, completed)
+                elif self._depth == 0:
+                    # 최상위 객체 끝 (null/숫자 같은 마지막 값 처리)
+                    if self._value_start is not None:
+                        self._emit(buf, i, completed)
+                    self._done = True
+            elif self._depth == 1:
+                if ch == ':':
+                    self._awaiting_value = True
+                elif ch == ',' and self._value_start is not None:
+                    # null/true/숫자 값 완성
+                    self._emit(buf, i, completed)
+
+        return completed
+
+    def _emit(self, buf, end, completed):
+        raw = buf[self._value_start:end].strip()
+        self._value_start = None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return
+        if self._key is not None:
+            self.result[self._key] = value
+            completed.append((self._key, value))
+        self._key = None
+
+    @property
+    def done(self):
+        """최상위 객체가 닫혔는지 여부"""
+        return self._done
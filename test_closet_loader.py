@@ -0,0 +1,64 @@
+"""
+ClosetLoader 단위 테스트 (임시 폴더의 옷장 파일 사용)
+
+    python -m unittest test_closet_loader
+"""
+import contextlib
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from closet_loader import ClosetLoader
+
+
+def cloth(cloth_id, name):
+    return {"id": cloth_id, "name": name, "category": "상의"}
+
+
+class UpdateClothTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "closet.json")
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump({"clothes": [cloth("cloth_003", "셔츠"), cloth("cloth_004", "니트")]}, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def load(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return ClosetLoader(self.path)
+
+    def update(self, loader, cloth_id, cloth_data):
+        with contextlib.redirect_stdout(io.StringIO()):
+            result = loader.update_cloth(cloth_id, cloth_data)
+        loader.close()
+        return result
+
+    def ids(self, loader):
+        return [c["id"] for c in loader.iter_clothes()]
+
+    def test_rename_to_existing_id_is_rejected(self):
+        loader = self.load()
+        self.assertFalse(self.update(loader, "cloth_003", cloth("cloth_004", "셔츠")))
+        self.assertEqual(self.ids(loader), ["cloth_003", "cloth_004"])
+        self.assertEqual(loader.get_cloth("cloth_004")["name"], "니트")
+        # 저널에도 남지 않아서 다시 로드해도 그대로
+        self.assertEqual(self.ids(self.load()), ["cloth_003", "cloth_004"])
+
+    def test_rename_to_new_id_keeps_position(self):
+        loader = self.load()
+        self.assertTrue(self.update(loader, "cloth_003", cloth("cloth_005", "셔츠")))
+        self.assertEqual(self.ids(loader), ["cloth_005", "cloth_004"])
+        self.assertEqual(self.ids(self.load()), ["cloth_005", "cloth_004"])
+
+    def test_update_in_place(self):
+        loader = self.load()
+        self.assertTrue(self.update(loader, "cloth_004", cloth("cloth_004", "가디건")))
+        self.assertEqual(self.load().get_cloth("cloth_004")["name"], "가디건")
+
+
+if __name__ == "__main__":
+    unittest.main()
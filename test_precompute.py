@@ -0,0 +1,46 @@
+"""
+precompute.run() 단위 테스트 (DB / 네트워크 없이 실행)
+
+    python -m unittest test_precompute
+"""
+import os
+import unittest
+from datetime import date
+from unittest import mock
+
+# models 는 import 시점에 엔진을 만들기 때문에 URL 이 없으면 가짜 URL 로 (접속은 하지 않음)
+os.environ.setdefault("DATABASE_URL", "postgresql+psycopg2://localhost/fashion_test")
+
+import precompute
+
+
+class EmptyRepo:
+    """옷이 있는 사용자가 없는 저장소 (Claude 호출까지 가지 않음)"""
+
+    def get_ai_ready_closet(self, user_id):
+        return []
+
+
+class PrecomputeApiKeyTest(unittest.TestCase):
+    def run_job(self):
+        forecast = precompute.Forecast.stand_in(date(2025, 3, 4))
+        return precompute.run(forecast, user_ids=["u1"], repo=EmptyRepo(), store=mock.Mock(), dry_run=True)
+
+    def test_live_transport_uses_env_api_key(self):
+        env = {"ANTHROPIC_API_KEY": "sk-test", "LLM_TRANSPORT": "live"}
+        with mock.patch.dict(os.environ, env):
+            report = self.run_job()
+        self.assertEqual(report["empty_closet"], 1)
+        # live 전송 계층이면 Message Batches API 로 제출
+        self.assertEqual(report["submit"], "batch")
+
+    def test_live_transport_without_api_key_fails(self):
+        with mock.patch.dict(os.environ, {"LLM_TRANSPORT": "live"}), \
+                mock.patch.object(precompute, "load_dotenv"):
+            os.environ.pop("ANTHROPIC_API_KEY", None)
+            with self.assertRaises(ValueError):
+                self.run_job()
+
+
+if __name__ == "__main__":
+    unittest.main()
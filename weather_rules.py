@@ -0,0 +1,46 @@
+# _filter_by_weather 의 계절/재질 규칙을 온도 구간별 테이블로 정리한 모듈
+# (캐시 키, 로컬 추천 엔진 등에서 같은 기준을 쓰기 위해 분리)
+
+# 온도 구간 (경계: 10/15/20/25도)
+TEMP_BANDS = ["lt10", "10-15", "15-20", "20-25", "ge25", "unknown"]
+
+# 구간별로 어울리는 계절 ('사계절'은 항상 OK)
+SEASON_FIT = {
+    "lt10": {"겨울", "사계절"},
+    "10-15": {"봄", "가을", "사계절"},
+    "15-20": {"봄", "가을", "사계절"},
+    "20-25": {"여름", "사계절"},
+    "ge25": {"여름", "사계절"},
+    "unknown": {"사계절"},
+}
+
+# 구간별로 어울리는 재질
+MATERIAL_FIT = {
+    "lt10": {"니트", "패딩", "레더", "스웨이드"},
+    "10-15": {"니트", "패딩", "레더", "스웨이드"},
+    "15-20": {"면", "데님", "폴리"},
+    "20-25": {"면", "데님", "폴리"},
+    "ge25": {"린넨", "면"},
+    "unknown": set(),
+}
+
+# 아우터가 필요한 구간
+OUTER_BANDS = {"lt10", "10-15", "15-20"}
+
+
+def temperature_band(temp):
+    """
+    온도를 _filter_by_weather 경계(10/15/20/25도) 기준 구간으로 변환
+    같은 구간 안에서는 필터 결과가 항상 같으므로 캐시 키로 사용 가능
+    """
+    if temp is None:
+        return "unknown"
+    if temp < 10:
+        return "lt10"
+    if temp < 15:
+        return "10-15"
+    if temp < 20:
+        return "15-20"
+    if temp < 25:
+        return "20-25"
+    return "ge25"